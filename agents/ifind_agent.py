@@ -13,6 +13,11 @@ from tools.ifind_tool import (
     TradingAnalysisTool
 )
 
+# 各 Agent 使用的 LLM；工具返回结果按对应 LLM 的 token 预算打包
+zhipu_llm = get_llm("zhipuai")
+deepseek_llm = get_llm("deepseek")
+qwen_llm = get_llm("qwen")
+
 # 基差分析师
 basis_analyst = Agent(
     role='资深基差分析师',
@@ -25,8 +30,8 @@ basis_analyst = Agent(
     """,
     verbose=True,
     allow_delegation=False,
-    llm=get_llm("zhipuai"),
-    tools=[BasisAnalysisTool()],  # ✅ 传递工具实例
+    llm=zhipu_llm,
+    tools=[BasisAnalysisTool(token_budget=zhipu_llm.get_tool_result_budget())],  # ✅ 传递工具实例
     max_iter=3
 )
 
@@ -42,8 +47,8 @@ inventory_analyst = Agent(
     """,
     verbose=True,
     allow_delegation=False,
-    llm=get_llm("deepseek"),
-    tools=[InventoryAnalysisTool()],  # ✅ 传递工具实例
+    llm=deepseek_llm,
+    tools=[InventoryAnalysisTool(token_budget=deepseek_llm.get_tool_result_budget())],  # ✅ 传递工具实例
     max_iter=3
 )
 
@@ -59,11 +64,11 @@ supply_demand_analyst = Agent(
     """,
     verbose=True,
     allow_delegation=False,
-    llm=get_llm("qwen"),
+    llm=qwen_llm,
     tools=[
-        SupplyDemandAnalysisTool(),
-        ApparentDemandAnalysisTool(),
-        DemandForecastingTool()
+        SupplyDemandAnalysisTool(token_budget=qwen_llm.get_tool_result_budget()),
+        ApparentDemandAnalysisTool(token_budget=qwen_llm.get_tool_result_budget()),
+        DemandForecastingTool(token_budget=qwen_llm.get_tool_result_budget())
     ],
     max_iter=3
 )
@@ -80,8 +85,8 @@ macro_analyst = Agent(
     """,
     verbose=True,
     allow_delegation=False,
-    llm=get_llm("zhipuai"),
-    tools=[MacroEconomicAnalysisTool()],
+    llm=zhipu_llm,
+    tools=[MacroEconomicAnalysisTool(token_budget=zhipu_llm.get_tool_result_budget())],
     max_iter=3
 )
 
@@ -96,8 +101,8 @@ price_technical_analyst = Agent(
     """,
     verbose=True,
     allow_delegation=False,
-    llm=get_llm("deepseek"),
-    tools=[PriceTechnicalAnalysisTool()],
+    llm=deepseek_llm,
+    tools=[PriceTechnicalAnalysisTool(token_budget=deepseek_llm.get_tool_result_budget())],
     max_iter=3
 )
 
@@ -112,8 +117,8 @@ quant_strategist = Agent(
     """,
     verbose=True,
     allow_delegation=False,
-    llm=get_llm("qwen"),
-    tools=[QuantStrategyAnalysisTool()],
+    llm=qwen_llm,
+    tools=[QuantStrategyAnalysisTool(token_budget=qwen_llm.get_tool_result_budget())],
     max_iter=3
 )
 
@@ -128,7 +133,7 @@ trading_analyst = Agent(
     """,
     verbose=True,
     allow_delegation=False,
-    llm=get_llm("deepseek"),
-    tools=[TradingAnalysisTool()],
+    llm=deepseek_llm,
+    tools=[TradingAnalysisTool(token_budget=deepseek_llm.get_tool_result_budget())],
     max_iter=3
 )
@@ -1,9 +1,23 @@
 # config/ifind_edb_mapping.py
-from typing import Dict, List
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from config.edb_asphalt_indicators import EDBIndicatorConfig, get_indicator_config
+
+# 未登记配置的指标，按分组名后缀推断频率
+_GROUP_FREQUENCY_SUFFIXES = ("daily", "weekly", "monthly")
+
 
 class IFindEDBMapping:
     """
     iFinD EDB指标ID到项目任务的完整映射
+    
+    构造时将分组定义编译为只读、有序的反向索引（顺序按分组及组内指标的定义顺序，
+    重复指标只保留首次出现），查询均为 O(1)：
+    - task_indicators: 任务类型 -> 指标ID
+    - indicator_groups: 指标ID -> 所属分组
+    - indicator_configs: 指标ID -> EDBIndicatorConfig（仅已登记的指标）
+    - frequency_indicators: 频率 -> 指标ID
     """
     
     def __init__(self):
@@ -234,17 +248,74 @@ class IFindEDBMapping:
                 'cost_profit_weekly'
             ]
         }
+
+        self._build_indexes()
     
-    def get_required_indicators(self, task_type: str) -> List[str]:
-        """根据任务类型获取所需的所有指标ID"""
-        if task_type not in self.task_type_to_groups:
-            return []
+    @staticmethod
+    def _unique(values) -> Tuple[str, ...]:
+        """去重并保持首次出现的顺序"""
+        return tuple(dict.fromkeys(values))
+    
+    def _build_indexes(self):
+        """编译反向索引"""
+        task_indicators = {
+            task_type: self._unique(
+                indicator
+                for group_name in groups
+                for indicator in self.edb_groups.get(group_name, [])
+            )
+            for task_type, groups in self.task_type_to_groups.items()
+        }
         
-        groups = self.task_type_to_groups[task_type]
-        indicators = set()
+        indicator_groups: Dict[str, List[str]] = {}
+        frequency_indicators: Dict[str, List[str]] = {}
+        indicator_configs: Dict[str, EDBIndicatorConfig] = {}
+        indicator_frequencies: Dict[str, str] = {}
         
-        for group_name in groups:
-            if group_name in self.edb_groups:
-                indicators.update(self.edb_groups[group_name])
+        for group_name, indicators in self.edb_groups.items():
+            group_frequency = next(
+                (f for f in _GROUP_FREQUENCY_SUFFIXES if group_name.endswith(f"_{f}")), "unknown"
+            )
+            for indicator in indicators:
+                groups = indicator_groups.setdefault(indicator, [])
+                if group_name not in groups:
+                    groups.append(group_name)
+                
+                if indicator in indicator_frequencies:
+                    continue
+                config = get_indicator_config(indicator)
+                if config is not None:
+                    indicator_configs[indicator] = config
+                frequency = config.frequency if config and config.frequency else group_frequency
+                indicator_frequencies[indicator] = frequency
+                frequency_indicators.setdefault(frequency, []).append(indicator)
         
-        return list(indicators)
+        self.task_indicators: Mapping[str, Tuple[str, ...]] = MappingProxyType(task_indicators)
+        self.indicator_groups: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+            {indicator: tuple(groups) for indicator, groups in indicator_groups.items()}
+        )
+        self.indicator_configs: Mapping[str, EDBIndicatorConfig] = MappingProxyType(indicator_configs)
+        self.indicator_frequencies: Mapping[str, str] = MappingProxyType(indicator_frequencies)
+        self.frequency_indicators: Mapping[str, Tuple[str, ...]] = MappingProxyType(
+            {frequency: tuple(indicators) for frequency, indicators in frequency_indicators.items()}
+        )
+    
+    def get_required_indicators(self, task_type: str) -> List[str]:
+        """根据任务类型获取所需的所有指标ID（顺序固定）"""
+        return list(self.task_indicators.get(task_type, ()))
+    
+    def get_indicator_groups(self, indicator: str) -> Tuple[str, ...]:
+        """指标所属的分组"""
+        return self.indicator_groups.get(indicator, ())
+    
+    def get_indicator_config(self, indicator: str) -> Optional[EDBIndicatorConfig]:
+        """指标配置（名称、频率、类别等），未登记返回 None"""
+        return self.indicator_configs.get(indicator)
+    
+    def get_indicator_frequency(self, indicator: str) -> str:
+        """指标频率：daily / weekly / monthly，无法确定时为 unknown"""
+        return self.indicator_frequencies.get(indicator, "unknown")
+    
+    def get_indicators_by_frequency(self, frequency: str) -> Tuple[str, ...]:
+        """某一频率的全部指标"""
+        return self.frequency_indicators.get(frequency, ())
@@ -1,7 +1,111 @@
 # config/logging_config.py
+"""
+日志配置
+
+所有文件/控制台输出都经由队列交给后台线程写入（QueueHandler + QueueListener），
+请求路径上只做一次入队；消息格式化也推迟到后台线程。大体积内容用 LazyPayload
+记录：日志级别未启用时不会序列化，超过 LOG_PAYLOAD_INLINE_CHARS 时主日志只保留
+预览，内容写入按大小轮转、gzip 压缩的 payload 旁路文件（logs/payloads/）。序列化
+在达到 LOG_PAYLOAD_MAX_CHARS 后即停止，超大的响应不会被完整序列化。
+"""
+import atexit
+import gzip
+import itertools
+import json
 import logging
 import os
+import queue
+import shutil
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, Optional, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DETAIL_LOG_FILE = os.path.join("logs", "data_fetch_detailed.log")
+PAYLOAD_LOG_FILE = os.path.join("logs", "payloads", "data_fetch_payloads.log")
+
+# 主日志中内联的最大字符数，超出部分写入旁路文件
+PAYLOAD_INLINE_CHARS = int(os.getenv("LOG_PAYLOAD_INLINE_CHARS", "1000"))
+# 单个 payload 写入旁路文件的最大字符数，0 表示不写旁路文件、只保留预览
+PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "200000"))
+PAYLOAD_MAX_BYTES = int(os.getenv("LOG_PAYLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+PAYLOAD_BACKUP_COUNT = int(os.getenv("LOG_PAYLOAD_BACKUP_COUNT", "5"))
+
+_queue_handlers: Dict[str, QueueHandler] = {}
+_listeners: Dict[str, QueueListener] = {}
+_handlers_lock = threading.Lock()
+_payload_ids = itertools.count(1)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    不在调用线程格式化消息的 QueueHandler
+
+    标准 QueueHandler.prepare 会在入队前格式化消息（即在请求路径上执行
+    msg % args）；这里原样入队，由后台线程的处理器格式化。记录的 args 在
+    写入前不应再被修改。
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _start_pipeline(key: str, *handlers: logging.Handler) -> QueueHandler:
+    """为一组处理器启动后台写入线程，返回挂到 logger 上的入队处理器"""
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners[key] = listener
+    return DeferredQueueHandler(log_queue)
+
+
+def _file_handler(filename: str) -> logging.FileHandler:
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    handler = logging.FileHandler(filename, mode='a', encoding='utf-8')
+    handler.setLevel(logging.DEBUG)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def stop_logging():
+    """
+    停止所有后台写入线程（会先写完队列中剩余的记录），进程退出时自动调用
+
+    payload 旁路线程最后停止，以便其他线程收尾时产生的 payload 仍能写出。
+    """
+    payload_path = os.path.abspath(PAYLOAD_LOG_FILE)
+    with _handlers_lock:
+        keys = sorted(_listeners, key=lambda key: key == payload_path)
+        listeners = [_listeners.pop(key) for key in keys]
+        _queue_handlers.clear()
+
+    # 不持有锁：后台线程收尾时可能需要获取 payload 日志
+    queues = set()
+    for listener in listeners:
+        listener.stop()
+        queues.add(id(listener.queue))
+        for handler in listener.handlers:
+            handler.close()
+
+    # 从各 logger 上摘除已停止管道的入队处理器，之后可重新挂载
+    loggers = [logging.getLogger()] + [
+        item for item in logging.Logger.manager.loggerDict.values() if isinstance(item, logging.Logger)
+    ]
+    for item in loggers:
+        for handler in list(item.handlers):
+            if isinstance(handler, QueueHandler) and id(handler.queue) in queues:
+                item.removeHandler(handler)
+
+
+atexit.register(stop_logging)
+
 
 def setup_logging():
     """设置详细的日志配置"""
@@ -9,23 +113,129 @@ def setup_logging():
     log_dir = "logs"
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
-    
-    # 配置日志
-    logging.basicConfig(
-        level=logging.DEBUG,  # 关键：设置为DEBUG级别
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(
-                filename=f'logs/data_fetch_{datetime.now().strftime("%Y%m%d")}.log', 
-                mode='a', 
-                encoding='utf-8'
-            ),
-            logging.StreamHandler()  # 同时输出到控制台
-        ]
-    )
-    
+
+    # 配置日志（文件与控制台输出均由后台线程完成；重复调用不会再启动写入线程）
+    with _handlers_lock:
+        if "root" not in _listeners:
+            console = logging.StreamHandler()  # 同时输出到控制台
+            console.setFormatter(logging.Formatter(LOG_FORMAT))
+            logging.basicConfig(
+                level=logging.DEBUG,  # 关键：设置为DEBUG级别
+                handlers=[
+                    _start_pipeline(
+                        "root",
+                        _file_handler(f'logs/data_fetch_{datetime.now().strftime("%Y%m%d")}.log'),
+                        console
+                    )
+                ]
+            )
+
     # 为特定模块设置DEBUG级别
     logging.getLogger("tools.edt_data_tool_enhanced_debug").setLevel(logging.DEBUG)
     logging.getLogger("__main__").setLevel(logging.DEBUG)
-    
+
     return logging.getLogger(__name__)
+
+
+def attach_detail_log(logger: logging.Logger, filename: Optional[str] = None) -> QueueHandler:
+    """
+    为 logger 挂载详细数据日志（可重复调用），filename 默认为 DETAIL_LOG_FILE
+
+    同一文件在进程内只有一个后台写入线程与文件句柄，由所有 logger 共用；
+    已挂载过的 logger 不会重复添加，避免日志重复和文件句柄泄漏。
+    """
+    path = os.path.abspath(filename or DETAIL_LOG_FILE)
+    with _handlers_lock:
+        handler = _queue_handlers.get(path)
+        if handler is None:
+            handler = _start_pipeline(path, _file_handler(path))
+            _queue_handlers[path] = handler
+
+        if handler not in logger.handlers:
+            logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+    return handler
+
+
+def get_payload_logger() -> logging.Logger:
+    """payload 旁路日志：按大小轮转，轮转后的文件 gzip 压缩"""
+    payload_logger = logging.getLogger("payloads")
+    path = os.path.abspath(PAYLOAD_LOG_FILE)
+    with _handlers_lock:
+        handler = _queue_handlers.get(path)
+        if handler is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            rotating = RotatingFileHandler(
+                path, maxBytes=PAYLOAD_MAX_BYTES, backupCount=PAYLOAD_BACKUP_COUNT, encoding='utf-8'
+            )
+            rotating.namer = lambda name: name + ".gz"
+            rotating.rotator = _gzip_rotator
+            rotating.setFormatter(logging.Formatter('%(asctime)s\t%(message)s'))
+            handler = _start_pipeline(path, rotating)
+            _queue_handlers[path] = handler
+            payload_logger.addHandler(handler)
+            payload_logger.setLevel(logging.DEBUG)
+            payload_logger.propagate = False
+    return payload_logger
+
+
+def _json_prefix(obj: Any, limit: int) -> Tuple[str, bool]:
+    """序列化 obj 的前 limit 个字符，返回 (文本, 是否截断)；达到长度后立即停止编码"""
+    parts = []
+    length = 0
+    for part in json.JSONEncoder(ensure_ascii=False, default=str).iterencode(obj):
+        parts.append(part)
+        length += len(part)
+        if length > limit:
+            return "".join(parts)[:limit], True
+    return "".join(parts), False
+
+
+def json_preview(obj: Any, limit: int = 500) -> str:
+    """
+    日志用的JSON预览：只序列化前 limit 个字符
+
+    json.dumps(result)[:500] 会先序列化整个响应再截断，这里用 iterencode 在
+    达到长度后立即停止。
+    """
+    text, truncated = _json_prefix(obj, limit)
+    return f"{text}..." if truncated else text
+
+
+class LazyPayload:
+    """
+    延迟序列化的日志参数，用法：logger.debug("完整API响应: %s", LazyPayload(result))
+
+    只有日志真正被写出时（后台线程格式化消息时）才序列化为 JSON；内容超过
+    inline_chars 时返回预览并注明旁路文件中的 payload 编号，前 PAYLOAD_MAX_CHARS
+    个字符写入 payload 旁路日志。同一记录被多个处理器格式化时只序列化一次。
+    """
+
+    def __init__(self, obj: Any, label: str = "", inline_chars: Optional[int] = None):
+        self.obj = obj
+        self.label = label
+        self.inline_chars = PAYLOAD_INLINE_CHARS if inline_chars is None else inline_chars
+        self._text: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def __str__(self) -> str:
+        with self._lock:
+            if self._text is None:
+                self._text = self._render()
+            return self._text
+
+    def _render(self) -> str:
+        text, truncated = _json_prefix(self.obj, max(self.inline_chars, PAYLOAD_MAX_CHARS))
+        if len(text) <= self.inline_chars and not truncated:
+            return text
+        if PAYLOAD_MAX_CHARS <= 0:
+            return f"{text[:self.inline_chars]}...（已截断）"
+
+        payload_id = f"{os.getpid()}-{next(_payload_ids)}"
+        if truncated:
+            get_payload_logger().info("%s\t%s\t%s...", payload_id, self.label, text)
+            note = f"前 {len(text)} 字符见 payload #{payload_id}"
+        else:
+            get_payload_logger().info("%s\t%s\t%s", payload_id, self.label, text)
+            note = f"共 {len(text)} 字符，完整内容见 payload #{payload_id}"
+        return f"{text[:self.inline_chars]}...（{note}）"
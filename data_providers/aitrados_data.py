@@ -1,9 +1,12 @@
 # data_providers/aitrados_data.py
 import os
+import pandas as pd
 import requests
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from .base import DataProvider
+from .replay import ReplayRecorder, get_replay_recorder
+from schemas.timeseries import TimeSeriesFrame
 from schemas.models import (
     FuturesHistoryDataPoint,
     PriceDataPoint,
@@ -18,14 +21,40 @@ class AitradosDataProvider(DataProvider):
     """
     aitrados 数据提供者。
     对接官方 API 获取真实行情、新闻、经济日历等数据。
+    所有 GET 请求经过录制/回放层（DATA_REPLAY_MODE，见 replay.py）。
     """
 
-    def __init__(self):
+    name = "aitrados"
+    trusted_models = True
+
+    def __init__(self, replay: Optional[ReplayRecorder] = None):
+        self.replay = replay or get_replay_recorder()
         self.secret_key = os.getenv("AITRADOS_SECRET_KEY")
-        if not self.secret_key:
+        # 回放模式不访问网络，无需密钥
+        if not self.secret_key and not self.replay.replaying:
             raise ValueError("请在 .env 中设置 AITRADOS_SECRET_KEY")
         self.base_url = "https://default.dataset-api.aitrados.com"
 
+    def _get(self, url: str, params: Dict, timeout: float = 10) -> requests.Response:
+        """发送 GET 请求（录制模式保存状态码与响应文本，回放模式据此重建响应）"""
+        def encode(resp: requests.Response) -> Dict:
+            return {"status_code": resp.status_code, "text": resp.text}
+
+        def decode(stored: Dict) -> requests.Response:
+            resp = requests.Response()
+            resp.status_code = stored["status_code"]
+            resp._content = stored["text"].encode("utf-8")
+            resp.encoding = "utf-8"
+            resp.url = url
+            return resp
+
+        endpoint = url[len(self.base_url):].lstrip("/")
+        return self.replay.call(
+            "aitrados", endpoint, params,
+            lambda: requests.get(url, params=params, timeout=timeout),
+            encode=encode, decode=decode
+        )
+
     def _build_symbol(self, region: str, ticker: str, contract_type: str = "M1") -> str:
         """
         构建符合 aitrados 规范的 symbol。
@@ -91,7 +120,7 @@ class AitradosDataProvider(DataProvider):
             print(f"\n🔍 请求URL: {url}")
             print(f"📡 参数: {params}")
 
-            resp = requests.get(url, params=params, timeout=10)
+            resp = self._get(url, params)
             print(f"✅ 状态码: {resp.status_code}")
 
             # 检查是否成功
@@ -119,33 +148,36 @@ class AitradosDataProvider(DataProvider):
 
             print(f"✅ 成功获取到 {len(raw_items)} 条原始数据")
 
-            # 开始转换为 FuturesHistoryDataPoint
-            result = []
-            for item in raw_items:
-                try:
-                    dt_str = item["datetime"]  # e.g., "2025-06-06T13:00:00+00:00"
-                    close_dt_str = item["close_datetime"]
-
-                    # 转换时间格式
-                    dt = datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-                    close_dt = datetime.fromisoformat(close_dt_str.replace("Z", "+00:00"))
-
-                    data_point = FuturesHistoryDataPoint(
-                        datetime=dt,
-                        product=ticker.upper(),
-                        symbol=item["symbol"],  # 如 RB2605
-                        open=float(item["open"]),
-                        high=float(item["high"]),
-                        low=float(item["low"]),
-                        close=float(item["close"]),
-                        volume=int(item["volume"]),
-                        open_interest=int(item["open_interest"])
-                    )
-                    result.append(data_point)
-
-                except Exception as e:
-                    print(f"⚠️ 跳过一条数据（字段缺失）: {e}")
-                    continue
+            # 整列转换为 TimeSeriesFrame（FuturesHistoryDataPoint 在访问时才构造）
+            frame = pd.DataFrame(raw_items)
+            required = ["datetime", "close_datetime", "symbol", "open", "high", "low", "close", "volume", "open_interest"]
+            for name in required:
+                if name not in frame.columns:
+                    frame[name] = None
+            frame["datetime"] = pd.to_datetime(frame["datetime"], utc=True, errors="coerce")
+            frame["close_datetime"] = pd.to_datetime(frame["close_datetime"], utc=True, errors="coerce")
+            for name in ("open", "high", "low", "close", "volume", "open_interest"):
+                frame[name] = pd.to_numeric(frame[name], errors="coerce")
+            valid = frame.dropna(subset=required)
+            if len(valid) < len(frame):
+                print(f"⚠️ 跳过 {len(frame) - len(valid)} 条数据（字段缺失）")
+
+            result = TimeSeriesFrame.from_frame(
+                pd.DataFrame({
+                    "datetime": valid["datetime"],
+                    "symbol": valid["symbol"].astype(str),  # 如 RB2605
+                    "open": valid["open"].astype("float64"),
+                    "high": valid["high"].astype("float64"),
+                    "low": valid["low"].astype("float64"),
+                    "close": valid["close"].astype("float64"),
+                    "volume": valid["volume"].astype("int64"),
+                    "open_interest": valid["open_interest"].astype("int64")
+                }),
+                model=FuturesHistoryDataPoint,
+                index_column="datetime",
+                constants={"product": ticker.upper()},
+                trusted=self.trusted
+            )
 
             print(f"✅ 成功解析并返回 {len(result)} 条期货K线数据")
             return result
@@ -165,7 +197,7 @@ class AitradosDataProvider(DataProvider):
         }
 
         try:
-            resp = requests.get(url, params=params, timeout=10)
+            resp = self._get(url, params)
             if resp.status_code != 200:
                 print(f"❌ HTTP {resp.status_code}: {resp.text}")
                 return []
@@ -228,7 +260,7 @@ class AitradosDataProvider(DataProvider):
         url = f"{self.base_url}/api/v2/economic_calendar/latest_event_list"
         params = {"secret_key": self.secret_key, "limit": days_ahead}
         try:
-            resp = requests.get(url, params=params, timeout=10)
+            resp = self._get(url, params)
             resp.raise_for_status()
             items = resp.json().get("data", [])
             return [
@@ -2,12 +2,24 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional
 
+from schemas.construct import is_trusted_provider
+
 class DataProvider(ABC):
     """
     所有数据提供者的抽象基类。
     必须实现以下方法：
     - get_history_data: 获取历史行情数据
     """
+
+    # 数据提供者名（与 DATA_PROVIDER 的取值一致）
+    name: str = ""
+    # 返回的数据是否已完成类型转换；可信时构造数据点对象跳过校验（见 schemas.construct）
+    trusted_models: bool = False
+
+    @property
+    def trusted(self) -> bool:
+        """是否走可信构造路径（DATA_TRUSTED_PROVIDERS 优先于 trusted_models）"""
+        return is_trusted_provider(self.name, self.trusted_models)
     
     @abstractmethod
     def get_history_data(
@@ -29,6 +41,8 @@ class DataProvider(ABC):
             end_date: 结束日期 (YYYY-MM-DD)
             
         Returns:
-            数据列表（具体类型由子类决定）
+            schemas.timeseries.TimeSeriesFrame（按时间升序的列式序列，按下标/迭代访问时
+            得到具体的数据点模型，如 PriceDataPoint、FuturesHistoryDataPoint）；
+            获取失败时可返回空列表
         """
         pass
@@ -0,0 +1,177 @@
+# data_providers/edb_cache.py
+"""
+EDB 指标级结果缓存
+
+缓存粒度为 (指标ID, 开始日期, 结束日期) -> table。过期时间由指标的更新频率
+和最近更新日期（config/edb_asphalt_indicators.py 中的 frequency、update_time）推算：
+- 日频指标及未登记的指标：按 settings.CACHE_TTL 过期，保证日内刷新
+- 周频、月频指标：缓存到下一个预期更新日；处于更新窗口内时按 settings.CACHE_TTL 过期
+超过内存上限时按 LRU 淘汰。
+"""
+import calendar
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from config.edb_asphalt_indicators import get_indicator_config
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 预期更新日之后仍视为"可能刚更新"的天数
+UPDATE_GRACE_DAYS = {"weekly": 2, "monthly": 5}
+
+
+def _add_months(value: date, months: int) -> date:
+    month_index = value.month - 1 + months
+    year = value.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def _next_period(value: date, frequency: str, periods: int = 1) -> date:
+    if frequency == "weekly":
+        return value + timedelta(days=7 * periods)
+    return _add_months(value, periods)
+
+
+def estimate_table_size(table: Dict) -> int:
+    """估算 table 占用的内存字节数"""
+    size = sys.getsizeof(table)
+    for values in table.values():
+        size += sys.getsizeof(values)
+        if isinstance(values, list):
+            size += sum(sys.getsizeof(v) for v in values)
+    return size
+
+
+class EDBIndicatorCache:
+    """
+    EDB 指标级 LRU 缓存（线程安全）
+
+    Args:
+        max_bytes: 内存上限，默认读取 IFIND_EDB_CACHE_MAX_MB（默认 256MB）
+        default_ttl: 日频/未登记指标的过期秒数，默认 settings.CACHE_TTL
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, default_ttl: Optional[int] = None):
+        self.max_bytes = max_bytes or int(float(os.getenv("IFIND_EDB_CACHE_MAX_MB", "256")) * 1024 * 1024)
+        self.default_ttl = default_ttl if default_ttl is not None else settings.CACHE_TTL
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[Dict, float, int]]" = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _key(indicator: str, start_date: str, end_date: str) -> Tuple[str, str, str]:
+        return (indicator, start_date.replace("-", ""), end_date.replace("-", ""))
+
+    def ttl_for(self, indicator: str, now: Optional[datetime] = None) -> float:
+        """根据指标频率与最近更新日期计算过期秒数"""
+        now = now or datetime.now()
+        config = get_indicator_config(indicator)
+        if not config or config.frequency not in UPDATE_GRACE_DAYS:
+            return self.default_ttl
+
+        try:
+            last_update = datetime.strptime(config.update_time, "%Y%m%d").date()
+        except (TypeError, ValueError):
+            return self.default_ttl
+
+        # 找到不晚于今天的最近一个预期更新日
+        today = now.date()
+        expected = last_update
+        periods = 1
+        while _next_period(last_update, config.frequency, periods) <= today:
+            expected = _next_period(last_update, config.frequency, periods)
+            periods += 1
+
+        if (today - expected).days <= UPDATE_GRACE_DAYS[config.frequency]:
+            return self.default_ttl
+
+        next_update = datetime.combine(_next_period(expected, config.frequency), datetime.min.time())
+        return max((next_update - now).total_seconds(), self.default_ttl)
+
+    def get(self, indicator: str, start_date: str, end_date: str) -> Optional[Dict]:
+        """读取缓存的 table，未命中或已过期返回 None"""
+        key = self._key(indicator, start_date, end_date)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            table, expires_at, size = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.current_bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return table
+
+    def put(self, indicator: str, start_date: str, end_date: str, table: Dict):
+        """写入 table，超过内存上限时淘汰最久未使用的条目"""
+        key = self._key(indicator, start_date, end_date)
+        size = estimate_table_size(table)
+        if size > self.max_bytes:
+            return
+
+        expires_at = time.time() + self.ttl_for(indicator)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[2]
+
+            self._entries[key] = (table, expires_at, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def lookup(self, indicators: List[str], start_date: str, end_date: str) -> Tuple[Dict[str, Dict], List[str]]:
+        """批量查询，返回 (命中的 指标->table, 未命中的指标列表)"""
+        cached = {}
+        missing = []
+        for indicator in indicators:
+            table = self.get(indicator, start_date, end_date)
+            if table is None:
+                missing.append(indicator)
+            else:
+                cached[indicator] = table
+        return cached, missing
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def get_stats(self) -> Dict:
+        """返回命中/未命中/淘汰等统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
@@ -0,0 +1,104 @@
+# data_providers/edb_planner.py
+"""
+按频率拆分 EDB 请求
+
+不同频率的指标放在一次 edb_service 请求里时，返回结果会按最密的日期轴对齐，
+月频、周频序列在每个日频日期上都被填充为空值。FrequencyRequestPlanner 在
+get_edb_data 之前按指标频率（EDBIndicatorConfig.frequency）分组，每组按自身
+频率单独请求，再按原始指标顺序组装为一个响应；各 table 只保留有值的日期。
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from config.edb_asphalt_indicators import get_indicator_config
+from .ifind_edb_utils import build_edb_response, empty_indicator_table, strip_null_rows, table_indicator_id
+from .ifind_table_parser import edb_table_to_frame
+
+logger = logging.getLogger(__name__)
+
+# 请求顺序：低频组数据量小，先返回
+FREQUENCY_ORDER = ("monthly", "weekly", "daily")
+
+
+class FrequencyRequestPlanner:
+    """
+    按频率分组请求 EDB 数据，对外提供与 IFinDHTTPClient.get_edb_data 相同的接口
+
+    Args:
+        source: 实际获取数据的对象（IFinDHTTPClient 或 EDBTimeSeriesStore）
+        mapping: 可选的 IFindEDBMapping，用于查询指标频率（含按分组推断的频率）
+        max_workers: 并发请求的分组数
+    """
+
+    def __init__(self, source, mapping=None, max_workers: int = 3):
+        self.source = source
+        self.mapping = mapping
+        self.max_workers = max_workers
+
+    def frequency_of(self, indicator: str) -> str:
+        if self.mapping is not None:
+            return self.mapping.get_indicator_frequency(indicator)
+        config = get_indicator_config(indicator)
+        return config.frequency if config and config.frequency else "unknown"
+
+    def plan(self, indicators: List[str]) -> Dict[str, List[str]]:
+        """频率 -> 指标列表（组内保持请求顺序，重复指标只请求一次）"""
+        groups: Dict[str, List[str]] = {}
+        for indicator in dict.fromkeys(indicators):
+            groups.setdefault(self.frequency_of(indicator), []).append(indicator)
+
+        ordered = {f: groups.pop(f) for f in FREQUENCY_ORDER if f in groups}
+        ordered.update(groups)
+        return ordered
+
+    def get_edb_data(self, indicators: List[str], start_date: str, end_date: str) -> Dict:
+        """按频率分组获取，返回按 indicators 顺序排列的完整响应"""
+        groups = self.plan(indicators)
+        if len(groups) <= 1:
+            result = self.source.get_edb_data(indicators=indicators, start_date=start_date, end_date=end_date)
+            return {**result, "tables": [strip_null_rows(t) for t in result.get("tables") or []]}
+
+        logger.info("EDB请求按频率拆分: " + ", ".join(f"{f}={len(ids)}" for f, ids in groups.items()))
+
+        def fetch(group: List[str]) -> Dict:
+            return self.source.get_edb_data(indicators=group, start_date=start_date, end_date=end_date)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(groups))) as executor:
+            results = list(executor.map(fetch, groups.values()))
+
+        tables: Dict[str, Dict] = {}
+        for result in results:
+            if result.get("errorcode", 0) != 0:
+                return result
+            for table in result.get("tables") or []:
+                tables[table_indicator_id(table)] = strip_null_rows(table)
+
+        ordered = [tables.get(indicator) or empty_indicator_table(indicator) for indicator in indicators]
+        response = build_edb_response(ordered, indicators, start_date, end_date, base=results[0])
+        response["frequency_groups"] = {f: list(ids) for f, ids in groups.items()}
+        return response
+
+    def get_aligned_frame(self, indicators: List[str], start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        获取并对齐为 DataFrame：以各指标日期的并集为索引、每个指标一列
+
+        各指标只在其发布日期上有值，其余为 NaN；需要按日对齐时可再 ffill()。
+        """
+        return align_edb_tables(self.get_edb_data(indicators, start_date, end_date), indicators)
+
+
+def align_edb_tables(result: Dict, indicators: Optional[List[str]] = None) -> pd.DataFrame:
+    """将 edb_service 响应的各 table 按日期外连接为一个 DataFrame"""
+    columns = {}
+    for table in result.get("tables") or []:
+        frame = edb_table_to_frame(table)
+        columns[table_indicator_id(table)] = frame.drop_duplicates("date", keep="last").set_index("date")["value"]
+
+    aligned = pd.DataFrame(columns).sort_index()
+    if indicators is not None:
+        aligned = aligned.reindex(columns=list(dict.fromkeys(indicators)))
+    aligned.index.name = "date"
+    return aligned
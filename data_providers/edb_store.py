@@ -0,0 +1,211 @@
+# data_providers/edb_store.py
+"""
+EDB 时间序列本地存储
+
+每个指标一个 Parquet 文件（time、value、rtime、index_name 等列），
+manifest.json 记录每个指标已覆盖的日期区间。请求时只向 iFinD 拉取
+已覆盖区间之外的缺口，其余部分直接从磁盘读取。
+"""
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .ifind_edb_utils import table_indicator_id, build_edb_response, empty_indicator_table
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = "%Y-%m-%d"
+
+
+def _to_date(value: str) -> date:
+    return datetime.strptime(value.replace("-", ""), "%Y%m%d").date()
+
+
+def _to_str(value: date) -> str:
+    return value.strftime(DATE_FORMAT)
+
+
+class EDBTimeSeriesStore:
+    """
+    EDB 指标的本地列式存储，对外提供与 IFinDHTTPClient.get_edb_data 相同的接口
+
+    已覆盖区间的终点最多记到同步日的前一天，因此当天及之后的数据每次都会
+    重新拉取一小段，以获取当日新发布或修订的数据点。
+
+    存储目录可通过 IFIND_EDB_STORE_DIR 配置（默认 data/edb_store）。
+    """
+
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, client, root_dir: Optional[str] = None):
+        self.client = client
+        self.root_dir = root_dir or os.getenv("IFIND_EDB_STORE_DIR", os.path.join("data", "edb_store"))
+        os.makedirs(self.root_dir, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self.manifest: Dict[str, Dict] = self._load_manifest()
+
+    # ========== manifest ==========
+    def _manifest_path(self) -> str:
+        return os.path.join(self.root_dir, self.MANIFEST_FILE)
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        path = self._manifest_path()
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"EDB存储清单读取失败，将重新同步: {e}")
+            return {}
+
+    def _save_manifest(self):
+        path = self._manifest_path()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    # ========== 数据文件 ==========
+    def _series_path(self, indicator: str) -> str:
+        return os.path.join(self.root_dir, f"{indicator}.parquet")
+
+    def _read_series(self, indicator: str) -> Optional[pd.DataFrame]:
+        path = self._series_path(indicator)
+        if not os.path.exists(path):
+            return None
+        return pd.read_parquet(path)
+
+    def _write_series(self, indicator: str, frame: pd.DataFrame):
+        path = self._series_path(indicator)
+        tmp_path = f"{path}.tmp"
+        frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _table_to_frame(table: Dict) -> pd.DataFrame:
+        times = table.get("time") or []
+        columns = {"time": times}
+        for key, values in table.items():
+            if key not in ("id", "time") and isinstance(values, list) and len(values) == len(times):
+                columns[key] = [None if v is None else str(v) for v in values]
+        return pd.DataFrame(columns, dtype="string")
+
+    # ========== 同步 ==========
+    def _missing_ranges(self, indicator: str, start: date, end: date) -> List[Tuple[date, date]]:
+        """计算请求区间中尚未覆盖的部分"""
+        entry = self.manifest.get(indicator)
+        if not entry:
+            return [(start, end)]
+
+        covered_start = _to_date(entry["start_date"])
+        covered_end = _to_date(entry["end_date"])
+
+        # 缺口总是与已覆盖区间相接，保证覆盖区间连续
+        gaps = []
+        if start < covered_start:
+            gaps.append((start, covered_start - timedelta(days=1)))
+        if end > covered_end:
+            # 从已覆盖的最后一天开始重新拉取，以获取修订后的数据
+            gaps.append((covered_end, end))
+        return gaps
+
+    def _sync(self, indicators: List[str], start: date, end: date):
+        """拉取缺口数据并写入本地存储（网络请求不持有锁）"""
+        requests_by_range: Dict[Tuple[date, date], List[str]] = {}
+        with self._lock:
+            for indicator in indicators:
+                for gap in self._missing_ranges(indicator, start, end):
+                    requests_by_range.setdefault(gap, []).append(indicator)
+
+        if not requests_by_range:
+            logger.info(f"EDB存储命中: {len(indicators)} 个指标均已覆盖")
+            return
+
+        for (gap_start, gap_end), gap_indicators in requests_by_range.items():
+            logger.info(f"EDB存储增量同步: {len(gap_indicators)} 个指标, {gap_start} 至 {gap_end}")
+            result = self.client.get_edb_data(
+                indicators=gap_indicators,
+                start_date=_to_str(gap_start),
+                end_date=_to_str(gap_end)
+            )
+
+            with self._lock:
+                self._apply_result(result, gap_indicators, gap_start, gap_end)
+
+    def _apply_result(self, result: Dict, gap_indicators: List[str], gap_start: date, gap_end: date):
+        """写入一次缺口同步的结果并更新清单"""
+        today = date.today()
+        tables = {table_indicator_id(t): t for t in result.get("tables") or []}
+        for indicator in gap_indicators:
+            self._upsert(indicator, tables.get(indicator))
+
+            entry = self.manifest.get(indicator)
+            covered_end = min(gap_end, today - timedelta(days=1))
+            if entry:
+                covered_start = min(_to_date(entry["start_date"]), gap_start)
+                covered_end = max(_to_date(entry["end_date"]), covered_end)
+            else:
+                covered_start = gap_start
+            if covered_end < covered_start:
+                # 只拉取了当天的数据，尚不能视为已覆盖
+                continue
+
+            self.manifest[indicator] = {
+                "start_date": _to_str(covered_start),
+                "end_date": _to_str(covered_end),
+                "synced_at": datetime.now().isoformat(timespec="seconds")
+            }
+
+        self._save_manifest()
+
+    def _upsert(self, indicator: str, table: Optional[Dict]):
+        if not table or not table.get("time"):
+            return
+
+        new_frame = self._table_to_frame(table)
+        existing = self._read_series(indicator)
+        if existing is not None and not existing.empty:
+            new_frame = pd.concat([existing, new_frame], ignore_index=True)
+
+        new_frame = (
+            new_frame.drop_duplicates(subset="time", keep="last")
+            .sort_values("time", ascending=False)
+            .reset_index(drop=True)
+        )
+        self._write_series(indicator, new_frame)
+
+    # ========== 查询 ==========
+    def _build_table(self, indicator: str, start_date: str, end_date: str) -> Dict:
+        frame = self._read_series(indicator)
+        table = empty_indicator_table(indicator)
+        if frame is None or frame.empty:
+            return table
+
+        mask = (frame["time"] >= start_date) & (frame["time"] <= end_date)
+        selected = frame.loc[mask]
+        for column in selected.columns:
+            table[column] = [None if pd.isna(v) else v for v in selected[column].tolist()]
+        return table
+
+    def get_edb_data(
+        self,
+        indicators: List[str],
+        start_date: str,
+        end_date: str
+    ) -> Dict:
+        """经济数据库服务：缺口增量同步后从本地存储读取"""
+        start = _to_date(start_date)
+        end = _to_date(end_date)
+
+        self._sync(indicators, start, end)
+        with self._lock:
+            tables = [self._build_table(i, _to_str(start), _to_str(end)) for i in indicators]
+
+        return build_edb_response(tables, indicators, _to_str(start), _to_str(end))
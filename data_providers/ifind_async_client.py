@@ -0,0 +1,311 @@
+# data_providers/ifind_async_client.py
+import asyncio
+import json
+import time
+import httpx
+import pandas as pd
+from typing import Callable, List, Optional, Dict
+import logging
+import os
+
+from .ifind_http_client import IFinDClientBase
+from .ifind_edb_utils import merge_edb_results
+from .ifind_table_parser import edb_table_to_frame, edb_result_to_frames, merge_edb_frames
+from .ifind_stream import StreamingResponseDecoder
+from .single_flight import SingleFlight
+from .edb_cache import EDBIndicatorCache
+from .rate_limiter import EndpointRateLimiter, RetryPolicy
+from .replay import ReplayRecorder
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncIFinDHTTPClient(IFinDClientBase):
+    """
+    iFinD HTTP API 异步客户端
+
+    与 IFinDHTTPClient 提供相同的接口（均为协程），基于 httpx.AsyncClient 复用连接，
+    并通过信号量限制同时在途的请求数，以便在 iFinD 限流范围内并发拉取多组数据：
+    - IFIND_MAX_CONCURRENCY: 最大并发请求数（默认 8）
+    - IFIND_POOL_MAXSIZE: 最大连接数（默认 10）
+    - IFIND_REQUEST_TIMEOUT: 请求超时秒数（默认 30）
+
+    限流与重试同 IFinDHTTPClient；退避等待期间不占用并发信号量。
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        timeout: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        edb_chunk_size: Optional[int] = None,
+        edb_date_chunk_days: Optional[int] = None,
+        single_flight: Optional[SingleFlight] = None,
+        edb_cache: Optional[EDBIndicatorCache] = None,
+        use_edb_cache: bool = True,
+        rate_limiter: Optional[EndpointRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        replay: Optional[ReplayRecorder] = None
+    ):
+        super().__init__(
+            timeout=timeout,
+            edb_chunk_size=edb_chunk_size,
+            edb_date_chunk_days=edb_date_chunk_days,
+            single_flight=single_flight,
+            edb_cache=edb_cache,
+            use_edb_cache=use_edb_cache,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            replay=replay
+        )
+
+        self.max_concurrency = max_concurrency or int(os.getenv("IFIND_MAX_CONCURRENCY", "8"))
+        self.max_connections = max_connections or int(os.getenv("IFIND_POOL_MAXSIZE", "10"))
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """延迟创建 httpx.AsyncClient，使客户端可在事件循环之外构造"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                transport=self._transport
+            )
+        return self._client
+
+    async def aclose(self):
+        """关闭底层连接池"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def _make_request(self, endpoint: str, data: Dict) -> Dict:
+        """发送HTTP请求（相同的在途请求只发送一次，包括其他线程中的同步请求）"""
+        key = self._request_key(endpoint, data)
+        return await self.single_flight.do_async(
+            key, lambda: self.replay.call_async("ifind", endpoint, data, lambda: self._send_request(endpoint, data))
+        )
+
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, httpx.TransportError):
+            return True
+        return super()._is_retryable(error)
+
+    async def _send_request(self, endpoint: str, data: Dict, on_table: Optional[Callable] = None) -> Dict:
+        """发送HTTP请求（限流，可重试错误按指数退避重试）"""
+        attempt = 0
+        refreshed = False
+        while True:
+            await self.rate_limiter.acquire_async(endpoint)
+            token = await asyncio.to_thread(self.token_manager.get_token)
+            try:
+                result = await self._post(endpoint, data, token, on_table)
+            except Exception as e:
+                if self._is_token_expired(e) and not refreshed:
+                    logger.warning(f"{endpoint} access_token 已失效，刷新后重放请求")
+                    await asyncio.to_thread(self.token_manager.refresh, token)
+                    refreshed = True
+                    continue
+                delay = self._retry_delay(endpoint, attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            self.rate_limiter.on_success(endpoint)
+            return result
+
+    async def _post(self, endpoint: str, data: Dict, token: str, on_table: Optional[Callable] = None) -> Dict:
+        """发送一次HTTP请求（受并发信号量约束，流式解码时 tables 中的每一项经 on_table 转换）"""
+        url = f"{self.base_url}/{endpoint}"
+
+        async with self._semaphore:
+            try:
+                logger.info(f"发送异步请求到: {url}")
+                logger.info(f"请求数据: {data}")
+
+                async with self._get_client().stream("POST", url, json=data, headers={"access_token": token}) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        raise self._http_error(response.status_code, response.text, response.headers.get("Retry-After"))
+
+                    if self.stream_decode:
+                        decoder = StreamingResponseDecoder(on_table)
+                        async for chunk in response.aiter_bytes(self.stream_chunk_size):
+                            decoder.feed(chunk)
+                        result = decoder.close()
+                    else:
+                        result = json.loads(await response.aread())
+
+                return self._check_result(result)
+
+            except httpx.HTTPError as e:
+                logger.error(f"网络请求失败: {e}")
+                raise
+            except Exception as e:
+                logger.error(f"请求失败: {e}")
+                raise
+
+    async def get_history_quotation(
+        self,
+        codes: List[str],
+        indicators: List[str],
+        start_date: str,
+        end_date: str,
+        functionpara: Optional[Dict] = None
+    ) -> Dict:
+        """历史行情服务"""
+        data = self._history_quotation_payload(codes, indicators, start_date, end_date, functionpara)
+        return await self._make_request("cmd_history_quotation", data)
+
+    async def get_real_time_quotation(
+        self,
+        codes: List[str],
+        indicators: List[str] = None
+    ) -> Dict:
+        """实时行情服务"""
+        data = self._real_time_quotation_payload(codes, indicators)
+        return await self._make_request("real_time_quotation", data)
+
+    async def get_basic_data(
+        self,
+        codes: List[str],
+        indipara: List[Dict],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        functionpara: Optional[Dict] = None
+    ) -> Dict:
+        """基础数据服务"""
+        data = self._basic_data_payload(codes, indipara, start_date, end_date, functionpara)
+        return await self._make_request("basic_data_service", data)
+
+    async def get_date_sequence(
+        self,
+        codes: List[str],
+        indipara: List[Dict],
+        start_date: str,
+        end_date: str,
+        functionpara: Optional[Dict] = None
+    ) -> Dict:
+        """日期序列服务"""
+        data = self._date_sequence_payload(codes, indipara, start_date, end_date, functionpara)
+        return await self._make_request("date_sequence", data)
+
+    async def get_edb_data(
+        self,
+        indicators: List[str],
+        start_date: str,
+        end_date: str
+    ) -> Dict:
+        """经济数据库服务（按指标缓存，大请求自动拆分并发获取后合并）"""
+        if self.edb_cache is None:
+            return await self._fetch_edb_data(indicators, start_date, end_date)
+
+        cached, missing = self.edb_cache.lookup(indicators, start_date, end_date)
+        fetched = await self._fetch_edb_data(missing, start_date, end_date) if missing else None
+        return self._complete_edb_response(indicators, start_date, end_date, cached, fetched)
+
+    async def _fetch_edb_data(
+        self,
+        indicators: List[str],
+        start_date: str,
+        end_date: str
+    ) -> Dict:
+        """拆分获取EDB数据并合并"""
+        chunks = self._plan_edb_chunks(indicators, start_date, end_date)
+        if len(chunks) == 1:
+            return await self._fetch_edb_chunk(*chunks[0])
+
+        logger.info(f"EDB请求拆分为 {len(chunks)} 个子请求")
+        results = await asyncio.gather(*(self._fetch_edb_chunk(*chunk) for chunk in chunks))
+
+        return merge_edb_results(list(results), indicators, start_date, end_date)
+
+    async def _fetch_edb_chunk(self, indicators: List[str], start_date: str, end_date: str) -> Dict:
+        """获取单个EDB子请求并记录耗时"""
+        started = time.perf_counter()
+        result = await self._make_request("edb_service", self._edb_payload(indicators, start_date, end_date))
+        self._record_chunk_timing(
+            indicators, start_date, end_date, time.perf_counter() - started, self._edb_data_points(result)
+        )
+        return result
+
+    async def get_edb_frames(
+        self,
+        indicators: List[str],
+        start_date: str,
+        end_date: str,
+        to_frame: Callable[[Dict], pd.DataFrame] = edb_table_to_frame
+    ) -> Dict[str, pd.DataFrame]:
+        """经济数据库服务，返回 指标ID -> DataFrame（同 IFinDHTTPClient.get_edb_frames）"""
+        if not self._streams_edb_frames():
+            return edb_result_to_frames(await self.get_edb_data(indicators, start_date, end_date), to_frame)
+
+        chunks = self._plan_edb_chunks(indicators, start_date, end_date)
+        if len(chunks) > 1:
+            logger.info(f"EDB请求拆分为 {len(chunks)} 个子请求")
+        parts = await asyncio.gather(*(self._fetch_edb_frames_chunk(*chunk, to_frame) for chunk in chunks))
+        return merge_edb_frames(list(parts), indicators)
+
+    async def _fetch_edb_frames_chunk(
+        self,
+        indicators: List[str],
+        start_date: str,
+        end_date: str,
+        to_frame: Callable[[Dict], pd.DataFrame]
+    ) -> Dict[str, pd.DataFrame]:
+        """获取单个EDB子请求，解码时逐个转换为 DataFrame"""
+        started = time.perf_counter()
+        data = self._edb_payload(indicators, start_date, end_date)
+        on_table = self._frame_entry(to_frame)
+        result = await self.single_flight.do_async(
+            self._edb_frames_key(data, to_frame), lambda: self._send_request("edb_service", data, on_table)
+        )
+        frames = dict(result.get("tables") or [])
+        self._record_chunk_timing(
+            indicators, start_date, end_date, time.perf_counter() - started, sum(len(f) for f in frames.values())
+        )
+        return frames
+
+    async def get_edb_data_by_groups(
+        self,
+        indicator_groups: Dict[str, List[str]],
+        start_date: str,
+        end_date: str
+    ) -> Dict[str, Dict]:
+        """
+        并发获取多组EDB指标
+
+        Args:
+            indicator_groups: 分组名 -> 指标ID列表，如 IFindEDBMapping.edb_groups
+            start_date: 开始日期 (YYYY-MM-DD)
+            end_date: 结束日期 (YYYY-MM-DD)
+
+        Returns:
+            分组名 -> API响应；失败的分组对应的值为异常对象
+        """
+        names = list(indicator_groups.keys())
+        results = await asyncio.gather(
+            *(self.get_edb_data(indicator_groups[name], start_date, end_date) for name in names),
+            return_exceptions=True
+        )
+
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.error(f"分组 {name} 获取失败: {result}")
+
+        return dict(zip(names, results))
@@ -0,0 +1,214 @@
+# data_providers/ifind_edb_utils.py
+"""
+EDB 请求拆分与响应合并工具
+
+edb_service 的响应中每个指标对应一个 table：
+    {"id": ["S002861328"], "time": [...], "value": [...], "rtime": [...], "index_name": [...]}
+其中 time 按日期降序排列，除 id 外的列表字段与 time 等长。
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+EDBChunk = Tuple[List[str], str, str]
+
+
+def split_date_range(start_date: str, end_date: str, max_days: Optional[int]) -> List[Tuple[str, str]]:
+    """将日期区间按最大天数拆分为连续、不重叠的子区间（按时间升序）"""
+    if not max_days or max_days <= 0:
+        return [(start_date, end_date)]
+
+    start = datetime.strptime(start_date.replace("-", ""), "%Y%m%d").date()
+    end = datetime.strptime(end_date.replace("-", ""), "%Y%m%d").date()
+
+    windows = []
+    current = start
+    while current <= end:
+        window_end = min(current + timedelta(days=max_days - 1), end)
+        windows.append((current.strftime("%Y-%m-%d"), window_end.strftime("%Y-%m-%d")))
+        current = window_end + timedelta(days=1)
+
+    return windows or [(start_date, end_date)]
+
+
+def plan_edb_chunks(
+    indicators: List[str],
+    start_date: str,
+    end_date: str,
+    chunk_size: Optional[int],
+    date_chunk_days: Optional[int]
+) -> List[EDBChunk]:
+    """
+    将一次EDB请求拆分为若干 (指标列表, 开始日期, 结束日期) 子请求
+
+    Args:
+        indicators: 指标ID列表
+        start_date: 开始日期
+        end_date: 结束日期
+        chunk_size: 每个子请求的最大指标数，None 或 0 表示不按指标拆分
+        date_chunk_days: 每个子请求的最大天数，None 或 0 表示不按日期拆分
+    """
+    if chunk_size and chunk_size > 0:
+        indicator_chunks = [indicators[i:i + chunk_size] for i in range(0, len(indicators), chunk_size)]
+    else:
+        indicator_chunks = [list(indicators)]
+
+    windows = split_date_range(start_date, end_date, date_chunk_days)
+
+    return [
+        (chunk, window_start, window_end)
+        for chunk in indicator_chunks
+        for window_start, window_end in windows
+    ]
+
+
+def table_indicator_id(table: Dict) -> Optional[str]:
+    """获取 table 对应的指标ID"""
+    ids = table.get("id")
+    if isinstance(ids, list) and ids:
+        return ids[0]
+    if isinstance(ids, str):
+        return ids
+    return None
+
+
+def _series_fields(table: Dict) -> List[str]:
+    """与 time 等长的列表字段（value、rtime、index_name 等）"""
+    times = table.get("time") or []
+    return [
+        key for key, values in table.items()
+        if key not in ("id", "time") and isinstance(values, list) and len(values) == len(times)
+    ]
+
+
+def merge_indicator_tables(tables: List[Dict]) -> Dict:
+    """合并同一指标在不同日期区间的 table，按时间去重并降序排列"""
+    if len(tables) == 1:
+        return tables[0]
+
+    fields = []
+    for table in tables:
+        for key in _series_fields(table):
+            if key not in fields:
+                fields.append(key)
+
+    rows: Dict[str, Dict] = {}
+    for table in tables:
+        times = table.get("time") or []
+        for i, time_str in enumerate(times):
+            rows[time_str] = {
+                key: table[key][i] for key in fields
+                if isinstance(table.get(key), list) and len(table[key]) == len(times)
+            }
+
+    ordered_times = sorted(rows.keys(), reverse=True)
+    merged = {key: value for key, value in tables[0].items() if key not in fields and key != "time"}
+    merged["time"] = ordered_times
+    for key in fields:
+        merged[key] = [rows[t].get(key) for t in ordered_times]
+
+    return merged
+
+
+def merge_edb_results(
+    results: List[Dict],
+    indicators: List[str],
+    start_date: str,
+    end_date: str
+) -> Dict:
+    """
+    将多个子请求的响应合并为与单次请求一致的响应
+
+    tables 按 indicators 的顺序排列；同一指标跨日期区间的数据合并为一个 table。
+    """
+    if not results:
+        return {"errorcode": 0, "errmsg": "success", "tables": []}
+    if len(results) == 1:
+        return results[0]
+
+    grouped: Dict[str, List[Dict]] = {}
+    anonymous: List[Dict] = []
+    for result in results:
+        for table in result.get("tables") or []:
+            indicator_id = table_indicator_id(table)
+            if indicator_id is None:
+                anonymous.append(table)
+            else:
+                grouped.setdefault(indicator_id, []).append(table)
+
+    tables = []
+    for indicator_id in indicators:
+        if indicator_id in grouped:
+            tables.append(merge_indicator_tables(grouped.pop(indicator_id)))
+    for remaining in grouped.values():
+        tables.append(merge_indicator_tables(remaining))
+    tables.extend(anonymous)
+
+    merged = {key: value for key, value in results[0].items() if key != "tables"}
+    merged["errorcode"] = 0
+    merged["tables"] = tables
+
+    for key in ("perf", "dataVol"):
+        values = [r.get(key) for r in results if isinstance(r.get(key), (int, float))]
+        if values:
+            merged[key] = sum(values)
+
+    if isinstance(merged.get("inputParams"), dict):
+        merged["inputParams"] = {
+            **merged["inputParams"],
+            "indicators": ",".join(indicators),
+            "startdate": start_date.replace("-", ""),
+            "enddate": end_date.replace("-", "")
+        }
+
+    return merged
+
+
+def empty_indicator_table(indicator: str) -> Dict:
+    """无数据指标对应的空 table"""
+    return {"id": [indicator], "time": [], "value": []}
+
+
+def build_edb_response(
+    tables: List[Dict],
+    indicators: List[str],
+    start_date: str,
+    end_date: str,
+    base: Optional[Dict] = None
+) -> Dict:
+    """
+    用逐指标的 table 构造与 edb_service 结构一致的响应
+
+    Args:
+        tables: 按 indicators 顺序排列的 table 列表
+        base: 可选的原始响应，沿用其中 tables 以外的字段（datatype、perf 等）
+    """
+    response = {key: value for key, value in (base or {}).items() if key != "tables"}
+    response["errorcode"] = 0
+    response.setdefault("errmsg", "success")
+    response.setdefault("datatype", [])
+    response["tables"] = tables
+
+    input_params = response.get("inputParams") if isinstance(response.get("inputParams"), dict) else {}
+    response["inputParams"] = {
+        **input_params,
+        "indicators": ",".join(indicators),
+        "startdate": start_date.replace("-", ""),
+        "enddate": end_date.replace("-", "")
+    }
+    response["dataVol"] = sum(len(t.get("time") or []) for t in tables)
+    return response
+
+
+def strip_null_rows(table: Dict) -> Dict:
+    """去掉 value 为空的行（混合频率请求中的填充值）"""
+    values = table.get("value")
+    if not isinstance(values, list) or all(v not in (None, "") for v in values):
+        return table
+
+    keep = [i for i, v in enumerate(values) if v not in (None, "")]
+    fields = _series_fields(table)
+    stripped = {key: value for key, value in table.items() if key not in fields and key != "time"}
+    stripped["time"] = [table["time"][i] for i in keep]
+    for key in fields:
+        stripped[key] = [table[key][i] for i in keep]
+    return stripped
@@ -0,0 +1,87 @@
+# data_providers/ifind_errors.py
+"""
+iFinD API 错误类型与分类
+
+重试/限流相关的错误码可通过环境变量覆盖（逗号分隔）：
+- IFIND_RETRY_ERRORCODES: 可重试的业务错误码
+- IFIND_THROTTLE_ERRORCODES: 表示触发限流/配额的业务错误码
+- IFIND_TOKEN_EXPIRED_ERRORCODES: 表示 access_token 过期/失效的业务错误码
+"""
+import os
+from typing import Optional, Set
+
+RETRYABLE_HTTP_STATUS = {408, 429, 500, 502, 503, 504}
+THROTTLE_HTTP_STATUS = {429}
+
+# 错误信息中出现这些关键词时视为限流
+THROTTLE_KEYWORDS = ("频率", "频繁", "限流", "超限", "流量", "too many", "rate limit", "quota")
+
+
+def _codes_from_env(name: str, default: str) -> Set[int]:
+    raw = os.getenv(name, default)
+    codes = set()
+    for item in raw.split(","):
+        item = item.strip()
+        if item:
+            try:
+                codes.add(int(item))
+            except ValueError:
+                continue
+    return codes
+
+
+RETRYABLE_ERROR_CODES = _codes_from_env("IFIND_RETRY_ERRORCODES", "-1,-4302,-4400,-4401")
+THROTTLE_ERROR_CODES = _codes_from_env("IFIND_THROTTLE_ERRORCODES", "-4302,-4400,-4401")
+TOKEN_EXPIRED_ERROR_CODES = _codes_from_env("IFIND_TOKEN_EXPIRED_ERRORCODES", "-1302")
+
+
+class IFinDAPIError(Exception):
+    """iFinD 接口错误（HTTP 状态码非 200 或业务错误码非 0）"""
+
+    def __init__(
+        self,
+        message: str,
+        errorcode: Optional[int] = None,
+        errmsg: str = "",
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None
+    ):
+        super().__init__(message)
+        self.errorcode = errorcode
+        self.errmsg = errmsg or ""
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def throttled(self) -> bool:
+        """是否为限流/配额类错误"""
+        if self.status_code in THROTTLE_HTTP_STATUS:
+            return True
+        if self.errorcode in THROTTLE_ERROR_CODES:
+            return True
+        message = self.errmsg.lower()
+        return any(keyword in message for keyword in THROTTLE_KEYWORDS)
+
+    @property
+    def token_expired(self) -> bool:
+        """是否为 access_token 过期/失效"""
+        return self.errorcode in TOKEN_EXPIRED_ERROR_CODES
+
+    @property
+    def retryable(self) -> bool:
+        """是否值得重试"""
+        if self.throttled:
+            return True
+        if self.status_code in RETRYABLE_HTTP_STATUS:
+            return True
+        return self.errorcode in RETRYABLE_ERROR_CODES
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 响应头（仅支持秒数）"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
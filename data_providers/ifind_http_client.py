@@ -1,78 +1,341 @@
 # data_providers/ifind_http_client.py
+import numpy as np
+import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 import json
-from typing import List, Optional, Dict, Any
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Optional, Dict, Any, Callable
 from datetime import datetime, date
 import logging
 import os
+import threading
+
+from .ifind_edb_utils import (
+    plan_edb_chunks,
+    merge_edb_results,
+    table_indicator_id,
+    empty_indicator_table,
+    build_edb_response
+)
+from .single_flight import SingleFlight, default_single_flight
+from .edb_cache import EDBIndicatorCache
+from .ifind_errors import IFinDAPIError, parse_retry_after
+from .rate_limiter import EndpointRateLimiter, RetryPolicy, default_rate_limiter
+from .base import DataProvider
+from .replay import ReplayRecorder, get_replay_recorder
+from .ifind_token import get_token_manager
+from .ifind_stream import decode_stream
+from .ifind_table_parser import quotation_table_to_frame, edb_table_to_frame, edb_result_to_frames, merge_edb_frames
+from config.settings import settings
+from schemas.timeseries import TimeSeriesFrame
 
 logger = logging.getLogger(__name__)
 
-class IFinDHTTPClient:
+
+class ConnectionStats:
+    """连接池复用统计（线程安全）"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+    
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+    
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+    
+    def snapshot(self) -> Dict[str, int]:
+        """返回当前统计：请求总数、新建连接数、复用连接的请求数"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": max(self.requests - self.new_connections, 0)
+            }
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    """新建连接时计数的HTTP连接池"""
+    
+    def __init__(self, *args, stats: Optional[ConnectionStats] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats = stats
+    
+    def _new_conn(self):
+        if self._stats is not None:
+            self._stats.record_new_connection()
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    """新建连接时计数的HTTPS连接池"""
+    
+    def __init__(self, *args, stats: Optional[ConnectionStats] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats = stats
+    
+    def _new_conn(self):
+        if self._stats is not None:
+            self._stats.record_new_connection()
+        return super()._new_conn()
+
+
+class PooledHTTPAdapter(HTTPAdapter):
     """
-    iFinD HTTP API 客户端 - 修正版
+    带连接计数的连接池适配器
+    
+    pool_connections 控制缓存的主机连接池数量，pool_maxsize 控制单个主机的最大连接数，
+    pool_block=True 时超过上限的请求会等待空闲连接，而不是临时新建连接。
     """
     
-    def __init__(self):
-        self.access_token = os.getenv("IFIND_ACCESS_TOKEN")
+    def __init__(self, stats: ConnectionStats, **kwargs):
+        # init_poolmanager 在父类 __init__ 中调用，需先设置 stats
+        self.stats = stats
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": partial(_CountingHTTPConnectionPool, stats=self.stats),
+            "https": partial(_CountingHTTPSConnectionPool, stats=self.stats),
+        }
+
+
+class IFinDClientBase:
+    """
+    iFinD HTTP API 客户端公共部分：认证信息、请求体构造与响应校验
+    
+    同步客户端 IFinDHTTPClient 与异步客户端 AsyncIFinDHTTPClient 共享本类，
+    只各自实现 HTTP 发送逻辑。
+    
+    指标过多或日期跨度过长的EDB请求会被拆分为多个子请求并发获取，再合并为一个响应：
+    - IFIND_EDB_CHUNK_SIZE: 每个子请求的最大指标数（默认 50，0 表示不拆分）
+    - IFIND_EDB_DATE_CHUNK_DAYS: 每个子请求的最大天数（默认 1825，0 表示不拆分）
+    
+    相同的在途请求（端点与参数均相同）通过 single-flight 合并为一次HTTP请求，
+    默认所有客户端实例共享同一个合并器。
+    
+    EDB结果按指标缓存（settings.CACHE_ENABLED 为 True 时默认开启），
+    可传入共享的 EDBIndicatorCache，或以 use_edb_cache=False 关闭缓存。
+    
+    响应体默认按块流式解码（tables 逐个解析，不在内存中保留完整响应文本）：
+    - IFIND_STREAM_DECODE: 是否流式解码（默认 true，false 时使用 response.json()）
+    - IFIND_STREAM_CHUNK_SIZE: 每次读取的字节数（默认 65536）
+    get_edb_data 返回的仍是完整的 tables；需要 DataFrame 的调用方使用 get_edb_frames，
+    每个 table 解析完即转换为列式 DataFrame，不保留原始 table。
+    
+    access_token 过期时使用 IFIND_REFRESH_TOKEN 自动刷新并重放请求，令牌在所有
+    客户端实例和进程间共享，见 ifind_token.py。
+    
+    每个端点的请求经过令牌桶限流（默认所有客户端共享 default_rate_limiter），
+    限流、5xx、网络错误等可重试错误按带抖动的指数退避重试，见 rate_limiter.py。
+    
+    DATA_REPLAY_MODE=record 时每个成功的请求都会录制到本地归档，replay 时直接从
+    归档返回（不经过限流与令牌），见 replay.py。
+    """
+    
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        edb_chunk_size: Optional[int] = None,
+        edb_date_chunk_days: Optional[int] = None,
+        single_flight: Optional[SingleFlight] = None,
+        edb_cache: Optional[EDBIndicatorCache] = None,
+        use_edb_cache: bool = True,
+        rate_limiter: Optional[EndpointRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        replay: Optional[ReplayRecorder] = None
+    ):
+        access_token = os.getenv("IFIND_ACCESS_TOKEN")
         self.refresh_token = os.getenv("IFIND_REFRESH_TOKEN")
+        self.replay = replay or get_replay_recorder()
         
-        if not self.access_token:
+        # 回放模式不访问网络，无需凭证
+        if not access_token and not self.refresh_token and not self.replay.replaying:
             raise ValueError("请在 .env 中设置 IFIND_ACCESS_TOKEN")
         
         self.base_url = os.getenv("IFIND_BASE_URL", "https://quantapi.51ifind.com/api/v1")
+        self.token_manager = get_token_manager(self.base_url, access_token, self.refresh_token)
         self.headers = {
             "Content-Type": "application/json",
-            "access_token": self.access_token
+            "Connection": "keep-alive"
         }
-    
-    def _make_request(self, endpoint: str, data: Dict) -> Dict:
-        """发送HTTP请求"""
-        url = f"{self.base_url}/{endpoint}"
+        self.timeout = timeout or float(os.getenv("IFIND_REQUEST_TIMEOUT", "30"))
+        self.stream_decode = os.getenv("IFIND_STREAM_DECODE", "true").lower() == "true"
+        self.stream_chunk_size = int(os.getenv("IFIND_STREAM_CHUNK_SIZE", "65536"))
         
-        try:
-            logger.info(f"发送请求到: {url}")
-            logger.info(f"请求数据: {data}")
-            
-            response = requests.post(
-                url=url,
-                json=data,
-                headers=self.headers,
-                timeout=30
-            )
-            
-            if response.status_code != 200:
-                error_msg = f"HTTP请求失败: {response.status_code}, {response.text}"
-                logger.error(error_msg)
-                raise Exception(error_msg)
-            
-            result = response.json()
-            logger.info(f"API响应错误码: {result.get('errorcode', 'N/A')}")
-            
-            # 检查错误码
-            if result.get('errorcode', 0) != 0:
-                error_msg = f"API错误: {result.get('errmsg', 'Unknown error')}"
-                logger.error(error_msg)
-                raise Exception(error_msg)
-            
-            return result
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"网络请求失败: {e}")
-            raise
-        except Exception as e:
-            logger.error(f"请求失败: {e}")
-            raise
+        if edb_chunk_size is None:
+            edb_chunk_size = int(os.getenv("IFIND_EDB_CHUNK_SIZE", "50"))
+        if edb_date_chunk_days is None:
+            edb_date_chunk_days = int(os.getenv("IFIND_EDB_DATE_CHUNK_DAYS", "1825"))
+        self.edb_chunk_size = edb_chunk_size
+        self.edb_date_chunk_days = edb_date_chunk_days
+        self.chunk_timings = deque(maxlen=500)
+        self.single_flight = single_flight or default_single_flight
+        
+        if not use_edb_cache:
+            edb_cache = None
+        elif edb_cache is None and settings.CACHE_ENABLED:
+            edb_cache = EDBIndicatorCache()
+        self.edb_cache = edb_cache
+        
+        self.rate_limiter = rate_limiter or default_rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
     
-    def get_history_quotation(
+    def _complete_edb_response(
         self,
+        indicators: List[str],
+        start_date: str,
+        end_date: str,
+        cached: Dict[str, Dict],
+        fetched: Optional[Dict]
+    ) -> Dict:
+        """将缓存命中的 table 与新获取的结果按请求顺序组装为完整响应，并回填缓存"""
+        fetched_tables = {}
+        if fetched:
+            fetched_tables = {table_indicator_id(t): t for t in fetched.get("tables") or []}
+            for indicator in indicators:
+                if indicator not in cached:
+                    table = fetched_tables.get(indicator) or empty_indicator_table(indicator)
+                    self.edb_cache.put(indicator, start_date, end_date, table)
+        
+        tables = [
+            cached.get(indicator) or fetched_tables.get(indicator) or empty_indicator_table(indicator)
+            for indicator in indicators
+        ]
+        logger.info(f"EDB缓存命中 {len(cached)}/{len(indicators)} 个指标")
+        return build_edb_response(tables, indicators, start_date, end_date, base=fetched)
+    
+    @property
+    def access_token(self) -> str:
+        """当前使用的 access_token"""
+        return self.token_manager.get_token()
+    
+    def get_cache_stats(self) -> Dict:
+        """获取EDB缓存统计"""
+        return self.edb_cache.get_stats() if self.edb_cache else {}
+    
+    def get_rate_limit_state(self) -> Dict[str, Dict]:
+        """获取各端点的限流状态（当前速率、剩余令牌、限流次数等）"""
+        return self.rate_limiter.get_state()
+    
+    @staticmethod
+    def _is_token_expired(error: Exception) -> bool:
+        return isinstance(error, IFinDAPIError) and error.token_expired
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        """是否为可重试错误，子类补充各自HTTP库的网络异常"""
+        return isinstance(error, IFinDAPIError) and error.retryable
+    
+    def _retry_delay(self, endpoint: str, attempt: int, error: Exception) -> Optional[float]:
+        """
+        处理一次失败的请求：限流时降低端点速率，并计算重试前的等待时间
+        
+        Returns:
+            等待秒数；不可重试或已达最大重试次数时返回 None
+        """
+        retry_after = getattr(error, "retry_after", None)
+        if isinstance(error, IFinDAPIError) and error.throttled:
+            self.rate_limiter.on_throttle(endpoint, retry_after)
+        
+        if not self._is_retryable(error) or attempt >= self.retry_policy.max_retries:
+            return None
+        
+        delay = self.retry_policy.delay(attempt, retry_after)
+        logger.warning(f"{endpoint} 请求失败，{delay:.2f}s 后第 {attempt + 1} 次重试: {error}")
+        return delay
+    
+    @staticmethod
+    def _http_error(status_code: int, text: str, retry_after: Optional[str] = None) -> IFinDAPIError:
+        """HTTP状态码非200时的异常"""
+        error_msg = f"HTTP请求失败: {status_code}, {text}"
+        logger.error(error_msg)
+        return IFinDAPIError(
+            error_msg,
+            errmsg=text,
+            status_code=status_code,
+            retry_after=parse_retry_after(retry_after)
+        )
+    
+    def _request_key(self, endpoint: str, data: Dict) -> tuple:
+        """在途请求合并的键：服务地址、端点与规范化后的请求参数"""
+        return (self.base_url, endpoint, json.dumps(data, sort_keys=True, ensure_ascii=False))
+    
+    def _plan_edb_chunks(self, indicators: List[str], start_date: str, end_date: str) -> List:
+        """按配置拆分EDB请求"""
+        return plan_edb_chunks(indicators, start_date, end_date, self.edb_chunk_size, self.edb_date_chunk_days)
+    
+    def _record_chunk_timing(self, indicators: List[str], start_date: str, end_date: str, elapsed: float, data_points: int):
+        """记录单个子请求的耗时，用于调整拆分粒度"""
+        timing = {
+            "indicators": len(indicators),
+            "start_date": start_date,
+            "end_date": end_date,
+            "elapsed": round(elapsed, 4),
+            "data_points": data_points
+        }
+        self.chunk_timings.append(timing)
+        logger.info(f"EDB子请求耗时: {timing}")
+    
+    def get_chunk_timings(self) -> List[Dict]:
+        """获取最近的EDB子请求耗时记录"""
+        return list(self.chunk_timings)
+    
+    @staticmethod
+    def _edb_data_points(result: Dict) -> int:
+        return sum(len(t.get("time") or []) for t in result.get("tables") or [])
+    
+    def _streams_edb_frames(self) -> bool:
+        """
+        get_edb_frames 能否在解码时逐个转换 table
+        
+        EDB缓存与录制/回放保存的是原始 table，启用时（或未启用流式解码时）
+        先经 get_edb_data 得到完整响应再转换。
+        """
+        return (
+            self.stream_decode
+            and self.edb_cache is None
+            and not (self.replay.recording or self.replay.replaying)
+        )
+    
+    @staticmethod
+    def _frame_entry(to_frame: Callable[[Dict], pd.DataFrame]) -> Callable[[Dict], tuple]:
+        """流式解码的 on_table：table -> (指标ID, DataFrame)"""
+        return lambda table: (table_indicator_id(table), to_frame(table))
+    
+    def _edb_frames_key(self, data: Dict, to_frame: Callable) -> tuple:
+        """get_edb_frames 的在途请求合并键，与 get_edb_data 的请求（结果为原始 table）区分"""
+        return self._request_key("edb_service", data) + ("frames", to_frame)
+    
+    def _check_result(self, result: Dict) -> Dict:
+        """校验API错误码"""
+        logger.info(f"API响应错误码: {result.get('errorcode', 'N/A')}")
+        
+        if result.get('errorcode', 0) != 0:
+            errmsg = result.get('errmsg', 'Unknown error')
+            error_msg = f"API错误: {errmsg}"
+            logger.error(error_msg)
+            raise IFinDAPIError(error_msg, errorcode=result.get('errorcode'), errmsg=str(errmsg))
+        
+        return result
+    
+    @staticmethod
+    def _history_quotation_payload(
         codes: List[str],
         indicators: List[str],
         start_date: str,
         end_date: str,
         functionpara: Optional[Dict] = None
     ) -> Dict:
-        """历史行情服务"""
         data = {
             "codes": ",".join(codes),
             "indicators": ",".join(indicators),
@@ -83,14 +346,13 @@ class IFinDHTTPClient:
         if functionpara:
             data["functionpara"] = functionpara
         
-        return self._make_request("cmd_history_quotation", data)
+        return data
     
-    def get_real_time_quotation(
-        self,
+    @staticmethod
+    def _real_time_quotation_payload(
         codes: List[str],
         indicators: List[str] = None
     ) -> Dict:
-        """实时行情服务"""
         data = {
             "codes": ",".join(codes)
         }
@@ -100,17 +362,16 @@ class IFinDHTTPClient:
         else:
             data["indicators"] = "latest"
         
-        return self._make_request("real_time_quotation", data)
+        return data
     
-    def get_basic_data(
-        self,
+    @staticmethod
+    def _basic_data_payload(
         codes: List[str],
         indipara: List[Dict],
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         functionpara: Optional[Dict] = None
     ) -> Dict:
-        """基础数据服务"""
         data = {
             "codes": ",".join(codes),
             "indipara": indipara
@@ -123,17 +384,16 @@ class IFinDHTTPClient:
         if functionpara:
             data["functionpara"] = functionpara
         
-        return self._make_request("basic_data_service", data)
+        return data
     
-    def get_date_sequence(
-        self,
+    @staticmethod
+    def _date_sequence_payload(
         codes: List[str],
         indipara: List[Dict],
         start_date: str,
         end_date: str,
         functionpara: Optional[Dict] = None
     ) -> Dict:
-        """日期序列服务"""
         data = {
             "codes": ",".join(codes),
             "startdate": start_date.replace("-", ""),
@@ -144,27 +404,308 @@ class IFinDHTTPClient:
         if functionpara:
             data["functionpara"] = functionpara
         
-        return self._make_request("date_sequence", data)
+        return data
     
-    def get_edb_data(
-        self,
+    @staticmethod
+    def _edb_payload(
         indicators: List[str],
         start_date: str,
         end_date: str
     ) -> Dict:
-        """经济数据库服务"""
-        data = {
+        return {
             "indicators": ",".join(indicators),
             "startdate": start_date.replace("-", ""),
             "enddate": end_date.replace("-", "")
         }
+
+
+class IFinDHTTPClient(IFinDClientBase):
+    """
+    iFinD HTTP API 客户端 - 修正版
+    
+    所有请求复用同一个 requests.Session（HTTP keep-alive + 连接池），
+    避免每次调用都重新进行 TCP/TLS 握手。连接池参数可通过构造参数或环境变量配置：
+    - IFIND_POOL_CONNECTIONS: 缓存的主机连接池数量（默认 4）
+    - IFIND_POOL_MAXSIZE: 单个主机的最大连接数（默认 10）
+    - IFIND_POOL_BLOCK: 连接数达到上限时是否阻塞等待（默认 false）
+    - IFIND_REQUEST_TIMEOUT: 请求超时秒数（默认 30）
+    - IFIND_EDB_CHUNK_WORKERS: 并发获取EDB子请求的线程数（默认 4）
+    """
+    
+    def __init__(
+        self,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        pool_block: Optional[bool] = None,
+        timeout: Optional[float] = None,
+        edb_chunk_size: Optional[int] = None,
+        edb_date_chunk_days: Optional[int] = None,
+        edb_chunk_workers: Optional[int] = None,
+        single_flight: Optional[SingleFlight] = None,
+        edb_cache: Optional[EDBIndicatorCache] = None,
+        use_edb_cache: bool = True,
+        rate_limiter: Optional[EndpointRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        replay: Optional[ReplayRecorder] = None
+    ):
+        super().__init__(
+            timeout=timeout,
+            edb_chunk_size=edb_chunk_size,
+            edb_date_chunk_days=edb_date_chunk_days,
+            single_flight=single_flight,
+            edb_cache=edb_cache,
+            use_edb_cache=use_edb_cache,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            replay=replay
+        )
+        self.edb_chunk_workers = edb_chunk_workers or int(os.getenv("IFIND_EDB_CHUNK_WORKERS", "4"))
         
-        return self._make_request("edb_service", data)
+        self.pool_connections = pool_connections or int(os.getenv("IFIND_POOL_CONNECTIONS", "4"))
+        self.pool_maxsize = pool_maxsize or int(os.getenv("IFIND_POOL_MAXSIZE", "10"))
+        if pool_block is None:
+            pool_block = os.getenv("IFIND_POOL_BLOCK", "false").lower() == "true"
+        self.pool_block = pool_block
+        
+        self.connection_stats = ConnectionStats()
+        self.session = self._create_session()
+    
+    def _create_session(self) -> requests.Session:
+        """创建带连接池的会话"""
+        session = requests.Session()
+        adapter = PooledHTTPAdapter(
+            stats=self.connection_stats,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(self.headers)
+        return session
+    
+    def get_connection_stats(self) -> Dict[str, int]:
+        """获取连接复用统计"""
+        return self.connection_stats.snapshot()
+    
+    def close(self):
+        """关闭会话，释放连接池中的连接"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _make_request(self, endpoint: str, data: Dict) -> Dict:
+        """发送HTTP请求（相同的在途请求只发送一次）"""
+        key = self._request_key(endpoint, data)
+        return self.single_flight.do(
+            key, lambda: self.replay.call("ifind", endpoint, data, lambda: self._send_request(endpoint, data))
+        )
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True
+        return super()._is_retryable(error)
+    
+    def _send_request(self, endpoint: str, data: Dict, on_table: Optional[Callable] = None) -> Dict:
+        """发送HTTP请求（限流，可重试错误按指数退避重试）"""
+        attempt = 0
+        refreshed = False
+        while True:
+            self.rate_limiter.acquire(endpoint)
+            token = self.token_manager.get_token()
+            try:
+                result = self._post(endpoint, data, token, on_table)
+            except Exception as e:
+                if self._is_token_expired(e) and not refreshed:
+                    logger.warning(f"{endpoint} access_token 已失效，刷新后重放请求")
+                    self.token_manager.refresh(token)
+                    refreshed = True
+                    continue
+                delay = self._retry_delay(endpoint, attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            
+            self.rate_limiter.on_success(endpoint)
+            return result
+    
+    def _post(self, endpoint: str, data: Dict, token: str, on_table: Optional[Callable] = None) -> Dict:
+        """发送一次HTTP请求（流式解码时 tables 中的每一项经 on_table 转换）"""
+        url = f"{self.base_url}/{endpoint}"
+        
+        try:
+            logger.info(f"发送请求到: {url}")
+            logger.info(f"请求数据: {data}")
+            
+            self.connection_stats.record_request()
+            with self.session.post(
+                url=url,
+                json=data,
+                headers={"access_token": token},
+                timeout=self.timeout,
+                stream=self.stream_decode
+            ) as response:
+                if response.status_code != 200:
+                    raise self._http_error(response.status_code, response.text, response.headers.get("Retry-After"))
+                
+                if self.stream_decode:
+                    result = decode_stream(response.iter_content(chunk_size=self.stream_chunk_size), on_table)
+                else:
+                    result = response.json()
+            logger.debug(f"连接复用统计: {self.get_connection_stats()}")
+            
+            return self._check_result(result)
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"网络请求失败: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"请求失败: {e}")
+            raise
+    
+    def get_history_quotation(
+        self,
+        codes: List[str],
+        indicators: List[str],
+        start_date: str,
+        end_date: str,
+        functionpara: Optional[Dict] = None
+    ) -> Dict:
+        """历史行情服务"""
+        data = self._history_quotation_payload(codes, indicators, start_date, end_date, functionpara)
+        return self._make_request("cmd_history_quotation", data)
+    
+    def get_real_time_quotation(
+        self,
+        codes: List[str],
+        indicators: List[str] = None
+    ) -> Dict:
+        """实时行情服务"""
+        data = self._real_time_quotation_payload(codes, indicators)
+        return self._make_request("real_time_quotation", data)
+    
+    def get_basic_data(
+        self,
+        codes: List[str],
+        indipara: List[Dict],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        functionpara: Optional[Dict] = None
+    ) -> Dict:
+        """基础数据服务"""
+        data = self._basic_data_payload(codes, indipara, start_date, end_date, functionpara)
+        return self._make_request("basic_data_service", data)
+    
+    def get_date_sequence(
+        self,
+        codes: List[str],
+        indipara: List[Dict],
+        start_date: str,
+        end_date: str,
+        functionpara: Optional[Dict] = None
+    ) -> Dict:
+        """日期序列服务"""
+        data = self._date_sequence_payload(codes, indipara, start_date, end_date, functionpara)
+        return self._make_request("date_sequence", data)
+    
+    def get_edb_data(
+        self,
+        indicators: List[str],
+        start_date: str,
+        end_date: str
+    ) -> Dict:
+        """经济数据库服务（按指标缓存，大请求自动拆分并发获取后合并）"""
+        if self.edb_cache is None:
+            return self._fetch_edb_data(indicators, start_date, end_date)
+        
+        cached, missing = self.edb_cache.lookup(indicators, start_date, end_date)
+        fetched = self._fetch_edb_data(missing, start_date, end_date) if missing else None
+        return self._complete_edb_response(indicators, start_date, end_date, cached, fetched)
+    
+    def _fetch_edb_data(
+        self,
+        indicators: List[str],
+        start_date: str,
+        end_date: str
+    ) -> Dict:
+        """拆分获取EDB数据并合并"""
+        chunks = self._plan_edb_chunks(indicators, start_date, end_date)
+        if len(chunks) == 1:
+            return self._fetch_edb_chunk(*chunks[0])
+        
+        logger.info(f"EDB请求拆分为 {len(chunks)} 个子请求")
+        with ThreadPoolExecutor(max_workers=min(self.edb_chunk_workers, len(chunks))) as executor:
+            results = list(executor.map(lambda chunk: self._fetch_edb_chunk(*chunk), chunks))
+        
+        return merge_edb_results(results, indicators, start_date, end_date)
+    
+    def _fetch_edb_chunk(self, indicators: List[str], start_date: str, end_date: str) -> Dict:
+        """获取单个EDB子请求并记录耗时"""
+        started = time.perf_counter()
+        result = self._make_request("edb_service", self._edb_payload(indicators, start_date, end_date))
+        self._record_chunk_timing(
+            indicators, start_date, end_date, time.perf_counter() - started, self._edb_data_points(result)
+        )
+        return result
+    
+    def get_edb_frames(
+        self,
+        indicators: List[str],
+        start_date: str,
+        end_date: str,
+        to_frame: Callable[[Dict], pd.DataFrame] = edb_table_to_frame
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        经济数据库服务，返回 指标ID -> DataFrame（默认为 date、value 两列，见 edb_table_to_frame）
+        
+        流式解码时每个 table 解析完即由 to_frame 转换，原始 table 随即丢弃，
+        结果只保留数值列；拆分与请求合并同 get_edb_data。
+        """
+        if not self._streams_edb_frames():
+            return edb_result_to_frames(self.get_edb_data(indicators, start_date, end_date), to_frame)
+        
+        chunks = self._plan_edb_chunks(indicators, start_date, end_date)
+        if len(chunks) == 1:
+            return merge_edb_frames([self._fetch_edb_frames_chunk(*chunks[0], to_frame)], indicators)
+        
+        logger.info(f"EDB请求拆分为 {len(chunks)} 个子请求")
+        with ThreadPoolExecutor(max_workers=min(self.edb_chunk_workers, len(chunks))) as executor:
+            parts = list(executor.map(lambda chunk: self._fetch_edb_frames_chunk(*chunk, to_frame), chunks))
+        return merge_edb_frames(parts, indicators)
+    
+    def _fetch_edb_frames_chunk(
+        self,
+        indicators: List[str],
+        start_date: str,
+        end_date: str,
+        to_frame: Callable[[Dict], pd.DataFrame]
+    ) -> Dict[str, pd.DataFrame]:
+        """获取单个EDB子请求，解码时逐个转换为 DataFrame"""
+        started = time.perf_counter()
+        data = self._edb_payload(indicators, start_date, end_date)
+        on_table = self._frame_entry(to_frame)
+        result = self.single_flight.do(
+            self._edb_frames_key(data, to_frame), lambda: self._send_request("edb_service", data, on_table)
+        )
+        frames = dict(result.get("tables") or [])
+        self._record_chunk_timing(
+            indicators, start_date, end_date, time.perf_counter() - started, sum(len(f) for f in frames.values())
+        )
+        return frames
 
-class IFinDHTTPDataProvider:
+class IFinDHTTPDataProvider(DataProvider):
     """
     iFinD HTTP 数据提供者 - 修正版
     """
+
+    name = "ifind_http_client"
+    trusted_models = True
     
     def __init__(self):
         self.client = IFinDHTTPClient()
@@ -198,7 +739,7 @@ class IFinDHTTPDataProvider:
         end_date: str,
         region: str
     ) -> List:
-        """获取股票历史数据"""
+        """获取股票历史数据（整列解析，返回 TimeSeriesFrame，PriceDataPoint 在访问时才构造）"""
         try:
             # 使用历史行情服务
             result = self.client.get_history_quotation(
@@ -210,51 +751,24 @@ class IFinDHTTPDataProvider:
             )
             
             from schemas.models import PriceDataPoint
-            data_points = []
             
-            if "tables" in result and result["tables"]:
-                for table_data in result["tables"]:
-                    # 解析数据结构
-                    times = table_data.get("time", [])
-                    table_values = table_data.get("table", {})
-                    
-                    # 确保所有指标都有相同长度的时间序列
-                    if not times:
-                        continue
-                    
-                    for i in range(len(times)):
-                        try:
-                            time_str = times[i]
-                            
-                            # 解析日期
-                            if "-" in time_str:
-                                date_obj = datetime.strptime(time_str.split()[0], "%Y-%m-%d").date()
-                            else:
-                                date_obj = datetime.strptime(time_str, "%Y%m%d").date()
-                            
-                            # 获取对应索引的值
-                            open_val = self._safe_float_get(table_values, "open", i)
-                            high_val = self._safe_float_get(table_values, "high", i)
-                            low_val = self._safe_float_get(table_values, "low", i)
-                            close_val = self._safe_float_get(table_values, "close", i)
-                            volume_val = self._safe_int_get(table_values, "volume", i)
-                            
-                            data_point = PriceDataPoint(
-                                date=date_obj,
-                                product=ticker,
-                                price=close_val,
-                                open=open_val,
-                                high=high_val,
-                                low=low_val,
-                                volume=volume_val,
-                                market=region
-                            )
-                            data_points.append(data_point)
-                            
-                        except Exception as e:
-                            logger.warning(f"解析第{i}条数据失败: {e}")
-                            continue
+            fields = ["open", "high", "low", "close", "volume"]
+            frames = [
+                quotation_table_to_frame(table_data, fields)
+                for table_data in result.get("tables") or []
+                if table_data.get("time")
+            ]
+            frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["date"] + fields)
+            # 收盘价为必填字段，缺失的行与原逐行解析一样跳过
+            frame = frame.dropna(subset=["close"]).reset_index(drop=True)
             
+            data_points = TimeSeriesFrame.from_frame(
+                frame.rename(columns={"close": "price"}),
+                model=PriceDataPoint,
+                index_column="date",
+                constants={"product": ticker, "market": region},
+                trusted=self.trusted
+            )
             logger.info(f"成功解析 {len(data_points)} 条股票历史数据")
             return data_points
             
@@ -279,56 +793,29 @@ class IFinDHTTPDataProvider:
         end_date: str,
         region: str
     ) -> List:
-        """获取宏观数据"""
+        """获取宏观数据（整列解析，返回 TimeSeriesFrame，MacroDataPoint 在访问时才构造）"""
         try:
-            result = self.client.get_edb_data(
+            # 流式解码时每个 table 解析完即转换为 DataFrame，不保留原始 table
+            frames = self.client.get_edb_frames(
                 indicators=[indicator_code],
                 start_date=start_date,
-                end_date=end_date
+                end_date=end_date,
+                to_frame=partial(self._macro_table_to_frame, indicator_code=indicator_code)
             )
             
             from schemas.models import MacroDataPoint
-            data_points = []
             
-            if "tables" in result and result["tables"]:
-                for table_data in result["tables"]:
-                    times = table_data.get("time", [])
-                    table_values = table_data.get("table", {})
-                    
-                    if not times:
-                        continue
-                    
-                    for i in range(len(times)):
-                        try:
-                            time_str = times[i]
-                            
-                            if "-" in time_str:
-                                date_obj = datetime.strptime(time_str.split()[0], "%Y-%m-%d").date()
-                            else:
-                                date_obj = datetime.strptime(time_str, "%Y%m%d").date()
-                            
-                            # 对于EDB数据，值可能在不同的字段中
-                            value = self._safe_float_get(table_values, indicator_code, i)
-                            if value is None:
-                                # 尝试其他可能的字段名
-                                for key in table_values.keys():
-                                    value = self._safe_float_get(table_values, key, i)
-                                    if value is not None:
-                                        break
-                            
-                            if value is not None:
-                                data_point = MacroDataPoint(
-                                    date=date_obj,
-                                    indicator_name=indicator_code,
-                                    indicator_value=value,
-                                    region=region
-                                )
-                                data_points.append(data_point)
-                                
-                        except Exception as e:
-                            logger.warning(f"解析宏观数据失败: {e}")
-                            continue
+            frames = list(frames.values())
+            frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["date", "value"])
+            frame = frame.dropna(subset=["value"]).reset_index(drop=True)
             
+            data_points = TimeSeriesFrame.from_frame(
+                frame.rename(columns={"value": "indicator_value"}),
+                model=MacroDataPoint,
+                index_column="date",
+                constants={"indicator_name": indicator_code, "region": region},
+                trusted=self.trusted
+            )
             logger.info(f"成功解析 {len(data_points)} 条宏观数据")
             return data_points
             
@@ -336,6 +823,19 @@ class IFinDHTTPDataProvider:
             logger.error(f"获取宏观数据失败: {e}")
             return []
     
+    @staticmethod
+    def _macro_table_to_frame(table_data: Dict, indicator_code: str) -> pd.DataFrame:
+        """将一个宏观数据 table 解析为 date、value 两列"""
+        if "value" in table_data or not table_data.get("time"):
+            return edb_table_to_frame(table_data)
+        
+        # 非EDB结构：优先取与指标代码同名的列，否则取各列中第一个非空值
+        quotation = quotation_table_to_frame(table_data)
+        columns = [c for c in quotation.columns if c != "date"]
+        columns.sort(key=lambda c: c != indicator_code)
+        value = quotation[columns].bfill(axis=1).iloc[:, 0] if columns else np.nan
+        return pd.DataFrame({"date": quotation["date"], "value": value})
+    
     def _get_generic_history(
         self, 
         ticker: str, 
@@ -355,30 +855,6 @@ class IFinDHTTPDataProvider:
             logger.error(f"获取实时数据失败: {e}")
             return {}
     
-    def _safe_float_get(self, data_dict: Dict, key: str, index: int) -> Optional[float]:
-        """安全获取浮点数值"""
-        try:
-            values = data_dict.get(key, [])
-            if isinstance(values, list) and index < len(values):
-                val = values[index]
-                if val is not None:
-                    return float(val)
-            return None
-        except (ValueError, TypeError):
-            return None
-    
-    def _safe_int_get(self, data_dict: Dict, key: str, index: int) -> Optional[int]:
-        """安全获取整数值"""
-        try:
-            values = data_dict.get(key, [])
-            if isinstance(values, list) and index < len(values):
-                val = values[index]
-                if val is not None:
-                    return int(float(val))  # 先转float再转int，处理小数
-            return None
-        except (ValueError, TypeError):
-            return None
-
 class IFinDHTTPDataTool:
     """iFinD HTTP API 数据获取工具"""
     
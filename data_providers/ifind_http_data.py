@@ -8,7 +8,9 @@ from schemas.models import (
     BasisDataPoint,
     SupplyDemandDataPoint
 )
-from typing import Any, Dict, List, Optional
+from schemas.timeseries import TimeSeriesFrame
+from typing import Any, Dict, List, Optional, Type
+from pydantic import BaseModel
 import pandas as pd
 from datetime import datetime, date
 import logging
@@ -19,6 +21,9 @@ class IFinDHTTPDataProvider(DataProvider):
     """
     iFinD HTTP API 数据提供者
     """
+
+    name = "ifind_http_data"
+    trusted_models = True
     
     def __init__(self):
         self.client = IFinDHTTPClient()
@@ -47,14 +52,32 @@ class IFinDHTTPDataProvider(DataProvider):
             logger.error(f"获取历史数据失败: {e}")
             return []
     
+    def _to_frame(
+        self,
+        rows: List[Dict],
+        model: Type[BaseModel],
+        index_field: str,
+        constants: Dict[str, Any]
+    ) -> TimeSeriesFrame:
+        """逐行解析得到的字段字典 -> TimeSeriesFrame（常量字段只保存一份，模型在访问时才构造）"""
+        columns = [name for name in model.model_fields if name != index_field and name not in constants]
+        frame = pd.DataFrame(rows, columns=[index_field] + columns)
+        return TimeSeriesFrame.from_frame(
+            frame,
+            model=model,
+            index_column=index_field,
+            constants=constants,
+            trusted=self.trusted
+        )
+    
     def _get_stock_history(
         self, 
         ticker: str, 
         start_date: str, 
         end_date: str,
         region: str  # 修正：添加region参数
-    ) -> List[PriceDataPoint]:
-        """获取股票历史数据"""
+    ) -> TimeSeriesFrame:
+        """获取股票历史数据（返回 TimeSeriesFrame，PriceDataPoint 在访问时才构造）"""
         # 使用基础数据函数获取股票历史数据
         indicators = ["ths_close_price_stock", "ths_open_price_stock", 
                      "ths_high_price_stock", "ths_low_price_stock", 
@@ -67,7 +90,7 @@ class IFinDHTTPDataProvider(DataProvider):
             end_date=end_date
         )
         
-        data_points = []
+        rows = []
         if "tables" in result and result["tables"]:
             for table in result["tables"]:
                 if "table" in table and table["table"]:
@@ -77,22 +100,19 @@ class IFinDHTTPDataProvider(DataProvider):
                             if date_str:
                                 # 解析日期字符串，可能需要根据实际返回格式调整
                                 date_obj = datetime.strptime(date_str.split()[0], "%Y-%m-%d").date()
-                                data_point = PriceDataPoint(
+                                rows.append(dict(
                                     date=date_obj,
-                                    product=ticker,
                                     price=float(row.get("ths_close_price_stock", 0)),
                                     open=float(row.get("ths_open_price_stock", 0)),
                                     high=float(row.get("ths_high_price_stock", 0)),
                                     low=float(row.get("ths_low_price_stock", 0)),
-                                    volume=int(row.get("ths_volume_stock", 0)),
-                                    market=region  
-                                )
-                                data_points.append(data_point)
+                                    volume=int(row.get("ths_volume_stock", 0))
+                                ))
                         except Exception as e:
                             logger.warning(f"股票数据转换失败: {e}, row: {row}")
                             continue
         
-        return data_points
+        return self._to_frame(rows, PriceDataPoint, "date", {"product": ticker, "market": region})
     
     def _get_future_history(
         self, 
@@ -100,8 +120,8 @@ class IFinDHTTPDataProvider(DataProvider):
         start_date: str, 
         end_date: str,
         region: str  # 修正：添加region参数
-    ) -> List[FuturesHistoryDataPoint]:
-        """获取期货历史数据"""
+    ) -> TimeSeriesFrame:
+        """获取期货历史数据（返回 TimeSeriesFrame，FuturesHistoryDataPoint 在访问时才构造）"""
         # 期货数据指标
         indicators = ["ths_close_price_fund", "ths_open_price_fund", 
                      "ths_high_price_fund", "ths_low_price_fund", 
@@ -114,7 +134,7 @@ class IFinDHTTPDataProvider(DataProvider):
             end_date=end_date
         )
         
-        data_points = []
+        rows = []
         if "tables" in result and result["tables"]:
             for table in result["tables"]:
                 if "table" in table and table["table"]:
@@ -125,23 +145,20 @@ class IFinDHTTPDataProvider(DataProvider):
                                 dt = datetime.strptime(datetime_str.split()[0], "%Y-%m-%d").date()
                                 # 创建datetime对象（假设是日频数据）
                                 dt_obj = datetime.combine(dt, datetime.min.time())
-                                data_point = FuturesHistoryDataPoint(
+                                rows.append(dict(
                                     datetime=dt_obj,
-                                    product=ticker,
-                                    symbol=ticker,
                                     open=float(row.get("ths_open_price_fund", 0)),
                                     high=float(row.get("ths_high_price_fund", 0)),
                                     low=float(row.get("ths_low_price_fund", 0)),
                                     close=float(row.get("ths_close_price_fund", 0)),
                                     volume=int(row.get("ths_volume_fund", 0)),
                                     open_interest=int(row.get("ths_oi_fund", 0))
-                                )
-                                data_points.append(data_point)
+                                ))
                         except Exception as e:
                             logger.warning(f"期货数据转换失败: {e}, row: {row}")
                             continue
         
-        return data_points
+        return self._to_frame(rows, FuturesHistoryDataPoint, "datetime", {"product": ticker, "symbol": ticker})
     
     def _get_macro_history(
         self, 
@@ -149,15 +166,15 @@ class IFinDHTTPDataProvider(DataProvider):
         start_date: str, 
         end_date: str,
         region: str  # 修正：添加region参数
-    ) -> List[MacroDataPoint]:
-        """获取宏观数据"""
+    ) -> TimeSeriesFrame:
+        """获取宏观数据（返回 TimeSeriesFrame，MacroDataPoint 在访问时才构造）"""
         result = self.client.get_edb_data(
             codes=[indicator_code],
             start_date=start_date,
             end_date=end_date
         )
         
-        data_points = []
+        rows = []
         if "tables" in result and result["tables"]:
             for table in result["tables"]:
                 if "table" in table and table["table"]:
@@ -166,18 +183,15 @@ class IFinDHTTPDataProvider(DataProvider):
                             date_str = row.get("time", "")
                             if date_str:
                                 date_obj = datetime.strptime(date_str.split()[0], "%Y-%m-%d").date()
-                                data_point = MacroDataPoint(
+                                rows.append(dict(
                                     date=date_obj,
-                                    indicator_name=indicator_code,
-                                    indicator_value=float(row.get("value", 0)),
-                                    region=region  # 修正：使用传入的region参数
-                                )
-                                data_points.append(data_point)
+                                    indicator_value=float(row.get("value", 0))
+                                ))
                         except Exception as e:
                             logger.warning(f"宏观数据转换失败: {e}, row: {row}")
                             continue
         
-        return data_points
+        return self._to_frame(rows, MacroDataPoint, "date", {"indicator_name": indicator_code, "region": region})
     
     def _get_generic_history(
         self, 
@@ -0,0 +1,213 @@
+# data_providers/ifind_stream.py
+"""
+iFinD 响应的流式 JSON 解码
+
+response.json() 需要先把整个响应体读入内存再整体解析，长区间、多指标的 EDB 响应
+峰值内存是响应体的数倍。StreamingResponseDecoder 按块接收响应体，逐个解析
+tables 数组中的元素并交给 on_table 处理，解析完的文本随即丢弃，文本缓冲区的峰值
+约为单个 table 的大小。
+
+解析结果占用的内存取决于 on_table：默认原样保存每个 table（与 response.json() 相同）；
+IFinDHTTPClient.get_edb_frames 用它把每个 table 转换为列式 DataFrame，只保留数值列。
+
+仅依赖标准库 json：顶层对象与 tables 数组由本模块逐字符推进，数组元素及其他
+字段的值交给 json.JSONDecoder.raw_decode 解析。
+"""
+import codecs
+import json
+from typing import Any, Callable, Dict, Iterable, Optional
+
+TABLES_KEY = "tables"
+_WHITESPACE = " \t\n\r"
+
+# 解析状态
+_START, _KEY, _COLON, _VALUE, _AFTER_VALUE = range(5)
+_TABLES_START, _TABLE_ITEM, _AFTER_TABLE_ITEM, _DONE = range(5, 9)
+
+
+class StreamingResponseDecoder:
+    """
+    增量解析 {"errorcode": ..., "tables": [...], ...} 结构的响应
+
+    用法：
+        decoder = StreamingResponseDecoder(on_table=edb_table_to_frame)
+        for chunk in response.iter_content(65536):
+            decoder.feed(chunk)
+        result = decoder.close()
+
+    Args:
+        on_table: 每解析出一个 table 即调用，返回值存入 result["tables"]；默认原样保存
+    """
+
+    def __init__(self, on_table: Optional[Callable[[Dict], Any]] = None):
+        self.on_table = on_table
+        self.result: Dict[str, Any] = {}
+        self.max_buffer = 0
+
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._key: Optional[str] = None
+        self._wait_until = 0
+        self._closed = False
+
+    def feed(self, data: bytes):
+        """输入一块响应体"""
+        self._buffer += self._text.decode(data)
+        self.max_buffer = max(self.max_buffer, len(self._buffer))
+        if len(self._buffer) - self._pos >= self._wait_until:
+            self._parse()
+
+    def close(self) -> Dict[str, Any]:
+        """输入结束，返回解析结果"""
+        self._buffer += self._text.decode(b"", final=True)
+        self._closed = True
+        self._parse()
+        if self._state != _DONE:
+            raise ValueError("响应体不完整，无法解析JSON")
+        return self.result
+
+    def _skip_whitespace(self) -> bool:
+        """跳过空白，缓冲区中还有字符时返回 True"""
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+        return pos < len(buffer)
+
+    def _expect(self, chars: str) -> Optional[str]:
+        """读取一个结构字符；缓冲区不足时返回 None"""
+        if not self._skip_whitespace():
+            return None
+        char = self._buffer[self._pos]
+        if char not in chars:
+            raise ValueError(f"JSON格式错误: 位置 {self._pos} 处应为 {chars!r}，实际为 {char!r}")
+        self._pos += 1
+        return char
+
+    def _decode_value(self):
+        """
+        解析一个完整的JSON值，返回 (成功与否, 值)
+
+        值必须后接分隔符才算完整（避免把被截断的数字当成完整值）；不完整时
+        等待缓冲区增长一倍后再尝试，使重复解析的总成本保持线性。
+        """
+        if not self._skip_whitespace():
+            return False, None
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if self._closed:
+                raise
+            self._wait_until = 2 * (len(self._buffer) - self._pos)
+            return False, None
+
+        if end >= len(self._buffer) and not self._closed:
+            self._wait_until = 2 * (len(self._buffer) - self._pos)
+            return False, None
+
+        self._pos = end
+        self._wait_until = 0
+        return True, value
+
+    def _compact(self):
+        """丢弃已解析的文本"""
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+
+    def _parse(self):
+        while self._state != _DONE:
+            if not self._step():
+                break
+        self._compact()
+
+    def _step(self) -> bool:
+        """推进一步，缓冲区不足以继续时返回 False"""
+        state = self._state
+
+        if state == _START:
+            if self._expect("{") is None:
+                return False
+            self._state = _KEY
+            if self._skip_whitespace() and self._buffer[self._pos] == "}":
+                self._pos += 1
+                self._state = _DONE
+            return True
+
+        if state == _KEY:
+            ok, key = self._decode_value()
+            if not ok:
+                return False
+            if not isinstance(key, str):
+                raise ValueError("JSON格式错误: 对象键必须为字符串")
+            self._key = key
+            self._state = _COLON
+            return True
+
+        if state == _COLON:
+            if self._expect(":") is None:
+                return False
+            self._state = _TABLES_START if self._key == TABLES_KEY else _VALUE
+            return True
+
+        if state == _VALUE:
+            ok, value = self._decode_value()
+            if not ok:
+                return False
+            self.result[self._key] = value
+            self._state = _AFTER_VALUE
+            self._compact()
+            return True
+
+        if state == _AFTER_VALUE:
+            char = self._expect(",}")
+            if char is None:
+                return False
+            self._state = _KEY if char == "," else _DONE
+            return True
+
+        if state == _TABLES_START:
+            if not self._skip_whitespace():
+                return False
+            if self._buffer[self._pos] != "[":
+                # tables 不是数组（如 null），按普通字段处理
+                self._state = _VALUE
+                return True
+            self._pos += 1
+            self.result[TABLES_KEY] = []
+            self._state = _TABLE_ITEM
+            if self._skip_whitespace() and self._buffer[self._pos] == "]":
+                self._pos += 1
+                self._state = _AFTER_VALUE
+            return True
+
+        if state == _TABLE_ITEM:
+            ok, table = self._decode_value()
+            if not ok:
+                return False
+            self.result[TABLES_KEY].append(self.on_table(table) if self.on_table else table)
+            self._state = _AFTER_TABLE_ITEM
+            self._compact()
+            return True
+
+        if state == _AFTER_TABLE_ITEM:
+            char = self._expect(",]")
+            if char is None:
+                return False
+            self._state = _TABLE_ITEM if char == "," else _AFTER_VALUE
+            return True
+
+        return False
+
+
+def decode_stream(chunks: Iterable[bytes], on_table: Optional[Callable[[Dict], Any]] = None) -> Dict[str, Any]:
+    """按块流式解码响应体"""
+    decoder = StreamingResponseDecoder(on_table)
+    for chunk in chunks:
+        if chunk:
+            decoder.feed(chunk)
+    return decoder.close()
+
@@ -0,0 +1,101 @@
+# data_providers/ifind_table_parser.py
+"""
+iFinD tables 响应的向量化解析
+
+iFinD 的 tables 有两种结构：
+- 行情类（cmd_history_quotation / basic_data_service / date_sequence）：
+    {"thscode": "...", "time": [...], "table": {"open": [...], "close": [...]}}
+- EDB（edb_service）：
+    {"id": ["S002861328"], "time": [...], "value": [...], ...}
+
+这里整列解析日期和数值（无法解析的值记为 NaT/NaN），得到以 date 为列的 DataFrame；
+数据提供者再将其包装为 schemas.timeseries.TimeSeriesFrame 返回。
+"""
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .ifind_edb_utils import table_indicator_id
+
+
+def parse_dates(values: Iterable) -> np.ndarray:
+    """批量解析日期，支持 YYYY-MM-DD、YYYY-MM-DD HH:MM:SS、YYYYMMDD，无法解析的记为 NaT"""
+    text = pd.Series(list(values), dtype="string").str.slice(0, 10).str.replace("-", "", regex=False)
+    return pd.to_datetime(text, format="%Y%m%d", errors="coerce").to_numpy(dtype="datetime64[ns]")
+
+
+def to_float_column(values: Iterable) -> np.ndarray:
+    """批量转换为 float64，None、空串及无法解析的值记为 NaN"""
+    return pd.to_numeric(pd.Series(list(values), dtype="object"), errors="coerce").to_numpy(dtype="float64")
+
+
+def _column(values, length: int) -> np.ndarray:
+    """取与 time 等长的数值列，缺失或长度不符时为全 NaN"""
+    if not isinstance(values, list) or len(values) != length:
+        return np.full(length, np.nan)
+    return to_float_column(values)
+
+
+def quotation_table_to_frame(table: Dict, fields: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    将一个行情类 table 解析为 DataFrame
+
+    Args:
+        table: tables 中的一项
+        fields: 需要的指标列，默认取 table["table"] 中的全部指标
+
+    Returns:
+        列为 date 与各指标的 DataFrame，已去除日期无法解析的行，按日期升序
+    """
+    times = table.get("time") or []
+    values = table.get("table") or {}
+    fields = fields if fields is not None else list(values.keys())
+
+    frame = pd.DataFrame({"date": parse_dates(times)})
+    for field in fields:
+        frame[field] = _column(values.get(field), len(times))
+
+    return frame.dropna(subset=["date"]).sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def edb_table_to_frame(table: Dict) -> pd.DataFrame:
+    """将一个 EDB table 解析为 DataFrame（列为 date、value），按日期升序"""
+    times = table.get("time") or []
+    frame = pd.DataFrame({
+        "date": parse_dates(times),
+        "value": _column(table.get("value"), len(times))
+    })
+    return frame.dropna(subset=["date"]).sort_values("date", kind="stable").reset_index(drop=True)
+
+
+def edb_result_to_frames(result: Dict, to_frame: Callable[[Dict], pd.DataFrame] = edb_table_to_frame) -> Dict[str, pd.DataFrame]:
+    """将 edb_service 响应解析为 指标ID -> DataFrame"""
+    return {
+        table_indicator_id(table): to_frame(table)
+        for table in result.get("tables") or []
+    }
+
+
+def merge_edb_frames(parts: List[Dict[str, pd.DataFrame]], indicators: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    合并拆分请求得到的多组 指标ID -> DataFrame（同 ifind_edb_utils.merge_edb_results）
+
+    同一指标在多个日期区间中的数据按日期拼接，重复日期保留后一个子请求的值；
+    结果按 indicators 的顺序排列，没有数据的指标不出现在结果中。
+    """
+    merged = {}
+    for indicator in indicators:
+        frames = [part[indicator] for part in parts if indicator in part]
+        if not frames:
+            continue
+        if len(frames) == 1:
+            merged[indicator] = frames[0]
+            continue
+        frame = pd.concat(frames, ignore_index=True)
+        merged[indicator] = (
+            frame.drop_duplicates(subset="date", keep="last")
+            .sort_values("date", kind="stable")
+            .reset_index(drop=True)
+        )
+    return merged
@@ -0,0 +1,180 @@
+# data_providers/ifind_token.py
+"""
+iFinD access_token 管理
+
+access_token 过期后（错误码见 IFIND_TOKEN_EXPIRED_ERRORCODES，默认 -1302），用
+IFIND_REFRESH_TOKEN 调用 get_access_token 接口换取新令牌：
+    POST {IFIND_BASE_URL}/get_access_token，请求头 refresh_token
+    响应 {"errorcode": 0, "data": {"access_token": "..."}}
+
+令牌保存在进程间共享的缓存文件中（IFIND_TOKEN_CACHE_FILE，默认 data/ifind_token.json），
+所有客户端实例与工作进程读取同一份令牌；刷新在线程锁和文件锁下进行，并发发现过期的
+请求只有一个真正发起刷新，其余请求等待刷新完成后使用新令牌重放。
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+import requests
+
+try:
+    import fcntl
+except ImportError:  # Windows 下只做进程内加锁
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRefreshError(Exception):
+    """刷新 access_token 失败"""
+
+
+class TokenManager:
+    """
+    单个账户（服务地址 + refresh_token）的 access_token 管理（线程安全、进程间共享）
+
+    Args:
+        base_url: iFinD 服务地址
+        access_token: 初始令牌（通常来自 IFIND_ACCESS_TOKEN）
+        refresh_token: 用于换取新令牌的长期令牌
+        cache_file: 令牌缓存文件路径
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        access_token: Optional[str],
+        refresh_token: Optional[str],
+        cache_file: Optional[str] = None,
+        timeout: float = 30
+    ):
+        self.base_url = base_url
+        self.refresh_token = refresh_token
+        self.cache_file = cache_file or os.getenv("IFIND_TOKEN_CACHE_FILE", os.path.join("data", "ifind_token.json"))
+        self.endpoint = os.getenv("IFIND_TOKEN_ENDPOINT", "get_access_token")
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._token = access_token
+        self.refresh_count = 0
+
+        cached = self._read_cache()
+        if cached:
+            self._token = cached
+
+    def _cache_key(self) -> str:
+        """缓存文件中的条目键：不保存 refresh_token 明文，用其完整内容的 SHA-256 区分账号"""
+        digest = hashlib.sha256((self.refresh_token or "").encode("utf-8")).hexdigest()
+        return f"{self.base_url}|{digest}"
+
+    @contextmanager
+    def _file_lock(self):
+        """跨进程的刷新锁"""
+        if fcntl is None or not self.refresh_token:
+            yield
+            return
+
+        os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+        with open(self.cache_file + ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_cache(self) -> Optional[str]:
+        if not self.refresh_token:
+            return None
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                entry = json.load(f).get(self._cache_key())
+        except (OSError, ValueError):
+            return None
+        return entry.get("access_token") if isinstance(entry, dict) else None
+
+    def _write_cache(self, token: str):
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+
+        cache[self._cache_key()] = {"access_token": token, "refreshed_at": time.time()}
+        # 令牌文件仅当前用户可读写
+        tmp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, self.cache_file)
+
+    def get_token(self) -> str:
+        """当前令牌；刷新进行中时等待刷新完成"""
+        with self._lock:
+            if self._token:
+                return self._token
+        return self.refresh(None)
+
+    def refresh(self, expired_token: Optional[str]) -> str:
+        """
+        令牌 expired_token 已失效时调用，返回可用的新令牌
+
+        如果其他线程或进程已经完成刷新（缓存中的令牌与 expired_token 不同），
+        直接使用已刷新的令牌，不再重复请求。
+        """
+        if not self.refresh_token:
+            raise TokenRefreshError("access_token 已失效，且未设置 IFIND_REFRESH_TOKEN，无法自动刷新")
+
+        with self._lock:
+            if self._token and self._token != expired_token:
+                return self._token
+
+            with self._file_lock():
+                cached = self._read_cache()
+                if cached and cached != expired_token:
+                    logger.info("使用其他进程刷新的 access_token")
+                    self._token = cached
+                    return cached
+
+                token = self._request_token()
+                self._write_cache(token)
+                self._token = token
+                self.refresh_count += 1
+                logger.info("access_token 已刷新")
+                return token
+
+    def _request_token(self) -> str:
+        url = f"{self.base_url}/{self.endpoint}"
+        try:
+            response = requests.post(
+                url,
+                headers={"Content-Type": "application/json", "refresh_token": self.refresh_token},
+                timeout=self.timeout
+            )
+            result = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise TokenRefreshError(f"刷新 access_token 失败: {e}") from e
+
+        token = (result.get("data") or {}).get("access_token") if isinstance(result, dict) else None
+        if result.get("errorcode", 0) != 0 or not token:
+            raise TokenRefreshError(f"刷新 access_token 失败: {result.get('errmsg', result)}")
+        return token
+
+
+_managers: Dict[Tuple[str, Optional[str]], TokenManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_token_manager(base_url: str, access_token: Optional[str], refresh_token: Optional[str]) -> TokenManager:
+    """获取（或创建）进程内共享的 TokenManager，同一账户的所有客户端共用"""
+    key = (base_url, refresh_token or access_token)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = TokenManager(base_url, access_token, refresh_token)
+            _managers[key] = manager
+        return manager
@@ -2,7 +2,11 @@
 import random
 from datetime import datetime, date, timedelta
 from typing import List, Optional
+
+import numpy as np
+
 from .base import DataProvider
+from schemas.timeseries import TimeSeriesFrame
 from schemas.models import (
     FuturesHistoryDataPoint,
     PriceDataPoint,
@@ -16,6 +20,9 @@ class MockDataProvider(DataProvider):
     生成随机但结构正确的数据用于开发和测试。
     """
 
+    name = "mock_data"
+    trusted_models = True
+
     def get_history_data(
         self,
         asset_class: str,
@@ -23,7 +30,7 @@ class MockDataProvider(DataProvider):
         ticker: str,
         start_date: Optional[str],
         end_date: Optional[str]
-    ) -> List:
+    ) -> TimeSeriesFrame:
         """
         生成模拟的历史行情数据。
         """
@@ -48,46 +55,37 @@ class MockDataProvider(DataProvider):
         if start > end:
             start, end = end, start
 
-        # 生成数据点列表
-        data = []
-        current = start
+        # 按列生成数据（返回 TimeSeriesFrame）
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
         base_price = 3000.0  # 基础价格
+        columns = {name: [] for name in ("open", "high", "low", "close")}
 
-        while current <= end:
-            dt = datetime.combine(current, datetime.min.time())
+        for _ in days:
             price_noise = random.uniform(-100, 100)
             open_price = base_price + price_noise
             close_price = base_price + price_noise + random.uniform(-20, 20)
-            high_price = max(open_price, close_price) + random.uniform(0, 15)
-            low_price = min(open_price, close_price) - random.uniform(0, 15)
+            columns["open"].append(open_price)
+            columns["close"].append(close_price)
+            columns["high"].append(max(open_price, close_price) + random.uniform(0, 15))
+            columns["low"].append(min(open_price, close_price) - random.uniform(0, 15))
 
-            if asset_class == "future":
-                item = FuturesHistoryDataPoint(
-                    datetime=dt,
-                    product=ticker.upper(),
-                    symbol=f"{ticker}{current.strftime('%y%m')}",
-                    open=open_price,
-                    high=high_price,
-                    low=low_price,
-                    close=close_price,
-                    volume=random.randint(8000, 60000),
-                    open_interest=random.randint(40000, 200000)
-                )
-            else:
-                item = PriceDataPoint(
-                    date=current,
-                    product=ticker.upper(),
-                    price=close_price,
-                    open=open_price,
-                    high=high_price,
-                    low=low_price,
-                    volume=random.randint(1000, 10000),
-                    market=f"{region}:{ticker}"
-                )
-            data.append(item)
-            current += timedelta(days=1)
+        index = np.array(days, dtype="datetime64[D]")
+        if asset_class == "future":
+            columns["symbol"] = [f"{ticker}{current.strftime('%y%m')}" for current in days]
+            columns["volume"] = np.array([random.randint(8000, 60000) for _ in days], dtype=np.int64)
+            columns["open_interest"] = np.array([random.randint(40000, 200000) for _ in days], dtype=np.int64)
+            return TimeSeriesFrame(
+                index, columns, model=FuturesHistoryDataPoint,
+                constants={"product": ticker.upper()}, index_field="datetime", trusted=self.trusted
+            )
 
-        return data
+        columns["price"] = columns.pop("close")
+        columns["volume"] = np.array([random.randint(1000, 10000) for _ in days], dtype=np.int64)
+        return TimeSeriesFrame(
+            index, columns, model=PriceDataPoint,
+            constants={"product": ticker.upper(), "market": f"{region}:{ticker}"}, index_field="date",
+            trusted=self.trusted
+        )
 
     def get_news_data(self, query: str, limit: int = 5) -> List[NewsDataPoint]:
         """生成模拟新闻"""
@@ -0,0 +1,194 @@
+# data_providers/rate_limiter.py
+"""
+iFinD 请求限流与重试
+
+- 每个端点一个令牌桶，请求前取令牌，桶空时等待
+- 收到限流响应时按比例降低该端点的速率，之后每次成功请求逐步恢复（AIMD）
+- 可重试错误按带抖动的指数退避重试
+
+配置（环境变量）：
+- IFIND_RATE_LIMIT: 每个端点每秒请求数上限（默认 10）
+- IFIND_RATE_LIMIT_<ENDPOINT>: 单个端点的速率上限，如 IFIND_RATE_LIMIT_EDB_SERVICE
+- IFIND_RATE_BURST: 令牌桶容量，即允许的突发请求数（默认 20）
+- IFIND_RATE_MIN: 限流后速率的下限（默认 0.5）
+- IFIND_RETRY_BASE_DELAY / IFIND_RETRY_MAX_DELAY: 退避基准与上限秒数（默认 0.5 / 10）
+- 最大重试次数沿用 settings.MAX_RETRIES
+"""
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    可自适应调整速率的令牌桶（线程安全）
+
+    采用预约方式：取令牌时令牌数可以为负，返回需要等待的秒数，
+    调用方自行 sleep，因此同步线程和 asyncio 任务可以共用同一个桶。
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        min_rate: float = 0.5,
+        decrease_factor: float = 0.5,
+        increase_step: Optional[float] = None
+    ):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min(min_rate, rate)
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step if increase_step is not None else rate * 0.05
+
+        self._lock = threading.Lock()
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self.requests = 0
+        self.throttle_events = 0
+        self.total_wait = 0.0
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def reserve(self) -> float:
+        """取一个令牌，返回需要等待的秒数"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            self.requests += 1
+            wait = max(-self._tokens / self.rate, 0.0)
+            self.total_wait += wait
+            return wait
+
+    def on_success(self):
+        """请求成功：速率线性恢复，直至上限"""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """收到限流响应：速率按比例下降，并清空已积累的令牌"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._tokens -= retry_after * self.rate
+            self.throttle_events += 1
+
+    def snapshot(self) -> Dict:
+        """当前速率、剩余令牌及距离配额上限的程度"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "rate": round(self.rate, 4),
+                "max_rate": self.max_rate,
+                "capacity": self.capacity,
+                "tokens": round(self._tokens, 4),
+                "utilization": round(min(max(1 - self._tokens / self.capacity, 0.0), 1.0), 4),
+                "requests": self.requests,
+                "throttle_events": self.throttle_events,
+                "total_wait": round(self.total_wait, 4)
+            }
+
+
+class EndpointRateLimiter:
+    """按端点划分的令牌桶集合"""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        endpoint_rates: Optional[Dict[str, float]] = None
+    ):
+        self.rate = rate or float(os.getenv("IFIND_RATE_LIMIT", "10"))
+        self.burst = burst or float(os.getenv("IFIND_RATE_BURST", "20"))
+        self.min_rate = min_rate or float(os.getenv("IFIND_RATE_MIN", "0.5"))
+        self.endpoint_rates = dict(endpoint_rates or {})
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _endpoint_rate(self, endpoint: str) -> float:
+        if endpoint in self.endpoint_rates:
+            return self.endpoint_rates[endpoint]
+        value = os.getenv(f"IFIND_RATE_LIMIT_{endpoint.upper()}")
+        return float(value) if value else self.rate
+
+    def bucket(self, endpoint: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(endpoint)
+            if bucket is None:
+                bucket = TokenBucket(self._endpoint_rate(endpoint), self.burst, self.min_rate)
+                self._buckets[endpoint] = bucket
+            return bucket
+
+    def acquire(self, endpoint: str) -> float:
+        """同步取令牌，必要时阻塞等待，返回等待秒数"""
+        wait = self.bucket(endpoint).reserve()
+        if wait > 0:
+            logger.debug(f"{endpoint} 限流等待 {wait:.3f}s")
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, endpoint: str) -> float:
+        """异步取令牌，必要时挂起等待，返回等待秒数"""
+        wait = self.bucket(endpoint).reserve()
+        if wait > 0:
+            logger.debug(f"{endpoint} 限流等待 {wait:.3f}s")
+            await asyncio.sleep(wait)
+        return wait
+
+    def on_success(self, endpoint: str):
+        self.bucket(endpoint).on_success()
+
+    def on_throttle(self, endpoint: str, retry_after: Optional[float] = None):
+        bucket = self.bucket(endpoint)
+        bucket.on_throttle(retry_after)
+        logger.warning(f"{endpoint} 触发限流，速率降至 {bucket.rate:.2f} 次/秒")
+
+    def get_state(self) -> Dict[str, Dict]:
+        """各端点限流器状态"""
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {endpoint: bucket.snapshot() for endpoint, bucket in buckets.items()}
+
+
+class RetryPolicy:
+    """带抖动的指数退避（full jitter）"""
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None
+    ):
+        self.max_retries = max_retries if max_retries is not None else settings.MAX_RETRIES
+        self.base_delay = base_delay if base_delay is not None else float(os.getenv("IFIND_RETRY_BASE_DELAY", "0.5"))
+        self.max_delay = max_delay if max_delay is not None else float(os.getenv("IFIND_RETRY_MAX_DELAY", "10"))
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """第 attempt 次重试（从 0 开始）前的等待秒数；服务端给出 Retry-After 时不短于该值"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+# 进程内共享的限流器：所有客户端共用同一份端点配额
+default_rate_limiter = EndpointRateLimiter()
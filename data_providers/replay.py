@@ -0,0 +1,218 @@
+# data_providers/replay.py
+"""
+数据层请求录制与离线回放
+
+录制模式下，每次真实请求的结果连同请求指纹写入本地归档（每个请求一个 gzip 压缩的
+JSON 文件）；回放模式下直接从归档返回，不访问网络，可按录制时的耗时或固定时长模拟
+延迟。整套 crew 流程因此可以在无网络、无凭证的环境下确定性地复现与性能分析。
+
+环境变量：
+- DATA_REPLAY_MODE: off（默认）/ record / replay
+- DATA_REPLAY_DIR: 归档目录（默认 data/replay）
+- DATA_REPLAY_LATENCY: 回放延迟，recorded 表示按录制时的耗时，数字表示固定秒数（默认 0）
+
+请求指纹由数据源、端点和请求参数（去掉密钥类字段后按键排序）计算，见 request_fingerprint。
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+REPLAY_MODES = ("off", "record", "replay")
+
+# 不参与指纹、也不写入归档的请求字段
+SECRET_FIELDS = frozenset({"secret_key", "access_token", "refresh_token", "api_key"})
+
+
+class ReplayMissError(LookupError):
+    """回放模式下归档中没有对应请求"""
+
+    def __init__(self, source: str, endpoint: str, fingerprint: str):
+        self.source = source
+        self.endpoint = endpoint
+        self.fingerprint = fingerprint
+        super().__init__(f"回放归档中没有 {source}/{endpoint} 的请求记录（指纹 {fingerprint[:12]}）")
+
+
+def _public_params(params: Optional[Dict]) -> Dict:
+    return {k: v for k, v in (params or {}).items() if k not in SECRET_FIELDS}
+
+
+def request_fingerprint(source: str, endpoint: str, params: Optional[Dict]) -> str:
+    """请求指纹：数据源 + 端点 + 去掉密钥后的规范化参数"""
+    canonical = json.dumps(
+        [source, endpoint, _public_params(params)], sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseArchive:
+    """
+    请求/响应归档：<root>/<source>/<指纹前2位>/<指纹>.json.gz
+
+    每个文件保存 source、endpoint、request（不含密钥）、response、elapsed 与录制时间，
+    写入时先写临时文件再原子替换，并发录制同一请求不会产生损坏的文件。
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, source: str, fingerprint: str) -> str:
+        return os.path.join(self.root, source, fingerprint[:2], f"{fingerprint}.json.gz")
+
+    def save(self, source: str, endpoint: str, params: Optional[Dict], response: Any, elapsed: float) -> str:
+        fingerprint = request_fingerprint(source, endpoint, params)
+        path = self.path_for(source, fingerprint)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        entry = {
+            "source": source,
+            "endpoint": endpoint,
+            "request": _public_params(params),
+            "response": response,
+            "elapsed": elapsed,
+            "recorded_at": datetime.now().isoformat(timespec="seconds")
+        }
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        return fingerprint
+
+    def load(self, source: str, endpoint: str, params: Optional[Dict]) -> Optional[Dict]:
+        """返回归档条目，不存在时返回 None"""
+        path = self.path_for(source, request_fingerprint(source, endpoint, params))
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+
+class ReplayRecorder:
+    """
+    按模式录制或回放数据请求
+
+    Args:
+        mode: off / record / replay
+        archive: 归档，默认使用 DATA_REPLAY_DIR
+        latency: 回放延迟，"recorded" 或秒数
+    """
+
+    def __init__(self, mode: str = "off", archive: Optional[ResponseArchive] = None, latency: Any = 0):
+        mode = (mode or "off").lower()
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"DATA_REPLAY_MODE 只能是 {REPLAY_MODES} 之一，当前为 {mode}")
+        self.mode = mode
+        self.archive = archive or ResponseArchive(os.getenv("DATA_REPLAY_DIR", os.path.join("data", "replay")))
+        self.latency = latency
+
+    @classmethod
+    def from_env(cls) -> "ReplayRecorder":
+        return cls(
+            mode=os.getenv("DATA_REPLAY_MODE", "off"),
+            latency=os.getenv("DATA_REPLAY_LATENCY", "0")
+        )
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    def _replay_delay(self, entry: Dict) -> float:
+        if str(self.latency).lower() == "recorded":
+            return float(entry.get("elapsed") or 0)
+        return float(self.latency or 0)
+
+    def _lookup(self, source: str, endpoint: str, params: Optional[Dict]) -> Dict:
+        entry = self.archive.load(source, endpoint, params)
+        if entry is None:
+            raise ReplayMissError(source, endpoint, request_fingerprint(source, endpoint, params))
+        logger.debug(f"回放 {source}/{endpoint}")
+        return entry
+
+    def call(
+        self,
+        source: str,
+        endpoint: str,
+        params: Optional[Dict],
+        fetch: Callable[[], Any],
+        encode: Callable[[Any], Any] = lambda response: response,
+        decode: Callable[[Any], Any] = lambda stored: stored
+    ) -> Any:
+        """
+        执行一次请求
+
+        encode/decode 用于响应对象与可 JSON 序列化内容之间的转换（默认原样保存）。
+        """
+        if self.replaying:
+            entry = self._lookup(source, endpoint, params)
+            delay = self._replay_delay(entry)
+            if delay > 0:
+                time.sleep(delay)
+            return decode(entry["response"])
+
+        if not self.recording:
+            return fetch()
+
+        start = time.perf_counter()
+        response = fetch()
+        self.archive.save(source, endpoint, params, encode(response), time.perf_counter() - start)
+        return response
+
+    async def call_async(
+        self,
+        source: str,
+        endpoint: str,
+        params: Optional[Dict],
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """call 的异步版本（响应原样保存）"""
+        if self.replaying:
+            entry = await asyncio.to_thread(self._lookup, source, endpoint, params)
+            delay = self._replay_delay(entry)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return entry["response"]
+
+        if not self.recording:
+            return await fetch()
+
+        start = time.perf_counter()
+        response = await fetch()
+        await asyncio.to_thread(
+            self.archive.save, source, endpoint, params, response, time.perf_counter() - start
+        )
+        return response
+
+
+_default_recorder: Optional[ReplayRecorder] = None
+_default_recorder_lock = threading.Lock()
+
+
+def get_replay_recorder() -> ReplayRecorder:
+    """进程内共享的录制/回放器（首次调用时按环境变量创建）"""
+    global _default_recorder
+    if _default_recorder is None:
+        with _default_recorder_lock:
+            if _default_recorder is None:
+                _default_recorder = ReplayRecorder.from_env()
+    return _default_recorder
+
+
+def set_replay_recorder(recorder: Optional[ReplayRecorder]):
+    """替换共享的录制/回放器（None 表示下次按环境变量重新创建）"""
+    global _default_recorder
+    with _default_recorder_lock:
+        _default_recorder = recorder
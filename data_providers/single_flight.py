@@ -0,0 +1,93 @@
+# data_providers/single_flight.py
+"""
+相同请求合并（single-flight）
+
+同一时刻多个调用方发起相同请求时，只有第一个调用方真正执行，其余调用方
+等待并共享它的结果（或异常）。线程与 asyncio 任务共用同一张在途请求表，
+因此同步客户端和异步客户端之间的相同请求也会被合并。
+
+注意：共享的结果是同一个对象，调用方应将其视为只读。
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """在途请求合并器（线程安全，可同时服务线程和 asyncio 任务）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def _join(self, key: Hashable):
+        """登记调用，返回 (future, 是否为执行者)"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+
+            future = Future()
+            self._calls[key] = future
+            self.executed += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, result: Any = None, error: BaseException = None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """同步执行 fn；相同 key 的并发调用共享一次执行结果"""
+        future, leader = self._join(key)
+        if not leader:
+            logger.debug(f"合并在途请求: {key}")
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def do_async(self, key: Hashable, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        """异步执行 coro_fn；相同 key 的并发调用（包括其他线程中的同步调用）共享一次执行结果"""
+        future, leader = self._join(key)
+        if not leader:
+            logger.debug(f"合并在途请求: {key}")
+            # shield 避免等待方被取消时连带取消共享的 future
+            return await asyncio.shield(asyncio.wrap_future(future))
+
+        try:
+            result = await coro_fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    def in_flight(self) -> int:
+        """当前在途的请求数"""
+        with self._lock:
+            return len(self._calls)
+
+    def snapshot(self) -> Dict[str, int]:
+        """返回统计：实际执行次数、被合并的调用次数"""
+        with self._lock:
+            return {"executed": self.executed, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+# 进程内共享的默认实例，所有 iFinD 客户端默认使用它
+default_single_flight = SingleFlight()
@@ -0,0 +1,266 @@
+# data_service/ifind_stub.py
+"""
+iFinD HTTP API 本地模拟服务
+
+按真实接口的返回结构模拟 edb_service、cmd_history_quotation、basic_data_service、
+date_sequence、real_time_quotation 五个端点及令牌刷新接口 get_access_token，
+用于离线测试客户端和压测。
+
+启动方式：
+    uvicorn data_service.ifind_stub:app --port 18080
+然后设置 IFIND_BASE_URL=http://127.0.0.1:18080/api/v1
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from config.edb_asphalt_indicators import get_indicator_config
+
+app = FastAPI(title="iFinD 模拟服务", version="1.0.0")
+
+
+class StubState:
+    """模拟服务的运行状态：请求计数、同时处理中的请求数、可调的响应延迟与注入的错误响应"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.request_counts: Dict[str, int] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.latency = 0.0
+        self.faults: Dict[str, deque] = {}
+        self.expired_tokens = set()
+        self.token_refreshes = 0
+
+    def record(self, endpoint: str):
+        with self.lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def finish(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def inject(
+        self,
+        endpoint: str,
+        times: int = 1,
+        status_code: int = 200,
+        errorcode: int = 0,
+        errmsg: str = "",
+        retry_after: Optional[float] = None
+    ):
+        """让该端点接下来的 times 次请求返回指定的错误（HTTP 状态码或业务错误码）"""
+        fault = {"status_code": status_code, "errorcode": errorcode, "errmsg": errmsg, "retry_after": retry_after}
+        with self.lock:
+            self.faults.setdefault(endpoint, deque()).extend([fault] * times)
+
+    def next_fault(self, endpoint: str) -> Optional[Dict]:
+        with self.lock:
+            faults = self.faults.get(endpoint)
+            return faults.popleft() if faults else None
+
+    def reset(self):
+        with self.lock:
+            self.request_counts = {}
+            self.in_flight = 0
+            self.max_in_flight = 0
+            self.latency = 0.0
+            self.faults = {}
+            self.expired_tokens = set()
+            self.token_refreshes = 0
+
+
+stub_state = StubState()
+
+
+def _parse_date(value: str) -> date:
+    return datetime.strptime(value.replace("-", ""), "%Y%m%d").date()
+
+
+def _series_dates(indicator: str, start: date, end: date) -> List[date]:
+    """按指标频率生成日期序列（降序，与真实接口一致）"""
+    config = get_indicator_config(indicator)
+    frequency = config.frequency if config else "daily"
+
+    dates = []
+    current = start
+    while current <= end:
+        if frequency == "weekly":
+            if current.weekday() == 4:
+                dates.append(current)
+        elif frequency == "monthly":
+            if (current + timedelta(days=1)).month != current.month:
+                dates.append(current)
+        elif current.weekday() < 5:
+            dates.append(current)
+        current += timedelta(days=1)
+    return list(reversed(dates))
+
+
+def _mock_value(indicator: str, day: date) -> str:
+    base = sum(ord(c) for c in indicator) % 1000 + 3000
+    return f"{base + (day.toordinal() % 97) - 48:.1f}"
+
+
+def build_edb_tables(indicators: List[str], start: date, end: date) -> List[Dict]:
+    """生成 edb_service 的 tables 字段"""
+    tables = []
+    for indicator in indicators:
+        config = get_indicator_config(indicator)
+        name = config.name if config else indicator
+        dates = _series_dates(indicator, start, end)
+        tables.append({
+            "id": [indicator],
+            "time": [d.strftime("%Y-%m-%d") for d in dates],
+            "value": [_mock_value(indicator, d) for d in dates],
+            "rtime": [f"{d.strftime('%Y-%m-%d')} 16:15:00" for d in dates],
+            "index_name": [name] * len(dates)
+        })
+    return tables
+
+
+async def _simulate(endpoint: str, request: Request) -> Optional[JSONResponse]:
+    """记录请求并模拟延迟；令牌已过期或有注入的错误时返回对应的错误响应"""
+    stub_state.record(endpoint)
+    try:
+        if stub_state.latency:
+            await asyncio.sleep(stub_state.latency)
+    finally:
+        stub_state.finish()
+
+    if request.headers.get("access_token") in stub_state.expired_tokens:
+        return JSONResponse({"errorcode": -1302, "errmsg": "access_token is expired", "tables": []})
+
+    fault = stub_state.next_fault(endpoint)
+    if fault is None:
+        return None
+
+    headers = {"Retry-After": str(fault["retry_after"])} if fault["retry_after"] is not None else None
+    return JSONResponse(
+        {"errorcode": fault["errorcode"], "errmsg": fault["errmsg"], "tables": []},
+        status_code=fault["status_code"],
+        headers=headers
+    )
+
+
+@app.post("/api/v1/edb_service")
+async def edb_service(request: Request):
+    fault = await _simulate("edb_service", request)
+    if fault is not None:
+        return fault
+    params = await request.json()
+    indicators = [i for i in params.get("indicators", "").split(",") if i]
+    start = _parse_date(params["startdate"])
+    end = _parse_date(params["enddate"])
+    tables = build_edb_tables(indicators, start, end)
+    return {
+        "errorcode": 0,
+        "errmsg": "success",
+        "tables": tables,
+        "datatype": [],
+        "inputParams": params,
+        "perf": 12,
+        "dataVol": sum(len(t["time"]) for t in tables)
+    }
+
+
+@app.post("/api/v1/get_access_token")
+async def get_access_token(request: Request):
+    if not request.headers.get("refresh_token"):
+        return {"errorcode": -1, "errmsg": "refresh_token is required", "data": {}}
+    with stub_state.lock:
+        stub_state.token_refreshes += 1
+        token = f"stub-token-{stub_state.token_refreshes}"
+    return {"errorcode": 0, "errmsg": "", "data": {"access_token": token}}
+
+
+def _quotation_tables(params: Dict, indicators: List[str]) -> List[Dict]:
+    codes = [c for c in params.get("codes", "").split(",") if c]
+    start = _parse_date(params.get("startdate", date.today().strftime("%Y%m%d")))
+    end = _parse_date(params.get("enddate", date.today().strftime("%Y%m%d")))
+
+    tables = []
+    for code in codes:
+        dates = list(reversed(_series_dates(code, start, end)))
+        tables.append({
+            "thscode": code,
+            "time": [d.strftime("%Y-%m-%d") for d in dates],
+            "table": {
+                indicator: [float(_mock_value(code + indicator, d)) for d in dates]
+                for indicator in indicators
+            }
+        })
+    return tables
+
+
+@app.post("/api/v1/cmd_history_quotation")
+async def cmd_history_quotation(request: Request):
+    fault = await _simulate("cmd_history_quotation", request)
+    if fault is not None:
+        return fault
+    params = await request.json()
+    indicators = [i for i in params.get("indicators", "").split(",") if i]
+    return {"errorcode": 0, "errmsg": "", "tables": _quotation_tables(params, indicators)}
+
+
+@app.post("/api/v1/basic_data_service")
+async def basic_data_service(request: Request):
+    fault = await _simulate("basic_data_service", request)
+    if fault is not None:
+        return fault
+    params = await request.json()
+    indicators = [p.get("indicator", "") for p in params.get("indipara", [])]
+    return {"errorcode": 0, "errmsg": "", "tables": _quotation_tables(params, indicators)}
+
+
+@app.post("/api/v1/date_sequence")
+async def date_sequence(request: Request):
+    fault = await _simulate("date_sequence", request)
+    if fault is not None:
+        return fault
+    params = await request.json()
+    indicators = [p.get("indicator", "") for p in params.get("indipara", [])]
+    return {"errorcode": 0, "errmsg": "", "tables": _quotation_tables(params, indicators)}
+
+
+@app.post("/api/v1/real_time_quotation")
+async def real_time_quotation(request: Request):
+    fault = await _simulate("real_time_quotation", request)
+    if fault is not None:
+        return fault
+    params = await request.json()
+    codes = [c for c in params.get("codes", "").split(",") if c]
+    indicators = [i for i in params.get("indicators", "latest").split(",") if i]
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    tables = [
+        {
+            "thscode": code,
+            "time": [now],
+            "table": {indicator: [float(_mock_value(code + indicator, date.today()))] for indicator in indicators}
+        }
+        for code in codes
+    ]
+    return {"errorcode": 0, "errmsg": "", "tables": tables}
+
+
+def run_stub_server(host: str = "127.0.0.1", port: int = 18080):
+    """在后台线程中启动模拟服务，返回 uvicorn.Server 实例（调用 server.should_exit = True 停止）"""
+    import uvicorn
+
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.time() + 10
+    while not server.started and time.time() < deadline:
+        time.sleep(0.05)
+    return server
@@ -1,14 +1,22 @@
 # data_service/main.py
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query, Response
 from datetime import date, timedelta
 from typing import List, Optional
 import random
 
 # 假设 schemas 库已安装或路径可用
 from schemas.models import BasisDataPoint, APIResponse, FuturesHistoryDataPoint, MacroDataPoint
+from schemas.serialization import CONTENT_TYPES, encode_response, negotiate_format
 
 app = FastAPI(title="金融数据 API", version="1.0.0")
 
+def _respond(payload: APIResponse, accept: Optional[str]):
+    """按 Accept 头返回 msgpack / Arrow IPC 编码的响应，默认仍为 JSON"""
+    fmt = negotiate_format(accept)
+    if fmt == "json":
+        return payload
+    return Response(content=encode_response(payload, fmt), media_type=CONTENT_TYPES[fmt])
+
 # --- 模拟数据库 ---
 def get_mock_basis_data(product: str, start_date: Optional[date], end_date: Optional[date]) -> List[BasisDataPoint]:
     """生成模拟的基差数据"""
@@ -38,7 +46,8 @@ def get_mock_basis_data(product: str, start_date: Optional[date], end_date: Opti
 def get_basis_data(
     product: str = Query(..., description="产品名称，如 '沥青'"),
     start_date: Optional[date] = Query(None, description="开始日期 (YYYY-MM-DD)"),
-    end_date: Optional[date] = Query(None, description="结束日期 (YYYY-MM-DD)")
+    end_date: Optional[date] = Query(None, description="结束日期 (YYYY-MM-DD)"),
+    accept: Optional[str] = Header(None)
 ):
     """
     获取指定产品的基差数据。
@@ -48,11 +57,11 @@ def get_basis_data(
         
     data = get_mock_basis_data(product, start_date, end_date)
     
-    return APIResponse[BasisDataPoint](
+    return _respond(APIResponse[BasisDataPoint](
         code=200,
         message=f"Successfully fetched {len(data)} records for {product}.",
         data=data
-    )
+    ), accept)
 
 def get_mock_macro_data(indicator: str, country: str, start_date: Optional[date], end_date: Optional[date]) -> List[MacroDataPoint]:
     # ... 实现宏观数据生成逻辑 ...
@@ -70,16 +79,18 @@ def get_macro_data(
     indicator: str = Query(..., description="指标名称"),
     country: str = Query(..., description="国家代码"),
     start_date: Optional[date] = Query(None),
-    end_date: Optional[date] = Query(None)
+    end_date: Optional[date] = Query(None),
+    accept: Optional[str] = Header(None)
 ):
     data = get_mock_macro_data(indicator, country, start_date, end_date)
-    return APIResponse[MacroDataPoint](code=200, message="Success", data=data)
+    return _respond(APIResponse[MacroDataPoint](code=200, message="Success", data=data), accept)
 
 @app.get("/api/v1/data/futures_history", response_model=APIResponse[FuturesHistoryDataPoint])
 def get_futures_history_data(
     product: str = Query(...),
     start_date: Optional[date] = Query(None),
-    end_date: Optional[date] = Query(None)
+    end_date: Optional[date] = Query(None),
+    accept: Optional[str] = Header(None)
 ):
     data = get_mock_futures_history(product, start_date, end_date)
-    return APIResponse[FuturesHistoryDataPoint](code=200, message="Success", data=data)
+    return _respond(APIResponse[FuturesHistoryDataPoint](code=200, message="Success", data=data), accept)
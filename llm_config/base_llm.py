@@ -2,6 +2,9 @@
 from crewai import BaseLLM
 from typing import Any, Dict, List, Optional, Union
 
+# 未在 llms.toml 中配置时的默认上下文窗口
+DEFAULT_CONTEXT_WINDOW = 8192
+
 class UnifiedLLM(BaseLLM):
     """统一封装基类，所有自定义LLM建议继承此类，便于扩展。"""
 
@@ -16,4 +19,9 @@ class UnifiedLLM(BaseLLM):
         return True
 
     def get_context_window_size(self) -> int:
-        return 8192
+        return int(self.extra_params.get("context_window", DEFAULT_CONTEXT_WINDOW))
+
+    def get_tool_result_budget(self) -> int:
+        """单次工具返回结果的 token 预算（llms.toml 的 tool_result_tokens，未配置时取上下文窗口的 1/4）"""
+        budget = self.extra_params.get("tool_result_tokens")
+        return int(budget) if budget else self.get_context_window_size() // 4
@@ -1,6 +1,5 @@
 import sys
 from dotenv import load_dotenv
-from crewai import Crew, Process
 
 # 0. 在所有其他导入之前，加载环境变量
 load_dotenv()
@@ -22,8 +21,10 @@ from tasks.inventory_analysis_task import create_inventory_analysis_task
 from tasks.macro_economic_analysis_task import create_macro_economic_analysis_task
 from tasks.supply_demand_analysis_task import create_supply_demand_analysis_task
 
-# 3. 【方案A核心】直接导入最终战略任务的静态实例
-from tasks.final_strategy_task import final_strategy_task
+# 3. 最终战略任务（每次分析创建独立实例）与并行执行器
+from tasks.final_strategy_task import create_final_strategy_task
+from tasks.dag_executor import run_task_dag
+from tasks.run_store import default_run_store, edb_data_version
 
 
 def run_commodity_analysis(
@@ -47,79 +48,72 @@ def run_commodity_analysis(
 
     
     # --- 步骤 1: 动态创建所有前置分析任务 ---
+    macro_range = task_configs.get("macro", {"start_date": "2022-01-01", "end_date": "2025-01-01"})
     macro_task = create_macro_economic_analysis_task(
         commodity_name=commodity_name, 
-        **task_configs.get("macro", {"start_date": "2022-01-01", "end_date": "2025-01-01"}),
+        **macro_range,
         )
+    supply_demand_range = task_configs.get("supply_demand", {"start_date": "2021-01-01", "end_date": "2025-01-01"})
     supply_demand_task = create_supply_demand_analysis_task(
         commodity_name=commodity_name, 
-        **task_configs.get("supply_demand", {"start_date": "2021-01-01", "end_date": "2025-01-01"}),
+        **supply_demand_range,
         )
     
     # 【关键】创建两个独立的库存分析任务
+    social_inventory_range = task_configs.get("inventory_social", {"start_date": "2023-01-01", "end_date": "2025-01-01"})
     social_inventory_task = create_inventory_analysis_task(
         commodity_name=commodity_name, 
-        **task_configs.get("inventory_social", {"start_date": "2023-01-01", "end_date": "2025-01-01"}),
+        **social_inventory_range,
         inventory_type='social'
         )
+    factory_inventory_range = task_configs.get("inventory_factory", {"start_date": "2023-01-01", "end_date": "2025-01-01"})
     factory_inventory_task = create_inventory_analysis_task(
         commodity_name=commodity_name, 
-        **task_configs.get("inventory_factory", {"start_date": "2023-01-01", "end_date": "2025-01-01"}),
+        **factory_inventory_range,
         inventory_type='factory'
         )
     
+    basis_range = task_configs.get("basis", {"start_date": "2022-01-01", "end_date": "2025-01-01"})
     basis_task = create_basis_analysis_task(
         commodity_name=commodity_name, 
-        **task_configs.get("basis", {"start_date": "2022-01-01", "end_date": "2025-01-01"}),
+        **basis_range,
         )
+    price_range = task_configs.get("price_technical", {"start_date": "2024-01-01", "end_date": "2025-01-01"})
     price_task = create_price_technical_analysis_task(
         commodity_name=commodity_name, 
-        **task_configs.get("price_technical", {"start_date": "2024-01-01", "end_date": "2025-01-01"}),)
-
-    # --- 步骤 2: 定义前置任务的执行顺序 ---
-    (macro_task >> supply_demand_task >> 
-     social_inventory_task >> factory_inventory_task >> 
-     basis_task >> price_task)
-
-    # --- 步骤 3: 【方案A核心】为静态的最终任务动态设置上下文 ---
-    #    将所有前置任务的输出作为最终任务的输入
-    final_strategy_task.context = [
-        macro_task.output,
-        supply_demand_task.output,
-        social_inventory_task.output,
-        factory_inventory_task.output,
-        basis_task.output,
-        price_task.output
+        **price_range,)
+
+    # --- 步骤 2: 前置分析任务互不依赖，并行执行 ---
+    #    同一 Agent 的两个库存任务会依次执行；最大并行数见 ANALYSIS_MAX_WORKERS
+    analysis_tasks = [
+        macro_task,
+        supply_demand_task,
+        social_inventory_task,
+        factory_inventory_task,
+        basis_task,
+        price_task
     ]
 
-    # --- 步骤 4: 创建并配置 Crew ---
-    #    tasks 列表中包含所有动态创建的任务和静态导入的最终任务
-    final_decision_crew = Crew(
-        agents=[
-            macro_economic_agent,
-            supply_demand_agent,
-            inventory_agent,
-            basis_agent,
-            price_technical_agent,
-            chief_strategy_agent  # 最终决策者
-        ],
-        tasks=[
-            macro_task,
-            supply_demand_task,
-            social_inventory_task,
-            factory_inventory_task,
-            basis_task,
-            price_task,
-            final_strategy_task  # 使用静态导入的最终任务实例
-        ],
-        process=Process.sequential,
-        verbose=True  # 建议设为 True 以便调试和观察执行过程
+    # --- 步骤 3: 所有前置任务的输出作为最终任务的上下文 ---
+    #    已完成任务的输出保存为检查点，中途失败后重新运行会从第一个未完成的任务继续；
+    #    各任务读取的数据（任务类型与时间范围）更新后，该任务不复用检查点
+    data_scopes = {
+        id(task): ([task_type], data_range["start_date"], data_range["end_date"])
+        for task, task_type, data_range in [
+            (macro_task, "macro_economic", macro_range),
+            (supply_demand_task, "supply_demand", supply_demand_range),
+            (social_inventory_task, "inventory", social_inventory_range),
+            (factory_inventory_task, "inventory", factory_inventory_range),
+            (basis_task, "basis", basis_range),
+            (price_task, "price_technical", price_range),
+        ]
+    }
+    final_strategy_task = create_final_strategy_task(commodity_name)
+    result = run_task_dag(
+        analysis_tasks, final_strategy_task,
+        run_store=default_run_store(), data_version=edb_data_version(data_scopes)
     )
 
-    # --- 步骤 5: 启动 Crew ---
-    #    由于所有参数已在任务创建时传入，这里不再需要 inputs 字典
-    result = final_decision_crew.kickoff()
-
     return result
 
 
@@ -1,9 +1,15 @@
 # main/analysis_workflow_fixed.py
-from crewai import Crew, Process
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
+from typing import Dict
 from nlp.intent_parser import IntentParser
 from agents.ifind_agent import *
 from tasks.dynamic_task_factory import create_dynamic_tasks
+from tasks.final_strategy_task import create_final_strategy_task
+from tasks.dag_executor import run_task_dag
+from tasks.run_store import default_run_store, edb_data_version
+from main.report_cache import FINGERPRINT_WAIT_SECONDS, default_report_cache
+from tools.ifind_tool import PREFETCH_ENABLED, get_data_fetcher
 import logging
 from config.logging_config import setup_logging
 
@@ -13,8 +19,12 @@ logger = setup_logging()
 class AnalysisWorkflowFixed:
     """修复版分析工作流引擎"""
     
-    def __init__(self):
+    def __init__(self, max_workers: int = None):
         self.intent_parser = IntentParser()
+        # 同时执行的分析任务数，默认取 ANALYSIS_MAX_WORKERS
+        self.max_workers = max_workers
+        # 意图与数据都未变化时直接返回上次的结果（REPORT_CACHE_ENABLED=false 时为 None）
+        self.report_cache = default_report_cache()
         logger.info("分析工作流初始化完成")
     
     def execute_analysis(self, user_input: str):
@@ -31,39 +41,7 @@ class AnalysisWorkflowFixed:
             print(f"识别任务: {[t['type'] for t in intent_result['task_configs']]}")
             logger.info(f"意图解析完成: {intent_result}")
             
-            # 2. 创建动态任务
-            tasks = create_dynamic_tasks(intent_result)
-            if not tasks:
-                return "未能识别有效的分析任务，请提供更具体的分析需求。"
-            
-            print(f"\n=== 创建了 {len(tasks)} 个分析任务 ===")
-            logger.info(f"创建了 {len(tasks)} 个分析任务")
-            
-            # 3. 创建Crew并执行
-            agents = [
-                basis_analyst,
-                inventory_analyst,
-                supply_demand_analyst,
-                macro_analyst,
-                price_technical_analyst,
-                quant_strategist,
-                trading_analyst
-            ]
-            
-            crew = Crew(
-                agents=agents,
-                tasks=tasks,
-                process=Process.sequential,
-                verbose=True
-            )
-            
-            print("\n=== 开始执行分析 ===")
-            logger.info("开始执行分析流程")
-            result = crew.kickoff()
-            
-            print("\n=== 分析完成 ===")
-            logger.info("分析流程完成")
-            return result
+            return self.run_intent(intent_result)
             
         except KeyboardInterrupt:
             logger.warning("分析被用户中断")
@@ -72,3 +50,75 @@ class AnalysisWorkflowFixed:
             error_msg = f"分析过程中发生错误: {str(e)}"
             logger.exception(f"分析过程异常: {e}")
             return error_msg
+    
+    def run_intent(self, intent_result: Dict):
+        """
+        按意图解析结果执行分析（预取数据、查询报告缓存、创建任务、并行执行）
+        
+        批量运行（见 main.batch_runner）直接构造 intent_result 调用本方法；出错时抛出异常。
+        """
+        commodity = intent_result['commodity']
+        task_types = [t['type'] for t in intent_result['task_configs']]
+        time_range = intent_result['time_range']
+        
+        # 在后台预取全部计划任务所需的指标，工具调用时直接使用预取结果
+        if PREFETCH_ENABLED:
+            try:
+                get_data_fetcher().prefetch(task_types, time_range['start_date'], time_range['end_date'])
+            except Exception as e:
+                logger.warning(f"数据预取未启动: {e}")
+        
+        # 意图与数据内容都未变化时直接返回缓存的结果；数据未能很快就绪时不等待，
+        # 直接开始分析，完成后再计算指纹写入缓存
+        data_fingerprint = None
+        fingerprint_pending = False
+        if self.report_cache is not None:
+            try:
+                data_fingerprint = get_data_fetcher().data_fingerprint(
+                    task_types, time_range['start_date'], time_range['end_date'],
+                    timeout=FINGERPRINT_WAIT_SECONDS
+                )
+            except FutureTimeoutError:
+                fingerprint_pending = True
+                logger.info(f"数据 {FINGERPRINT_WAIT_SECONDS:.0f}s 内未就绪，跳过报告缓存查询")
+            except Exception as e:
+                logger.warning(f"无法计算数据指纹，跳过报告缓存: {e}")
+            else:
+                cached = self.report_cache.get(intent_result, data_fingerprint)
+                if cached is not None:
+                    print(f"\n=== {commodity}: 输入与数据未变化，返回缓存的分析结果 ===")
+                    return cached
+        
+        # 2. 创建动态任务
+        tasks = create_dynamic_tasks(intent_result)
+        if not tasks:
+            return "未能识别有效的分析任务，请提供更具体的分析需求。"
+        
+        print(f"\n=== {commodity}: 创建了 {len(tasks)} 个分析任务 ===")
+        logger.info(f"{commodity}: 创建了 {len(tasks)} 个分析任务")
+        
+        # 3. 按依赖关系并行执行分析任务，全部输出交给最终战略任务（输入未变的已完成任务复用检查点）
+        final_task = create_final_strategy_task(commodity)
+        
+        print(f"\n=== {commodity}: 开始执行分析 ===")
+        logger.info(f"{commodity}: 开始执行分析流程")
+        # 各任务读取本类型指标在意图时间范围内的数据，数据更新后对应任务不复用检查点
+        data_scopes = {id(t): ([t.name], time_range['start_date'], time_range['end_date']) for t in tasks}
+        result = run_task_dag(
+            tasks, final_task, max_workers=self.max_workers,
+            run_store=default_run_store(), data_version=edb_data_version(data_scopes)
+        )
+        
+        if fingerprint_pending:
+            try:
+                data_fingerprint = get_data_fetcher().data_fingerprint(
+                    task_types, time_range['start_date'], time_range['end_date']
+                )
+            except Exception as e:
+                logger.warning(f"无法计算数据指纹，结果不写入报告缓存: {e}")
+        if data_fingerprint is not None:
+            self.report_cache.put(intent_result, data_fingerprint, result)
+        
+        print(f"\n=== {commodity}: 分析完成 ===")
+        logger.info(f"{commodity}: 分析流程完成")
+        return result
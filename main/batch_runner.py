@@ -0,0 +1,180 @@
+# main/batch_runner.py
+"""
+多商品批量分析
+
+一次作业分析多个商品（如夜间为沥青、螺纹钢、铜、原油、铝生成报告）：每个商品一条
+分析流程（见 AnalysisWorkflowFixed.run_intent），由线程池并发调度。
+
+各商品共用进程内的数据获取器（tools.ifind_tool.get_data_fetcher）：开始前按时间范围
+预取所有商品计划任务所需指标的并集，指标重叠的部分只请求一次；其余请求经同一个
+HTTP 客户端的缓存与请求合并共享。Agent 为模块级单例，同一 Agent 的任务在商品之间
+依次执行（见 tasks.dag_executor），不同 Agent 的任务可以交错并行。
+
+使用线程池而不是进程池：进程之间无法共享上述缓存与预取结果，而分析流程的耗时主要
+在等待 LLM 与数据接口。
+
+环境变量：
+- BATCH_MAX_COMMODITIES: 同时分析的商品数（默认 2）
+"""
+import logging
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from tools.ifind_tool import PREFETCH_ENABLED, get_data_fetcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_COMMODITIES = int(os.getenv("BATCH_MAX_COMMODITIES", "2"))
+
+# 未指定任务时每个商品执行的分析
+DEFAULT_TASK_TYPES = ("basis", "inventory", "supply_demand", "macro_economic", "price_technical")
+
+
+@dataclass
+class CommodityJob:
+    """一个商品的分析作业"""
+    commodity: str
+    start_date: str
+    end_date: str
+    task_types: Sequence[str] = DEFAULT_TASK_TYPES
+
+    def to_intent(self) -> Dict:
+        """构造与 IntentParser.parse_intent 结构一致的意图解析结果"""
+        return {
+            'commodity': self.commodity,
+            'time_range': {'start_date': self.start_date, 'end_date': self.end_date},
+            'keywords': [],
+            'task_configs': [{'type': t} for t in self.task_types],
+            'original_input': f"{self.commodity} {self.start_date} 至 {self.end_date} 批量分析"
+        }
+
+
+@dataclass
+class CommodityResult:
+    """一个商品的分析结果"""
+    commodity: str
+    ok: bool
+    elapsed: float
+    result: Any = None
+    error: Optional[str] = None
+    traceback: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def report(self) -> str:
+        return getattr(self.result, "raw", None) or str(self.result or "")
+
+
+def jobs_for(
+    commodities: Sequence[str],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    task_types: Sequence[str] = DEFAULT_TASK_TYPES
+) -> List[CommodityJob]:
+    """相同时间范围的一组作业，默认最近半年（同 IntentParser 的默认时间范围）"""
+    end_date = end_date or datetime.now().strftime("%Y-%m-%d")
+    start_date = start_date or (datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=180)).strftime("%Y-%m-%d")
+    return [CommodityJob(c, start_date, end_date, task_types) for c in commodities]
+
+
+def _default_analysis() -> Callable[[Dict], Any]:
+    from main.analysis_workflow import AnalysisWorkflowFixed
+    return AnalysisWorkflowFixed().run_intent
+
+
+class BatchAnalysisRunner:
+    """
+    多商品批量分析
+
+    Args:
+        max_commodities: 同时分析的商品数，默认 BATCH_MAX_COMMODITIES
+        run_analysis: 执行单个商品分析的函数（参数为意图解析结果），默认 AnalysisWorkflowFixed().run_intent
+    """
+
+    def __init__(
+        self,
+        max_commodities: Optional[int] = None,
+        run_analysis: Optional[Callable[[Dict], Any]] = None
+    ):
+        self.max_commodities = max(1, max_commodities or DEFAULT_MAX_COMMODITIES)
+        self.run_analysis = run_analysis or _default_analysis()
+
+    def prefetch(self, jobs: Sequence[CommodityJob]):
+        """按时间范围预取全部作业所需指标的并集"""
+        ranges: Dict[tuple, List[str]] = {}
+        for job in jobs:
+            ranges.setdefault((job.start_date, job.end_date), []).extend(job.task_types)
+        fetcher = get_data_fetcher()
+        for (start_date, end_date), task_types in ranges.items():
+            try:
+                fetcher.prefetch(task_types, start_date, end_date)
+            except Exception as e:
+                logger.warning(f"批量预取未启动（{start_date} 至 {end_date}）: {e}")
+
+    def _run_one(self, job: CommodityJob) -> CommodityResult:
+        started = time.perf_counter()
+        logger.info(f"开始分析: {job.commodity}（{job.start_date} 至 {job.end_date}）")
+        try:
+            result = self.run_analysis(job.to_intent())
+        except Exception as e:
+            elapsed = time.perf_counter() - started
+            logger.exception(f"{job.commodity} 分析失败（{elapsed:.1f}s）: {e}")
+            return CommodityResult(job.commodity, False, elapsed, error=str(e), traceback=traceback.format_exc())
+        elapsed = time.perf_counter() - started
+        logger.info(f"{job.commodity} 分析完成（{elapsed:.1f}s）")
+        return CommodityResult(job.commodity, True, elapsed, result=result)
+
+    def run(self, jobs: Sequence[CommodityJob]) -> List[CommodityResult]:
+        """执行全部作业，返回与 jobs 顺序一致的结果；单个商品失败不影响其他商品"""
+        if PREFETCH_ENABLED:
+            self.prefetch(jobs)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_commodities, thread_name_prefix="batch-commodity") as pool:
+            results = list(pool.map(self._run_one, jobs))
+        elapsed = time.perf_counter() - started
+
+        failed = [r.commodity for r in results if not r.ok]
+        logger.info(
+            f"批量分析完成：{len(results)} 个商品，失败 {len(failed)} 个{failed or ''}，"
+            f"总耗时 {elapsed:.1f}s，各商品耗时之和 {sum(r.elapsed for r in results):.1f}s"
+        )
+        return results
+
+
+def format_batch_summary(results: Sequence[CommodityResult]) -> str:
+    """各商品耗时与失败原因的 Markdown 表格"""
+    lines = ["| 商品 | 状态 | 耗时(s) | 说明 |", "| --- | --- | --- | --- |"]
+    for r in results:
+        status = "✅ 完成" if r.ok else "❌ 失败"
+        note = (r.error or "").replace("|", "/").replace("\n", " ")[:80]
+        lines.append(f"| {r.commodity} | {status} | {r.elapsed:.1f} | {note} |")
+    return "\n".join(lines)
+
+
+def run_batch_analysis(
+    commodities: Sequence[str],
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    task_types: Sequence[str] = DEFAULT_TASK_TYPES,
+    max_commodities: Optional[int] = None
+) -> List[CommodityResult]:
+    """对一组商品执行相同时间范围的批量分析"""
+    runner = BatchAnalysisRunner(max_commodities=max_commodities)
+    return runner.run(jobs_for(commodities, start_date, end_date, task_types))
+
+
+if __name__ == "__main__":
+    from config.logging_config import setup_logging
+    setup_logging()
+
+    batch_results = run_batch_analysis(["沥青", "螺纹钢", "铜", "原油", "铝"])
+    for item in batch_results:
+        if item.ok:
+            print(f"\n======================== {item.commodity} 战略决策报告 ========================\n")
+            print(item.report)
+    print("\n" + format_batch_summary(batch_results))
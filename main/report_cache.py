@@ -0,0 +1,118 @@
+# main/report_cache.py
+"""
+分析报告缓存
+
+用户常在几小时内重复同一个请求（如"沥青 半年库存分析"），而输入与底层数据都没有变化，
+完整的分析流程却要重新执行一遍。这里按"规范化的意图 + 数据内容指纹"缓存最终结果：
+
+- 意图：商品、任务类型（去重排序）与时间范围，见 intent_key；
+- 数据指纹：全部计划任务所需指标数据的内容哈希（IFindDataFetcher.data_fingerprint）。
+
+同一意图只保留一条缓存。数据源发布了新数据时指纹改变，旧条目不再命中，并在新的
+结果生成后被覆盖（任务检查点同样包含数据版本，见 tasks.run_store.edb_data_version，
+新结果不会由旧数据的检查点拼成）。
+
+查询缓存要先取得数据，分析流程开始前最多等待 REPORT_CACHE_FINGERPRINT_WAIT_SECONDS：
+数据接口较慢时不再等待，直接开始分析（任务读取的是同一份预取数据），分析完成后再计算
+指纹写入缓存。代价是这种情况下即使缓存本可命中也会重新分析一次；等待时间越长，
+未命中时 LLM 开始得越晚。
+
+环境变量：
+- REPORT_CACHE_ENABLED: 是否启用（默认 true）
+- REPORT_CACHE_DIR: 缓存目录（默认 data/reports）
+- REPORT_CACHE_MAX_AGE_HOURS: 有效期（小时，默认 24；0 表示不过期），数据之外的变化
+  （如提示词、模型调整）在有效期后生效
+- REPORT_CACHE_FINGERPRINT_WAIT_SECONDS: 查询缓存前等待数据指纹的最长时间（秒，默认 5）
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from crewai.crews.crew_output import CrewOutput
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_WAIT_SECONDS = float(os.getenv("REPORT_CACHE_FINGERPRINT_WAIT_SECONDS", "5"))
+
+
+def report_cache_enabled() -> bool:
+    return os.getenv("REPORT_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def normalize_intent(intent_result: Dict) -> Dict:
+    """意图中决定分析结果的部分：商品、任务类型、时间范围"""
+    return {
+        "commodity": intent_result["commodity"],
+        "task_types": sorted({t["type"] for t in intent_result["task_configs"]}),
+        "start_date": intent_result["time_range"]["start_date"],
+        "end_date": intent_result["time_range"]["end_date"],
+    }
+
+
+def intent_key(intent_result: Dict) -> str:
+    canonical = json.dumps(normalize_intent(intent_result), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """
+    报告缓存：<root>/<意图键前2位>/<意图键>.json.gz
+
+    每个文件保存规范化的意图、数据指纹、分析结果（CrewOutput）与生成时间，
+    写入时先写临时文件再原子替换。
+
+    Args:
+        root: 缓存目录，默认 REPORT_CACHE_DIR
+        max_age_hours: 有效期，默认 REPORT_CACHE_MAX_AGE_HOURS，0 表示不过期
+    """
+
+    def __init__(self, root: Optional[str] = None, max_age_hours: Optional[float] = None):
+        self.root = root or os.getenv("REPORT_CACHE_DIR", os.path.join("data", "reports"))
+        if max_age_hours is None:
+            max_age_hours = float(os.getenv("REPORT_CACHE_MAX_AGE_HOURS", "24"))
+        self.max_age = max_age_hours * 3600
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.json.gz")
+
+    def get(self, intent_result: Dict, data_fingerprint: str) -> Optional[CrewOutput]:
+        """命中时返回缓存的结果；不存在、已过期或数据已更新时返回 None"""
+        path = self.path_for(intent_key(intent_result))
+        try:
+            if self.max_age > 0 and time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, EOFError, json.JSONDecodeError):
+            return None
+        if entry.get("data_fingerprint") != data_fingerprint:
+            logger.info("数据已更新，报告缓存失效: %s", entry["intent"])
+            return None
+        logger.info("命中报告缓存: %s（生成于 %s）", entry["intent"], entry["created_at"])
+        return CrewOutput.model_validate(entry["result"])
+
+    def put(self, intent_result: Dict, data_fingerprint: str, result: CrewOutput) -> str:
+        path = self.path_for(intent_key(intent_result))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "intent": normalize_intent(intent_result),
+            "data_fingerprint": data_fingerprint,
+            "result": result.model_dump(mode="json", exclude={"pydantic": True, "tasks_output": {"__all__": {"pydantic"}}}),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+
+def default_report_cache() -> Optional[ReportCache]:
+    """工作流使用的报告缓存，REPORT_CACHE_ENABLED=false 时为 None"""
+    return ReportCache() if report_cache_enabled() else None
@@ -0,0 +1,249 @@
+# schemas/serialization.py
+"""
+数据模型的二进制序列化
+
+schemas.models 中的数据模型（及 APIResponse）除 JSON 外支持两种二进制格式：
+- msgpack：按列打包 {字段名: [值...]}，不逐行重复字段名，常量字段单独保存；日期/时间为 ISO 字符串；
+- arrow：Arrow IPC 流格式，每个字段一列（date32/timestamp/float64/int64/string），
+  模型名与 APIResponse 的 code/message 写入 schema 元数据。TimeSeriesFrame 直接由
+  NumPy 列构建，常量字段写入元数据，不构造任何行对象。
+
+解码时按模型名找回模型类，整批校验（见 schemas.construct.build_models）。
+
+编码结果的 Content-Type 见 CONTENT_TYPES，服务端按 Accept 头选择格式（negotiate_format）。
+"""
+import inspect
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+import pyarrow as pa
+from pydantic import BaseModel, TypeAdapter
+
+from . import models
+from .construct import build_models
+from .models import APIResponse
+from .timeseries import TimeSeriesFrame
+
+try:
+    import msgpack
+except ImportError:  # 未安装时只能使用 json / arrow
+    msgpack = None
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "msgpack": "application/x-msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# schemas.models 中可按名称解码的数据模型
+MODEL_REGISTRY: Dict[str, Type[BaseModel]] = {
+    name: obj for name, obj in vars(models).items()
+    if inspect.isclass(obj) and issubclass(obj, BaseModel) and obj.__module__ == models.__name__
+    and obj is not APIResponse
+}
+
+Items = Union[Sequence[BaseModel], TimeSeriesFrame]
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """按 Accept 头选择格式（按出现顺序取第一个支持的类型，默认 json）"""
+    for part in (accept or "").split(","):
+        media_type = part.split(";")[0].strip().lower()
+        for fmt, content_type in CONTENT_TYPES.items():
+            if media_type == content_type and (fmt != "msgpack" or msgpack is not None):
+                return fmt
+    return "json"
+
+
+def format_for_content_type(content_type: Optional[str]) -> str:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    for fmt, known in CONTENT_TYPES.items():
+        if media_type == known:
+            return fmt
+    return "json"
+
+
+def _require_msgpack():
+    if msgpack is None:
+        raise RuntimeError("msgpack 未安装，请 pip install msgpack 或改用 json / arrow 格式")
+
+
+def _resolve_model(name: str) -> Type[BaseModel]:
+    try:
+        return MODEL_REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"未知的数据模型: {name}，可用模型: {', '.join(MODEL_REGISTRY)}") from None
+
+
+def _model_of(items: Items, model: Optional[Type[BaseModel]]) -> Type[BaseModel]:
+    if model is not None:
+        return model
+    if isinstance(items, TimeSeriesFrame) and items.model is not None:
+        return items.model
+    if len(items):
+        return type(items[0])
+    raise ValueError("数据为空，无法推断模型，请指定 model")
+
+
+def _columns(items: Items, model: Type[BaseModel]) -> Tuple[Dict[str, List], Dict[str, Any]]:
+    """(字段名 -> 值列表, 常量字段)，值为 Python 原生类型"""
+    if isinstance(items, TimeSeriesFrame):
+        return items.to_pydict(constants=False), items.constants
+    return {name: [getattr(item, name) for item in items] for name in model.model_fields}, {}
+
+
+def _rows(columns: Dict[str, Sequence], constants: Optional[Dict] = None) -> List[Dict]:
+    names = list(columns)
+    rows = [dict(zip(names, values)) for values in zip(*columns.values())]
+    if constants:
+        rows = [{**constants, **row} for row in rows]
+    return rows
+
+
+# ---------- msgpack ----------
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"无法序列化 {type(value).__name__}")
+
+
+def _msgpack_envelope(items: Items, model: Type[BaseModel], header: Dict[str, Any]) -> Dict:
+    columns, constants = _columns(items, model)
+    return {**header, "model": model.__name__, "constants": constants, "columns": columns}
+
+
+def _pack(envelope: Dict) -> bytes:
+    _require_msgpack()
+    return msgpack.packb(envelope, default=_msgpack_default, use_bin_type=True)
+
+
+def _unpack(payload: bytes) -> Dict:
+    _require_msgpack()
+    return msgpack.unpackb(payload, raw=False)
+
+
+# ---------- Arrow IPC ----------
+
+def _frame_arrays(frame: TimeSeriesFrame) -> Tuple[Dict[str, pa.Array], Dict[str, Any]]:
+    """TimeSeriesFrame -> (Arrow 列, 常量)，数值列与索引不经过 Python 对象"""
+    fields = frame.model.model_fields if frame.model else {}
+    annotation = fields[frame.index_field].annotation if frame.index_field in fields else datetime
+    index = pa.array(frame.index, type=pa.timestamp("ns", tz="UTC" if frame.tz else None))
+    if frame.tz:
+        index = index.cast(pa.timestamp("ns", tz=frame.tz))
+    if annotation is date:
+        index = index.cast(pa.date32())
+    arrays = {frame.index_field: index}
+    for name in frame.columns:
+        column = frame.column(name)
+        arrays[name] = pa.array(column, from_pandas=True) if column.dtype.kind in "iufb" else \
+            pa.array(frame.to_pydict([name])[name])
+    return arrays, frame.constants
+
+
+def _arrow_bytes(arrays: Dict[str, pa.Array], metadata: Dict[str, str]) -> bytes:
+    table = pa.table(arrays).replace_schema_metadata(metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _arrow_table(payload: bytes) -> Tuple[pa.Table, Dict[str, str]]:
+    with pa.ipc.open_stream(payload) as reader:
+        table = reader.read_all()
+    metadata = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+    return table, metadata
+
+
+def _encode_arrow(items: Items, model: Type[BaseModel], metadata: Dict[str, str]) -> bytes:
+    if isinstance(items, TimeSeriesFrame):
+        arrays, constants = _frame_arrays(items)
+    else:
+        columns, constants = _columns(items, model)
+        arrays = {name: pa.array(values) for name, values in columns.items()}
+    metadata = {"model": model.__name__, "constants": json.dumps(constants, default=str), **metadata}
+    return _arrow_bytes(arrays, metadata)
+
+
+# ---------- 数据模型列表 ----------
+
+def encode_models(items: Items, fmt: str = "msgpack", model: Optional[Type[BaseModel]] = None) -> bytes:
+    """
+    编码一组数据模型对象（或 TimeSeriesFrame）
+
+    Args:
+        items: 模型对象列表或 TimeSeriesFrame
+        fmt: json / msgpack / arrow
+        model: 模型类，省略时由 items 推断（空列表时必须指定）
+    """
+    model = _model_of(items, model)
+    if fmt == "json":
+        return TypeAdapter(List[model]).dump_json(list(items))
+    if fmt == "msgpack":
+        return _pack(_msgpack_envelope(items, model, {}))
+    if fmt == "arrow":
+        return _encode_arrow(items, model, {})
+    raise ValueError(f"不支持的格式: {fmt}，可选 {', '.join(CONTENT_TYPES)}")
+
+
+def _decode(payload: bytes, fmt: str) -> Tuple[Dict[str, Any], List[Dict]]:
+    """二进制格式 -> (头部信息, 字段字典列表)"""
+    if fmt == "msgpack":
+        envelope = _unpack(payload)
+        return envelope, _rows(envelope["columns"], envelope.get("constants"))
+    if fmt == "arrow":
+        table, metadata = _arrow_table(payload)
+        return metadata, _rows(table.to_pydict(), json.loads(metadata.get("constants") or "{}"))
+    raise ValueError(f"不支持的格式: {fmt}，可选 {', '.join(CONTENT_TYPES)}")
+
+
+def decode_models(payload: bytes, fmt: str = "msgpack", model: Optional[Type[BaseModel]] = None) -> List[BaseModel]:
+    """
+    解码 encode_models 的结果（整批校验）
+
+    json 格式不含模型名，必须指定 model；其余格式省略 model 时按编码时记录的模型名解析。
+    """
+    if fmt == "json":
+        if model is None:
+            raise ValueError("json 格式需要指定 model")
+        return TypeAdapter(List[model]).validate_json(payload)
+    header, rows = _decode(payload, fmt)
+    return build_models(model or _resolve_model(header["model"]), rows)
+
+
+# ---------- APIResponse ----------
+
+def _response_model(response: APIResponse) -> Type[BaseModel]:
+    args = type(response).__pydantic_generic_metadata__.get("args") or ()
+    if args and inspect.isclass(args[0]) and issubclass(args[0], BaseModel):
+        return args[0]
+    return _model_of(response.data, None)
+
+
+def encode_response(response: APIResponse, fmt: str = "msgpack") -> bytes:
+    """编码 APIResponse（code/message 与 data 一起）"""
+    if fmt == "json":
+        return response.model_dump_json().encode("utf-8")
+    model = _response_model(response)
+    if fmt == "msgpack":
+        return _pack(_msgpack_envelope(response.data, model, {"code": response.code, "message": response.message}))
+    if fmt == "arrow":
+        return _encode_arrow(response.data, model, {"code": str(response.code), "message": response.message})
+    raise ValueError(f"不支持的格式: {fmt}，可选 {', '.join(CONTENT_TYPES)}")
+
+
+def decode_response(payload: bytes, fmt: str = "msgpack", model: Optional[Type[BaseModel]] = None) -> APIResponse:
+    """解码 encode_response 的结果为 APIResponse[Model]"""
+    if fmt == "json":
+        if model is None:
+            raise ValueError("json 格式需要指定 model")
+        return APIResponse[model].model_validate_json(payload)
+    header, rows = _decode(payload, fmt)
+    model = model or _resolve_model(header["model"])
+    return APIResponse[model](code=int(header["code"]), message=header["message"], data=build_models(model, rows))
@@ -0,0 +1,441 @@
+# schemas/timeseries.py
+"""
+列式时间序列容器
+
+TimeSeriesFrame 以 NumPy 数组按列保存数据（每个字段一列），索引为 datetime64[ns]；
+整段数据中取值相同的字段（如 product、market、region）作为常量只保存一次。
+与 List[PriceDataPoint] 等逐行 Pydantic 对象相比：
+- 内存：每列一个连续数组，不为每行创建对象；
+- 切片：整数切片、按日期区间 between() 都返回共享底层数组的视图（零拷贝）；
+- 兼容：按下标/迭代访问时才构造对应模型（如 PriceDataPoint），可直接替代原来的列表；
+  迭代与 to_records() 按列批量转换后整批构造，数据提供者可信时跳过逐行校验（见 schemas.construct）；
+- 校验：validate() 按列整体检查必填、类型与取值范围，不逐行构造模型。
+"""
+import datetime as dt
+import itertools
+import typing
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Type
+
+import annotated_types
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from .construct import build_models, construct_trusted
+
+# 字段类型 -> 取值转换类别
+_KINDS = {float: "float", int: "int", str: "str", bool: "bool", dt.date: "date", dt.datetime: "datetime"}
+
+
+def _field_kind(annotation) -> Tuple[str, bool]:
+    """返回 (类别, 是否可为 None)；Optional[X] 解包为 X"""
+    optional = False
+    if typing.get_origin(annotation) is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        optional = len(args) < len(typing.get_args(annotation))
+        annotation = args[0] if len(args) == 1 else annotation
+    return _KINDS.get(annotation, "other"), optional
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def _converter(kind: str, tz: Optional[str]) -> Callable[[Any], Any]:
+    """列中取出的 NumPy 标量 -> 模型字段值（NaN/NaT -> None）"""
+    def convert(value):
+        if isinstance(value, np.generic):
+            if isinstance(value, np.datetime64):
+                if np.isnat(value):
+                    return None
+                stamp = pd.Timestamp(value)
+                if kind == "date":
+                    return stamp.date()
+                return (stamp.tz_localize(tz) if tz else stamp).to_pydatetime()
+            value = value.item()
+        if _is_missing(value):
+            return None
+        if kind == "int":
+            return int(value)
+        if kind == "float":
+            return float(value)
+        return value
+    return convert
+
+
+def _to_column(values) -> np.ndarray:
+    """转换为列数组：数值保持 NumPy 数值类型（含 None 的数值列为 float64），日期为 datetime64[ns]，其余为 object"""
+    array = np.asarray(values)
+    if array.dtype.kind == "M":
+        return array.astype("datetime64[ns]")
+    if array.dtype.kind == "O" and all(
+        _is_missing(v) or (isinstance(v, (int, float)) and not isinstance(v, bool)) for v in array
+    ):
+        return pd.to_numeric(pd.Series(array, dtype="object")).to_numpy(dtype="float64")
+    if array.dtype.kind in "iufb":
+        return array
+    return array.astype(object)
+
+
+class TimeSeriesFrame(Sequence):
+    """
+    列式时间序列
+
+    Args:
+        index: 时间索引（可被 numpy 转换为 datetime64 的序列），应按时间升序
+        columns: 字段名 -> 数组，长度与 index 相同
+        model: 行对应的 Pydantic 模型（如 PriceDataPoint），用于行视图与校验
+        constants: 所有行取值相同的字段
+        index_field: 索引在模型中的字段名（PriceDataPoint 为 date，FuturesHistoryDataPoint 为 datetime）
+        tz: 索引的时区（索引按 UTC 无时区保存，构造行时再附加），None 表示无时区
+        trusted: 数据已完成类型转换，构造行对象时跳过校验
+    """
+
+    # 迭代时每批构造的行数
+    ITER_CHUNK = 4096
+
+    def __init__(
+        self,
+        index,
+        columns: Mapping[str, Any],
+        model: Optional[Type[BaseModel]] = None,
+        constants: Optional[Mapping[str, Any]] = None,
+        index_field: str = "date",
+        tz: Optional[str] = None,
+        trusted: bool = False
+    ):
+        self._index = np.asarray(index, dtype="datetime64[ns]")
+        self._columns: Dict[str, np.ndarray] = {}
+        for name, values in columns.items():
+            column = values if isinstance(values, np.ndarray) else _to_column(values)
+            if len(column) != len(self._index):
+                raise ValueError(f"列 {name} 长度为 {len(column)}，与索引长度 {len(self._index)} 不一致")
+            self._columns[name] = column
+        self.model = model
+        self.constants: Dict[str, Any] = dict(constants or {})
+        self.index_field = index_field
+        self.tz = tz
+        self.trusted = trusted
+        self._converters: Optional[Dict[str, Callable]] = None
+
+    # ---------- 构造 ----------
+
+    @classmethod
+    def from_frame(
+        cls,
+        frame: pd.DataFrame,
+        model: Optional[Type[BaseModel]] = None,
+        index_column: Optional[str] = None,
+        constants: Optional[Mapping[str, Any]] = None,
+        index_field: Optional[str] = None,
+        tz: Optional[str] = None,
+        trusted: bool = False
+    ) -> "TimeSeriesFrame":
+        """
+        由 DataFrame 构造（按时间升序排列）
+
+        index_column 为时间列名，省略时使用 DataFrame 的索引；带时区的时间转换为 UTC 保存。
+        """
+        if index_column is not None:
+            index = pd.DatetimeIndex(frame[index_column])
+            data = frame.drop(columns=[index_column])
+        else:
+            index = pd.DatetimeIndex(frame.index)
+            data = frame
+        if index.tz is not None:
+            tz = tz or "UTC"
+            index = index.tz_convert("UTC").tz_localize(None)
+
+        order = np.argsort(index.to_numpy(), kind="stable")
+        return cls(
+            index.to_numpy()[order],
+            {name: data[name].to_numpy()[order] for name in data.columns},
+            model=model,
+            constants=constants,
+            index_field=index_field or index_column or "date",
+            tz=tz,
+            trusted=trusted
+        )
+
+    @classmethod
+    def from_records(cls, records: List[BaseModel], index_field: str = "date") -> "TimeSeriesFrame":
+        """由模型对象列表构造（与原 List[Model] 接口互转，数据已经过校验，视为可信）"""
+        if not records:
+            raise ValueError("records 为空，无法推断模型")
+        model = type(records[0])
+        rows = [r.model_dump() for r in records]
+        frame = pd.DataFrame(rows)
+        stamps = pd.to_datetime(frame[index_field], utc=any(
+            isinstance(v, dt.datetime) and v.tzinfo is not None for v in frame[index_field]
+        ))
+        frame[index_field] = stamps
+        # 所有行取值相同的非数值字段作为常量保存
+        constants = {
+            name: frame[name].iloc[0] for name in frame.columns
+            if name != index_field and frame[name].dtype.kind == "O" and frame[name].nunique(dropna=False) == 1
+        }
+        return cls.from_frame(frame.drop(columns=list(constants)), model=model, index_column=index_field, constants=constants, trusted=True)
+
+    # ---------- 基本属性 ----------
+
+    @property
+    def index(self) -> np.ndarray:
+        return self._index
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    @property
+    def nbytes(self) -> int:
+        """列数组占用的字节数（object 列只计指针）"""
+        return self._index.nbytes + sum(c.nbytes for c in self._columns.values())
+
+    def column(self, name: str) -> np.ndarray:
+        """返回列数组（不复制），常量字段返回按长度广播的只读数组"""
+        if name == self.index_field:
+            return self._index
+        if name in self._columns:
+            return self._columns[name]
+        if name in self.constants:
+            return np.broadcast_to(np.asarray(self.constants[name], dtype=object), len(self))
+        raise KeyError(name)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        model = self.model.__name__ if self.model else "-"
+        span = f"{self._index[0]} ~ {self._index[-1]}" if len(self) else "empty"
+        return f"TimeSeriesFrame({model}, {len(self)} rows, columns={self.columns}, {span})"
+
+    # ---------- 访问 ----------
+
+    def _take(self, selector) -> "TimeSeriesFrame":
+        return TimeSeriesFrame(
+            self._index[selector],
+            {name: column[selector] for name, column in self._columns.items()},
+            model=self.model,
+            constants=self.constants,
+            index_field=self.index_field,
+            tz=self.tz,
+            trusted=self.trusted
+        )
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.column(key)
+        if isinstance(key, slice):
+            return self._take(key)
+        if isinstance(key, (np.ndarray, list)):
+            return self._take(np.asarray(key))
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("TimeSeriesFrame index out of range")
+        return self.row(key)
+
+    def __iter__(self) -> Iterator:
+        for start in range(0, len(self), self.ITER_CHUNK):
+            yield from self._build_rows(slice(start, start + self.ITER_CHUNK))
+
+    def between(self, start=None, end=None) -> "TimeSeriesFrame":
+        """按日期闭区间取子序列（二分查找，返回视图）"""
+        lo = 0 if start is None else int(np.searchsorted(self._index, np.datetime64(pd.Timestamp(start)), "left"))
+        hi = len(self) if end is None else int(np.searchsorted(self._index, np.datetime64(pd.Timestamp(end)), "right"))
+        return self._take(slice(lo, hi))
+
+    def _row_converters(self) -> Dict[str, Callable]:
+        if self._converters is None:
+            converters = {}
+            fields = self.model.model_fields if self.model else {}
+            for name in [self.index_field] + self.columns:
+                kind = _field_kind(fields[name].annotation)[0] if name in fields else "other"
+                if name == self.index_field and kind not in ("date", "datetime"):
+                    kind = "datetime"
+                converters[name] = _converter(kind, self.tz)
+            self._converters = converters
+        return self._converters
+
+    def _row_names(self) -> List[str]:
+        """行字典的字段顺序（有模型时与模型字段顺序一致）"""
+        names = list(dict.fromkeys([self.index_field] + self.columns + list(self.constants)))
+        if self.model:
+            order = list(self.model.model_fields)
+            names.sort(key=lambda name: order.index(name) if name in order else len(order))
+        return names
+
+    def row_dict(self, i: int) -> Dict[str, Any]:
+        """第 i 行的字段字典（Python 原生类型，缺失值为 None）"""
+        converters = self._row_converters()
+        row = {}
+        for name in self._row_names():
+            if name == self.index_field:
+                row[name] = converters[name](self._index[i])
+            elif name in self._columns:
+                row[name] = converters[name](self._columns[name][i])
+            else:
+                row[name] = self.constants[name]
+        return row
+
+    def row(self, i: int):
+        """第 i 行：有模型时构造模型对象，否则返回字典"""
+        row = self.row_dict(i)
+        if not self.model:
+            return row
+        return construct_trusted(self.model, row) if self.trusted else self.model(**row)
+
+    def _python_column(self, name: str, selector: slice) -> List:
+        """按列转换为 Python 原生值列表（与 row_dict 的逐值转换结果相同）"""
+        fields = self.model.model_fields if self.model else {}
+        kind = _field_kind(fields[name].annotation)[0] if name in fields else "other"
+        if name == self.index_field:
+            index = pd.DatetimeIndex(self._index[selector])
+            if kind == "date":
+                values = list(index.date)
+            else:
+                if self.tz:
+                    index = index.tz_localize("UTC").tz_convert(self.tz)
+                values = list(index.to_pydatetime())
+            return [None if pd.isna(v) else v for v in values] if index.hasnans else values
+
+        column = self._columns[name][selector]
+        if column.dtype.kind not in "iufb":
+            if kind in ("int", "float") or column.dtype.kind == "M":
+                return [_converter(kind, self.tz)(v) for v in column]
+            values = column.tolist()
+            missing = pd.isna(column)
+            if missing.any():
+                for i in np.flatnonzero(missing):
+                    values[i] = None
+            return values
+        values = column.tolist()
+        if column.dtype.kind == "f":
+            if np.isnan(column).any():
+                values = [None if v != v else v for v in values]
+            if kind == "int":
+                values = [None if v is None else int(v) for v in values]
+        elif kind == "float":
+            values = [float(v) for v in values]
+        return values
+
+    def _build_rows(self, selector: slice) -> List:
+        """按列批量转换后整批构造行（可信时跳过校验，否则整批校验）"""
+        names = self._row_names()
+        # 常量字段以 repeat 参与 zip，长度由数组列决定
+        columns = [
+            self._python_column(name, selector) if name == self.index_field or name in self._columns
+            else itertools.repeat(self.constants[name])
+            for name in names
+        ]
+        rows = [dict(zip(names, values)) for values in zip(*columns)]
+        if not self.model:
+            return rows
+        return build_models(self.model, rows, trusted=self.trusted)
+
+    # ---------- 转换 ----------
+
+    def to_frame(self) -> pd.DataFrame:
+        """转换为 DataFrame（时间列 + 各列 + 常量列）"""
+        index = pd.DatetimeIndex(self._index)
+        if self.tz:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        frame = pd.DataFrame({self.index_field: index})
+        for name, column in self._columns.items():
+            frame[name] = column
+        for name, value in self.constants.items():
+            frame[name] = value
+        return frame
+
+    def to_pydict(self, names: Optional[List[str]] = None, constants: bool = True) -> Dict[str, List]:
+        """字段名 -> Python 原生值列表（names 省略时为全部字段；constants=False 时不含常量字段）"""
+        names = names if names is not None else [
+            name for name in self._row_names() if constants or name == self.index_field or name in self._columns
+        ]
+        return {
+            name: self._python_column(name, slice(None)) if name == self.index_field or name in self._columns
+            else [self.constants[name]] * len(self)
+            for name in names
+        }
+
+    def to_records(self) -> List:
+        """全部行（一次整批构造）"""
+        return self._build_rows(slice(None))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TimeSeriesFrame):
+            return (
+                self.model is other.model
+                and self.index_field == other.index_field
+                and self.tz == other.tz
+                and self.constants == other.constants
+                and np.array_equal(self._index, other._index)
+                and self.columns == other.columns
+                and all(
+                    pd.Series(self._columns[n]).equals(pd.Series(other._columns[n])) for n in self.columns
+                )
+            )
+        if isinstance(other, list):
+            return len(other) == len(self) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    # ---------- 校验 ----------
+
+    def validate(self) -> "TimeSeriesFrame":
+        """
+        按列整体校验：必填字段无缺失、数值列类型正确、整数列为整数、满足 ge/le 等约束
+
+        Raises:
+            ValueError: 汇总所有问题（列名与不符合的行数）
+        """
+        errors = []
+        if np.isnat(self._index).any():
+            errors.append(f"{self.index_field}: {int(np.isnat(self._index).sum())} 行时间缺失")
+        if len(self) > 1 and (np.diff(self._index) < np.timedelta64(0, "ns")).any():
+            errors.append(f"{self.index_field}: 未按时间升序排列")
+
+        fields = self.model.model_fields if self.model else {}
+        for name, field in fields.items():
+            if name == self.index_field:
+                continue
+            kind, optional = _field_kind(field.annotation)
+            if name in self.constants:
+                if self.constants[name] is None and not optional:
+                    errors.append(f"{name}: 必填字段为 None")
+                continue
+            if name not in self._columns:
+                if field.is_required():
+                    errors.append(f"{name}: 缺少必填字段")
+                continue
+
+            column = self._columns[name]
+            if kind in ("float", "int"):
+                if column.dtype.kind not in "iuf":
+                    try:
+                        column = column.astype("float64")
+                    except (TypeError, ValueError):
+                        errors.append(f"{name}: 不是数值列（{column.dtype}）")
+                        continue
+                missing = np.isnan(column) if column.dtype.kind == "f" else np.zeros(len(column), dtype=bool)
+                if missing.any() and not optional:
+                    errors.append(f"{name}: {int(missing.sum())} 行必填值缺失")
+                present = column[~missing]
+                if kind == "int" and column.dtype.kind == "f" and (present != np.floor(present)).any():
+                    errors.append(f"{name}: {int((present != np.floor(present)).sum())} 行不是整数")
+                for constraint in field.metadata:
+                    if isinstance(constraint, annotated_types.Ge) and (present < constraint.ge).any():
+                        errors.append(f"{name}: {int((present < constraint.ge).sum())} 行小于 {constraint.ge}")
+                    if isinstance(constraint, annotated_types.Le) and (present > constraint.le).any():
+                        errors.append(f"{name}: {int((present > constraint.le).sum())} 行大于 {constraint.le}")
+            elif kind == "str" and not optional:
+                missing = pd.isna(pd.Series(column, dtype="object")).to_numpy()
+                if missing.any():
+                    errors.append(f"{name}: {int(missing.sum())} 行必填值缺失")
+
+        if errors:
+            model = self.model.__name__ if self.model else "TimeSeriesFrame"
+            raise ValueError(f"{model} 校验失败：" + "；".join(errors))
+        return self
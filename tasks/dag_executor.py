@@ -0,0 +1,221 @@
+# tasks/dag_executor.py
+"""
+按依赖关系并行执行分析任务
+
+Crew 的 Process.sequential 会把任务逐个执行，而基差、库存、供需、宏观、价格技术等
+分析任务之间并不相互依赖，只有最终的综合任务需要它们的输出。这里按 task.context
+构建依赖图（DAG）：依赖都已完成的任务立即提交到线程池并行执行，每个任务的上下文由
+其依赖任务的输出拼接而成（与 Crew 的处理方式一致）。整体耗时约等于最长的一条依赖链，
+而不是所有任务耗时之和。
+
+约定：
+- task.context 为任务列表时，其中属于本次执行的任务即为依赖；
+- 未设置 context 的任务视为没有依赖（与 sequential 下"接收前面所有输出"不同）；
+- 同一个 Agent 的任务不会同时执行（Agent 的执行器不是线程安全的），多个执行器并发运行
+  （如批量分析多个商品，见 main.batch_runner）时同样如此；
+- 传入 run_store 时，输入（含 data_version 给出的数据版本）未变的任务直接使用上次完成时
+  保存的输出（见 tasks.run_store）。
+
+环境变量：
+- ANALYSIS_MAX_WORKERS: 最多同时执行的任务数（默认 4）
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from crewai import Task
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+from crewai.types.usage_metrics import UsageMetrics
+from crewai.utilities.formatter import aggregate_raw_outputs_from_task_outputs
+
+from tasks.run_store import RunStore, get_tool_recorder, task_fingerprint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = int(os.getenv("ANALYSIS_MAX_WORKERS", "4"))
+
+# 进程内共享的 Agent 锁：Agent 为模块级单例，会被并发运行的多个执行器共用
+_agent_locks: Dict[int, threading.Lock] = {}
+_agent_locks_guard = threading.Lock()
+
+
+class TaskDAGExecutor:
+    """
+    任务依赖图执行器
+
+    Args:
+        tasks: 需要执行的任务（顺序仅用于结果排序）
+        max_workers: 最多同时执行的任务数，默认 ANALYSIS_MAX_WORKERS
+        inputs: 执行前插值到任务描述与期望输出中的变量（同 Crew.kickoff(inputs=...)）
+        run_store: 任务检查点存储，省略时不保存也不复用
+        data_version: 返回任务所读数据版本的函数（如 tasks.run_store.edb_data_version），
+            数据更新后任务不复用检查点；获取失败的任务照常执行且不保存检查点
+    """
+
+    def __init__(
+        self,
+        tasks: List[Task],
+        max_workers: Optional[int] = None,
+        inputs: Optional[Dict] = None,
+        run_store: Optional[RunStore] = None,
+        data_version: Optional[Callable[[Task], Optional[str]]] = None
+    ):
+        self.tasks = list(tasks)
+        self.max_workers = max(1, max_workers or DEFAULT_MAX_WORKERS)
+        self.inputs = inputs or {}
+        self.run_store = run_store
+        self.data_version = data_version
+        self.dependencies = self._build_dependencies()
+        self.timings: Dict[str, float] = {}
+        self.resumed: List[str] = []
+
+    def _build_dependencies(self) -> Dict[int, List[Task]]:
+        members = {id(task) for task in self.tasks}
+        dependencies = {}
+        for task in self.tasks:
+            context = task.context if isinstance(task.context, list) else []
+            dependencies[id(task)] = [dep for dep in context if id(dep) in members]
+        self._check_acyclic(dependencies)
+        return dependencies
+
+    def _check_acyclic(self, dependencies: Dict[int, List[Task]]):
+        remaining = {key: {id(dep) for dep in deps} for key, deps in dependencies.items()}
+        while remaining:
+            ready = [key for key, deps in remaining.items() if not deps]
+            if not ready:
+                names = [_task_label(t) for t in self.tasks if id(t) in remaining]
+                raise ValueError(f"任务依赖存在环: {names}")
+            for key in ready:
+                del remaining[key]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+
+    def _agent_lock(self, task: Task) -> threading.Lock:
+        with _agent_locks_guard:
+            return _agent_locks.setdefault(id(task.agent), threading.Lock())
+
+    def _execute(self, task: Task, context: str) -> TaskOutput:
+        label = _task_label(task)
+        fingerprint = None
+        if self.run_store is not None:
+            fingerprint = self._fingerprint(task, context)
+        if fingerprint is not None:
+            output = self.run_store.load_output(task, fingerprint)
+            if output is not None:
+                task.output = output
+                self.resumed.append(label)
+                logger.info("任务输入未变，使用检查点: %s（%s）", label, fingerprint[:12])
+                return output
+            get_tool_recorder().track(task)
+
+        with self._agent_lock(task):
+            started = time.perf_counter()
+            logger.info("开始执行任务: %s", label)
+            try:
+                output = task.execute_sync(agent=task.agent, context=context)
+            finally:
+                tool_results = get_tool_recorder().collect(task) if fingerprint else []
+            self.timings[label] = time.perf_counter() - started
+            logger.info("任务完成: %s（%.1fs）", label, self.timings[label])
+
+        if fingerprint is not None:
+            self.run_store.save(label, fingerprint, output, tool_results)
+        return output
+
+    def _fingerprint(self, task: Task, context: str) -> Optional[str]:
+        try:
+            version = self.data_version(task) if self.data_version else None
+        except Exception as e:
+            logger.warning("无法获取任务数据版本，不使用检查点: %s: %s", _task_label(task), e)
+            return None
+        return task_fingerprint(task, context, version)
+
+    def run(self) -> Dict[int, TaskOutput]:
+        """
+        执行全部任务，返回 id(task) -> 输出
+
+        任一任务失败时不再提交新任务，等待已开始的任务结束后抛出第一个异常。
+        """
+        if self.inputs:
+            for task in self.tasks:
+                task.interpolate_inputs_and_add_conversation_history(self.inputs)
+        outputs: Dict[int, TaskOutput] = {}
+        pending = list(self.tasks)
+        running: Dict[Future, Task] = {}
+        error: Optional[BaseException] = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analysis-task") as pool:
+            while pending or running:
+                if error is None:
+                    for task in [t for t in pending if all(id(d) in outputs for d in self.dependencies[id(t)])]:
+                        pending.remove(task)
+                        context = aggregate_raw_outputs_from_task_outputs(
+                            [outputs[id(dep)] for dep in self.dependencies[id(task)]]
+                        )
+                        run = contextvars.copy_context().run
+                        running[pool.submit(run, self._execute, task, context)] = task
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        outputs[id(task)] = future.result()
+                    except Exception as e:
+                        logger.error("任务失败: %s: %s", _task_label(task), e)
+                        error = error or e
+
+        if error is not None:
+            raise error
+        return outputs
+
+
+def _task_label(task: Task) -> str:
+    role = getattr(task.agent, "role", "-") if task.agent else "-"
+    return task.name or f"{role}: {task.description.strip()[:30]}"
+
+
+def run_task_dag(
+    tasks: List[Task],
+    final_task: Task,
+    max_workers: Optional[int] = None,
+    inputs: Optional[Dict] = None,
+    run_store: Optional[RunStore] = None,
+    data_version: Optional[Callable[[Task], Optional[str]]] = None
+) -> CrewOutput:
+    """
+    并行执行分析任务，再将全部输出交给最终任务
+
+    final_task.context 会被设置为 tasks，因此最终任务在所有分析任务完成后执行。
+    返回值与 Crew.kickoff() 相同（CrewOutput，raw 为最终任务的输出）。
+    传入 run_store（通常为 default_run_store()）时，重新运行会跳过输入与数据版本
+    （data_version）都未变的已完成任务。
+    """
+    final_task.context = list(tasks)
+    ordered = list(tasks) + [final_task]
+    executor = TaskDAGExecutor(
+        ordered, max_workers=max_workers, inputs=inputs, run_store=run_store, data_version=data_version
+    )
+
+    started = time.perf_counter()
+    outputs = executor.run()
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "任务图执行完成：总耗时 %.1fs，各任务耗时之和 %.1fs，复用检查点 %d 个",
+        elapsed, sum(executor.timings.values()), len(executor.resumed)
+    )
+
+    final_output = outputs[id(final_task)]
+    return CrewOutput(
+        raw=final_output.raw,
+        pydantic=final_output.pydantic,
+        json_dict=final_output.json_dict,
+        tasks_output=[outputs[id(task)] for task in ordered],
+        token_usage=UsageMetrics()
+    )
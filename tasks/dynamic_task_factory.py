@@ -3,8 +3,17 @@ from crewai import Task
 from typing import Dict, List
 from datetime import datetime
 
+# 需要前面分析报告作为输入的综合类任务；其余分析任务只依赖各自获取的数据，互不依赖
+SYNTHESIS_TASK_TYPES = ("quant_strategy", "trading")
+
+
 def create_dynamic_tasks(intent_result: Dict) -> List[Task]:
-    """根据意图解析结果创建动态任务"""
+    """
+    根据意图解析结果创建动态任务
+
+    任务名为任务类型；各分析任务的 context 为空（可并行执行），综合类任务
+    （SYNTHESIS_TASK_TYPES）的 context 为全部分析任务及排在它前面的综合类任务。
+    """
     tasks = []
     commodity = intent_result['commodity']
     start_date = intent_result['time_range']['start_date']
@@ -14,8 +23,18 @@ def create_dynamic_tasks(intent_result: Dict) -> List[Task]:
         task_type = task_config['type']
         task = _create_task_by_type(task_type, commodity, start_date, end_date)
         if task:
+            task.name = task_type
             tasks.append(task)
     
+    analysis_tasks = [t for t in tasks if t.name not in SYNTHESIS_TASK_TYPES]
+    synthesis_tasks = []
+    for task in tasks:
+        if task.name in SYNTHESIS_TASK_TYPES:
+            task.context = analysis_tasks + synthesis_tasks
+            synthesis_tasks.append(task)
+        else:
+            task.context = []
+    
     return tasks
 
 def _create_task_by_type(task_type: str, commodity: str, start_date: str, end_date: str) -> Task:
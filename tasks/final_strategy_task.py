@@ -27,17 +27,19 @@ FINAL_STRATEGY_REPORT_TEMPLATE = """
     2.  [例如：利用波动率放大的机会，构建跨式期权组合。]
 """
 
+FINAL_STRATEGY_DESCRIPTION = (
+    "你将作为首席商品策略师，审阅所有分析团队提交的报告。"
+    "你的任务是整合这些信息，进行交叉验证，并形成最终的战略结论。"
+    "请仔细阅读你收到的所有上下文信息（即前面所有任务的输出报告），"
+    "并严格按照以下步骤进行分析和报告撰写："
+    "1. **信息交叉验证**：检查各报告结论是否相互支撑，识别并分析任何矛盾信号。"
+    "2. **核心风险排序**：根据综合分析，对企业面临的主要风险进行排序。"
+    "3. **战略方向建议**：提出总体风险管理策略，并点出具体的策略机会。"
+    "4. **生成报告**：将你的分析和结论，严格地填充到给定的 Markdown 模板中。"
+)
+
 final_strategy_task = Task(
-    description=(
-        "你将作为首席商品策略师，审阅所有分析团队提交的报告。"
-        "你的任务是整合这些信息，进行交叉验证，并形成最终的战略结论。"
-        "请仔细阅读你收到的所有上下文信息（即前面所有任务的输出报告），"
-        "并严格按照以下步骤进行分析和报告撰写："
-        "1. **信息交叉验证**：检查各报告结论是否相互支撑，识别并分析任何矛盾信号。"
-        "2. **核心风险排序**：根据综合分析，对企业面临的主要风险进行排序。"
-        "3. **战略方向建议**：提出总体风险管理策略，并点出具体的策略机会。"
-        "4. **生成报告**：将你的分析和结论，严格地填充到给定的 Markdown 模板中。"
-    ),
+    description=FINAL_STRATEGY_DESCRIPTION,
     expected_output=FINAL_STRATEGY_REPORT_TEMPLATE,
     agent=chief_strategy_agent,
     # 这是关键！将此任务的上下文设置为所有前置的分析任务
@@ -48,3 +50,17 @@ final_strategy_task = Task(
         # ...
     ]
 )
+
+
+def create_final_strategy_task(commodity_name: str) -> Task:
+    """
+    创建一个新的最终战略任务实例（并行执行或批量运行时每次分析使用独立实例）
+
+    context 由调用方设置为各分析任务，见 tasks.dag_executor.run_task_dag。
+    """
+    return Task(
+        name="final_strategy",
+        description=FINAL_STRATEGY_DESCRIPTION,
+        expected_output=FINAL_STRATEGY_REPORT_TEMPLATE.format(commodity_name=commodity_name),
+        agent=chief_strategy_agent
+    )
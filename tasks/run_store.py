@@ -0,0 +1,214 @@
+# tasks/run_store.py
+"""
+分析任务的检查点存储
+
+一次完整分析要执行多个调用 LLM 的任务，中途失败时重新运行会为前面已完成的任务再付一次
+工具调用与 LLM 调用的代价。这里把每个完成的任务（输出、工具调用结果、输入指纹）写入本地
+存储；再次运行时，输入指纹未变的任务直接取回上次的输出，从第一个未完成的任务继续执行。
+
+输入指纹由任务描述、期望输出、Agent（角色、目标、模型）、工具名、依赖任务输出拼成的
+上下文以及任务读取的数据版本计算，见 task_fingerprint。任务文本中的创建时间（如报告
+模板的"分析时间"）不参与计算。数据源发布了新数据时，读取它的
+任务指纹改变（数据版本见 edb_data_version）；上游任务重新执行后输出变了，下游任务的
+指纹随之改变，不会误用旧结果。
+
+环境变量：
+- ANALYSIS_CHECKPOINT_ENABLED: 是否启用检查点（默认 true）
+- ANALYSIS_RUN_STORE_DIR: 存储目录（默认 data/runs）
+- ANALYSIS_CHECKPOINT_MAX_AGE_HOURS: 检查点有效期（小时，默认 24；0 表示不过期），
+  未提供数据版本的任务（及提示词、模型之外的变化）在有效期后不再复用
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from crewai import Task
+from crewai.events import crewai_event_bus
+from crewai.events.types.tool_usage_events import ToolUsageFinishedEvent
+from crewai.tasks.task_output import TaskOutput
+
+logger = logging.getLogger(__name__)
+
+# 任务工厂写入描述/期望输出的创建时间（datetime.now() 的 '%Y-%m-%d %H:%M:%S'），每次运行都不同
+_CREATED_AT = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+
+
+def checkpoint_enabled() -> bool:
+    return os.getenv("ANALYSIS_CHECKPOINT_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def default_run_store() -> Optional["RunStore"]:
+    """工作流使用的检查点存储，ANALYSIS_CHECKPOINT_ENABLED=false 时为 None"""
+    return RunStore() if checkpoint_enabled() else None
+
+
+def _without_created_at(text: Optional[str]) -> Optional[str]:
+    return _CREATED_AT.sub("<创建时间>", text) if text else text
+
+
+def task_fingerprint(task: Task, context: str, data_version: Optional[str] = None) -> str:
+    """
+    任务输入指纹：任务定义 + Agent + 工具 + 上下文（依赖任务的输出）+ 数据版本
+
+    任务文本中精确到秒的时间戳视为创建时间，不参与计算（时间范围等日期照常参与）。
+    """
+    agent = task.agent
+    llm = getattr(agent, "llm", None) if agent else None
+    tools = task.tools or (getattr(agent, "tools", None) if agent else None) or []
+    canonical = json.dumps({
+        "description": _without_created_at(task.description),
+        "expected_output": _without_created_at(task.expected_output),
+        "agent": [getattr(agent, "role", None), getattr(agent, "goal", None)] if agent else None,
+        "model": getattr(llm, "model", None) or (llm if isinstance(llm, str) else None),
+        "tools": sorted(getattr(tool, "name", type(tool).__name__) for tool in tools),
+        "context": context or "",
+        "data": data_version,
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def edb_data_version(
+    scopes: Dict[int, Tuple[Sequence[str], str, str]],
+    fetcher=None
+) -> Callable[[Task], str]:
+    """
+    按任务读取的 EDB 数据计算数据版本，用作 TaskDAGExecutor 的 data_version
+
+    scopes 为 id(task) -> (任务类型, start_date, end_date)，即该任务的工具读取哪些指标；
+    不在 scopes 中的任务（如最终战略任务）综合全部分析，数据版本由所有范围合并得到。
+    数据经 IFindDataFetcher.data_fingerprint 获取（即预取），任务的工具调用随后复用同一份数据。
+    """
+    def version(task: Task) -> str:
+        if fetcher is None:
+            from tools.ifind_tool import get_data_fetcher
+            source = get_data_fetcher()
+        else:
+            source = fetcher
+        scope = scopes.get(id(task))
+        digest = hashlib.sha256()
+        for task_types, start_date, end_date in ([scope] if scope else scopes.values()):
+            digest.update(source.data_fingerprint(task_types, start_date, end_date).encode("utf-8"))
+        return digest.hexdigest()
+
+    return version
+
+
+class ToolResultRecorder:
+    """
+    按任务收集工具调用结果（订阅 crewai 的 ToolUsageFinishedEvent）
+
+    事件处理器在 crewai 的后台线程中执行，collect() 前先等待已发出的事件处理完毕。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: Dict[str, List[Dict]] = defaultdict(list)
+        self._tracked: set = set()
+        crewai_event_bus.register_handler(ToolUsageFinishedEvent, self._on_tool_finished)
+
+    def _on_tool_finished(self, source: Any, event: ToolUsageFinishedEvent):
+        with self._lock:
+            if event.task_id not in self._tracked:
+                return
+            self._results[event.task_id].append({
+                "tool": event.tool_name,
+                "args": event.tool_args,
+                "output": event.output if isinstance(event.output, (str, int, float, bool)) else str(event.output),
+                "from_cache": event.from_cache,
+                "elapsed": (event.finished_at - event.started_at).total_seconds(),
+            })
+
+    def track(self, task: Task):
+        with self._lock:
+            self._tracked.add(str(task.id))
+
+    def collect(self, task: Task) -> List[Dict]:
+        """返回并清除该任务的工具调用结果"""
+        crewai_event_bus.flush()
+        task_id = str(task.id)
+        with self._lock:
+            self._tracked.discard(task_id)
+            return self._results.pop(task_id, [])
+
+
+_recorder: Optional[ToolResultRecorder] = None
+_recorder_lock = threading.Lock()
+
+
+def get_tool_recorder() -> ToolResultRecorder:
+    """进程内共享的工具结果收集器（事件处理器只注册一次）"""
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None:
+            _recorder = ToolResultRecorder()
+        return _recorder
+
+
+class RunStore:
+    """
+    任务检查点：<root>/<指纹前2位>/<指纹>.json.gz
+
+    每个文件保存任务名、输入指纹、输出（TaskOutput）、工具调用结果与完成时间，
+    写入时先写临时文件再原子替换。
+
+    Args:
+        root: 存储目录，默认 ANALYSIS_RUN_STORE_DIR
+        max_age_hours: 检查点有效期，默认 ANALYSIS_CHECKPOINT_MAX_AGE_HOURS，0 表示不过期
+    """
+
+    def __init__(self, root: Optional[str] = None, max_age_hours: Optional[float] = None):
+        self.root = root or os.getenv("ANALYSIS_RUN_STORE_DIR", os.path.join("data", "runs"))
+        if max_age_hours is None:
+            max_age_hours = float(os.getenv("ANALYSIS_CHECKPOINT_MAX_AGE_HOURS", "24"))
+        self.max_age = max_age_hours * 3600
+
+    def path_for(self, fingerprint: str) -> str:
+        return os.path.join(self.root, fingerprint[:2], f"{fingerprint}.json.gz")
+
+    def save(self, label: str, fingerprint: str, output: TaskOutput, tool_results: List[Dict]) -> str:
+        path = self.path_for(fingerprint)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = output.model_dump(mode="json", exclude={"pydantic"})
+        if output.pydantic is not None and data.get("json_dict") is None:
+            data["json_dict"] = output.pydantic.model_dump(mode="json")
+        entry = {
+            "task": label,
+            "fingerprint": fingerprint,
+            "output": data,
+            "tool_results": tool_results,
+            "completed_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+    def load(self, fingerprint: str) -> Optional[Dict]:
+        """返回检查点条目，不存在或已过期时返回 None"""
+        path = self.path_for(fingerprint)
+        try:
+            if self.max_age > 0 and time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, EOFError, json.JSONDecodeError):
+            return None
+
+    def load_output(self, task: Task, fingerprint: str) -> Optional[TaskOutput]:
+        """还原任务输出（有 output_pydantic 时由 json_dict 重建模型）"""
+        entry = self.load(fingerprint)
+        if entry is None:
+            return None
+        output = TaskOutput.model_validate(entry["output"])
+        if task.output_pydantic is not None and output.json_dict is not None:
+            output.pydantic = task.output_pydantic.model_validate(output.json_dict)
+        return output
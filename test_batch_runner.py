@@ -0,0 +1,67 @@
+# test_batch_runner.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from main.batch_runner import BatchAnalysisRunner, format_batch_summary, jobs_for
+from tasks.dag_executor import TaskDAGExecutor
+from test_stubs import CountingSource, FakeAgent, FakeTask, temporary_env, temporary_logs
+from tools.ifind_tool import get_data_fetcher, reset_data_fetcher
+
+COMMODITIES = ["沥青", "螺纹钢", "铜", "原油", "铝"]
+
+
+def _fake_analysis(intent):
+    """模拟一个商品的分析流程：每个任务通过共享获取器取数后调用 LLM"""
+    if intent['commodity'] == "原油":
+        raise RuntimeError("LLM 调用超时")
+    fetcher = get_data_fetcher()
+    start, end = intent['time_range']['start_date'], intent['time_range']['end_date']
+    reports = []
+    for config in intent['task_configs']:
+        indicators = fetcher.mapping.get_required_indicators(config['type'])
+        summary = fetcher.get_edb_data_with_debug(indicators, start, end, config['type'], config['type'])
+        assert not summary.startswith("❌"), summary
+        time.sleep(0.05)
+        reports.append(config['type'])
+    return f"{intent['commodity']}: {', '.join(reports)}"
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token")
+@temporary_logs()
+def test_batch_shares_data_and_reports_failures():
+    """测试批量分析并发执行、共享预取数据，单个商品失败不影响其他商品"""
+    reset_data_fetcher()
+    source = get_data_fetcher().edb_source = CountingSource(seconds=0.1)
+    try:
+        jobs = jobs_for(COMMODITIES, "2024-01-01", "2024-06-30", task_types=("basis", "inventory", "macro_economic"))
+        started = time.perf_counter()
+        results = BatchAnalysisRunner(max_commodities=5, run_analysis=_fake_analysis).run(jobs)
+        elapsed = time.perf_counter() - started
+
+        assert [r.commodity for r in results] == COMMODITIES
+        assert [r.ok for r in results] == [True, True, True, False, True]
+        assert results[0].report == "沥青: basis, inventory, macro_economic"
+        assert "LLM 调用超时" in results[3].error and "RuntimeError" in results[3].traceback
+        assert len(source.calls) == 1  # 五个商品的指标只在预取时请求一次
+        assert elapsed < sum(r.elapsed for r in results)
+
+        summary = format_batch_summary(results)
+        assert "| 原油 | ❌ 失败 |" in summary and summary.count("✅ 完成") == 4
+    finally:
+        reset_data_fetcher()
+
+
+def test_agent_not_shared_across_concurrent_runs():
+    """测试并发运行的多个商品流程中，同一 Agent 的任务依次执行"""
+    agent = FakeAgent("库存分析师")
+    tasks = [FakeTask(f"{c}库存", agent, seconds=0.1) for c in COMMODITIES[:3]]
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        list(pool.map(lambda t: TaskDAGExecutor([t]).run(), tasks))
+    spans = sorted((t.started, t.finished) for t in tasks)
+    assert all(prev[1] <= nxt[0] for prev, nxt in zip(spans, spans[1:]))
+
+
+if __name__ == "__main__":
+    test_batch_shares_data_and_reports_failures()
+    test_agent_not_shared_across_concurrent_runs()
+    print("✅ 多商品批量分析测试通过")
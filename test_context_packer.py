@@ -0,0 +1,91 @@
+# test_context_packer.py
+from datetime import date
+
+import pandas as pd
+
+from config.ifind_edb_mapping import IFindEDBMapping
+from data_service.ifind_stub import build_edb_tables
+from tools.context_packer import downsample, lttb, pack_tool_result
+from tools.data_digest import estimate_tokens
+
+DAILY = "S002861328"
+MONTHLY = "S019295592"
+
+
+def test_downsample():
+    """测试月末取值与 LTTB 降采样"""
+    index = pd.date_range("2023-01-01", "2024-12-31", freq="D")
+    values = pd.Series(range(len(index)), index=index, dtype="float64")
+    values[pd.Timestamp("2023-07-15")] = 5000.0
+
+    month_end = downsample(values, max_points=30)
+    assert len(month_end) == 24 and month_end.index[0] == pd.Timestamp("2023-01-31")
+
+    points = downsample(values, max_points=8)
+    assert len(points) == 8
+    assert points.index[0] == pd.Timestamp("2023-01-31") and points.index[-1] == index[-1]
+
+    sampled = lttb(values, 10)
+    assert len(sampled) == 10 and pd.Timestamp("2023-07-15") in sampled.index
+    assert downsample(values.iloc[:5], max_points=8).equals(values.iloc[:5])
+
+
+def test_pack_covers_all_tables():
+    """测试预算充足时覆盖全部指标（EDB 与行情结构）并附加走势，且无重复行"""
+    tables = build_edb_tables([DAILY, MONTHLY, "S004494146", "S009134934"], date(2022, 1, 1), date(2024, 12, 31))
+    tables.append({"id": ["S000000000"], "time": [], "value": []})
+    tables.append({
+        "thscode": "bu2506.SHF",
+        "time": ["2024-12-30", "2024-12-31"],
+        "table": {"close": [3500.0, 3520.0], "volume": [1000, None]}
+    })
+
+    text = pack_tool_result(tables, "供需", "2022-01-01", "2024-12-31", token_budget=5000)
+    print(text)
+    lines = text.splitlines()
+    assert len(lines) == len(set(lines))
+    assert f"[{DAILY}]" in text and f"[{MONTHLY}]" in text
+    assert "bu2506.SHF close" in text and "bu2506.SHF volume" in text
+    assert "1 个指标在该区间无数据" in text
+    assert "往年同月均值" in text
+    assert text.count("走势:") == 4
+    assert "省略" not in text
+
+
+def test_budget_and_relevance():
+    """测试输出不超过预算，且按任务相关度保留指标"""
+    mapping = IFindEDBMapping()
+    indicators = mapping.get_required_indicators("basis")[:60]
+    tables = build_edb_tables(indicators, date(2023, 1, 1), date(2024, 12, 31))
+
+    for budget in (300, 800, 2000, 6000):
+        text = pack_tool_result(tables, "基差", "2023-01-01", "2024-12-31",
+                                task_type="basis", mapping=mapping, token_budget=budget)
+        assert estimate_tokens(text) <= budget
+
+    text = pack_tool_result(tables, "基差", "2023-01-01", "2024-12-31",
+                            task_type="basis", mapping=mapping, token_budget=300)
+    assert "因篇幅省略" in text
+    assert indicators[0] in text.splitlines()[2]
+    assert indicators[-1] not in text
+
+
+def test_provider_budget():
+    """测试 LLM 的上下文窗口与工具结果预算取自配置"""
+    from llm_config.base_llm import UnifiedLLM
+
+    class FakeLLM(UnifiedLLM):
+        def call(self, messages, tools=None, **kwargs):
+            return ""
+
+    assert FakeLLM(model="m").get_context_window_size() == 8192
+    assert FakeLLM(model="m").get_tool_result_budget() == 2048
+    assert FakeLLM(model="m", context_window=32768, tool_result_tokens=3000).get_tool_result_budget() == 3000
+
+
+if __name__ == "__main__":
+    test_downsample()
+    test_pack_covers_all_tables()
+    test_budget_and_relevance()
+    test_provider_budget()
+    print("✅ 上下文打包测试通过")
@@ -0,0 +1,49 @@
+# test_data_digest.py
+from datetime import date
+
+import pandas as pd
+
+from data_service.ifind_stub import build_edb_tables
+from tools.data_digest import clean_series, digest_series, extract_series
+
+DAILY = "S002861328"
+MONTHLY = "S019295592"
+
+
+def test_digest_series_stats():
+    """测试单个序列的统计量"""
+    index = pd.date_range("2022-01-01", "2024-12-31", freq="D")
+    values = pd.Series(range(len(index)), index=index, dtype="float64")
+    digest = digest_series("X", "测试", values)
+
+    assert digest.last_value == len(index) - 1
+    assert digest.last_date == pd.Timestamp("2024-12-31")
+    assert abs(digest.changes["1周"] - (digest.last_value / (digest.last_value - 7) - 1)) < 1e-9
+    assert digest.changes["1年"] > digest.changes["1月"] > 0
+    assert digest.percentile == 100
+    assert digest.min_date == pd.Timestamp("2022-01-01") and digest.max_value == digest.last_value
+    assert digest.zscore > 1.5
+    assert digest.seasonal_mean is not None and digest.seasonal_mean < digest.last_value
+
+
+def test_extract_series():
+    """测试 EDB 与行情结构的序列提取"""
+    tables = build_edb_tables([DAILY, MONTHLY], date(2024, 1, 1), date(2024, 12, 31))
+    tables.append({"id": ["S000000000"], "time": [], "value": []})
+    tables.append({
+        "thscode": "bu2506.SHF",
+        "time": ["2024-12-30", "2024-12-31"],
+        "table": {"close": [3500.0, 3520.0], "volume": [1000, None]}
+    })
+
+    series = extract_series(tables)
+    assert [s["key"] for s in series] == [DAILY, MONTHLY, "S000000000", "bu2506.SHF.close", "bu2506.SHF.volume"]
+    assert series[1]["frequency"] == "monthly"
+    assert digest_series("S000000000", "空", series[2]["values"]) is None
+    assert clean_series(series[0]["values"]).index.is_monotonic_increasing
+
+
+if __name__ == "__main__":
+    test_digest_series_stats()
+    test_extract_series()
+    print("✅ 数据统计摘要测试通过")
@@ -0,0 +1,125 @@
+# test_data_replay.py
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import time
+
+import requests
+
+from data_providers.replay import ReplayMissError, ReplayRecorder, ResponseArchive, request_fingerprint
+from data_service.ifind_stub import run_stub_server, stub_state
+
+STUB_PORT = 18087
+
+
+def _recorders(latency=0):
+    archive = ResponseArchive(tempfile.mkdtemp())
+    return ReplayRecorder("record", archive), ReplayRecorder("replay", archive, latency=latency)
+
+
+def test_record_then_replay():
+    """测试录制后回放不再调用真实请求，密钥不参与指纹且不写入归档，可模拟延迟"""
+    recorder, replayer = _recorders(latency="recorded")
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"tables": [1, 2, 3]}
+
+    params = {"codes": "S002861328", "secret_key": "live-secret"}
+    assert recorder.call("ifind", "edb_service", params, fetch) == {"tables": [1, 2, 3]}
+
+    start = time.perf_counter()
+    replayed = replayer.call("ifind", "edb_service", {"codes": "S002861328", "secret_key": "other"}, fetch)
+    assert replayed == {"tables": [1, 2, 3]}
+    assert time.perf_counter() - start >= 0.05
+    assert len(calls) == 1
+
+    path = recorder.archive.path_for("ifind", request_fingerprint("ifind", "edb_service", params))
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert "live-secret" not in f.read()
+
+    try:
+        replayer.call("ifind", "edb_service", {"codes": "S999"}, fetch)
+        assert False, "应抛出 ReplayMissError"
+    except ReplayMissError as e:
+        assert e.endpoint == "edb_service"
+
+    result = asyncio.run(replayer.call_async("ifind", "edb_service", params, fetch))
+    assert result == {"tables": [1, 2, 3]}
+
+
+def test_ifind_client_replay():
+    """测试 IFinDHTTPClient 录制后离线回放（回放时服务不可用、无凭证）"""
+    from data_providers.ifind_http_client import IFinDHTTPClient
+
+    server = run_stub_server(port=STUB_PORT)
+    saved = {key: os.environ.get(key) for key in ("IFIND_ACCESS_TOKEN", "IFIND_BASE_URL")}
+    recorder, replayer = _recorders()
+    try:
+        os.environ.update({"IFIND_ACCESS_TOKEN": "stub-token", "IFIND_BASE_URL": f"http://127.0.0.1:{STUB_PORT}/api/v1"})
+        stub_state.reset()
+        with IFinDHTTPClient(use_edb_cache=False, replay=recorder) as client:
+            live = client.get_edb_data(["S002861328", "S019295592"], "2024-01-01", "2024-12-31")
+        assert stub_state.request_counts.get("edb_service") == 1
+
+        os.environ.pop("IFIND_ACCESS_TOKEN")
+        os.environ["IFIND_BASE_URL"] = "http://127.0.0.1:9/api/v1"
+        with IFinDHTTPClient(use_edb_cache=False, replay=replayer) as client:
+            replayed = client.get_edb_data(["S002861328", "S019295592"], "2024-01-01", "2024-12-31")
+        assert replayed == live
+        assert stub_state.request_counts.get("edb_service") == 1
+    finally:
+        stub_state.reset()
+        server.should_exit = True
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def test_aitrados_replay():
+    """测试 AitradosDataProvider 录制原始响应并离线回放"""
+    from data_providers import aitrados_data
+    from data_providers.aitrados_data import AitradosDataProvider
+
+    body = {"status": "ok", "result": {"data": [{
+        "datetime": "2025-06-06T00:00:00+00:00", "close_datetime": "2025-06-06T07:00:00+00:00",
+        "symbol": "RB2510", "open": 3000, "high": 3050, "low": 2990, "close": 3020,
+        "volume": 1000, "open_interest": 5000
+    }]}}
+
+    def fake_get(url, params=None, timeout=None):
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = json.dumps(body).encode("utf-8")
+        return resp
+
+    recorder, replayer = _recorders()
+    saved_key, saved_get = os.environ.get("AITRADOS_SECRET_KEY"), aitrados_data.requests.get
+    try:
+        os.environ["AITRADOS_SECRET_KEY"] = "live-secret"
+        aitrados_data.requests.get = fake_get
+        live = AitradosDataProvider(replay=recorder).get_history_data("future", "cn", "rb", None, None)
+
+        aitrados_data.requests.get = saved_get
+        os.environ.pop("AITRADOS_SECRET_KEY")
+        replayed = AitradosDataProvider(replay=replayer).get_history_data("future", "cn", "rb", None, None)
+    finally:
+        aitrados_data.requests.get = saved_get
+        if saved_key is not None:
+            os.environ["AITRADOS_SECRET_KEY"] = saved_key
+
+    assert len(live) == 1
+    assert replayed == live
+
+
+if __name__ == "__main__":
+    test_record_then_replay()
+    test_ifind_client_replay()
+    test_aitrados_replay()
+    print("✅ 录制/回放测试通过")
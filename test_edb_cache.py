@@ -0,0 +1,76 @@
+# test_edb_cache.py
+import asyncio
+from datetime import datetime
+
+import httpx
+
+from data_providers.edb_cache import EDBIndicatorCache, estimate_table_size
+from data_service.ifind_stub import app, stub_state
+from test_stubs import temporary_env
+
+STUB_ENV = {"IFIND_ACCESS_TOKEN": "stub-token", "IFIND_BASE_URL": "http://ifind-stub/api/v1"}
+
+
+def test_ttl_by_frequency():
+    """测试按指标频率推算过期时间"""
+    cache = EDBIndicatorCache(default_ttl=3600)
+
+    # 日频指标：日内刷新
+    assert cache.ttl_for("S002861328", now=datetime(2026, 1, 20, 10)) == 3600
+    # 月频指标（update_time=20251229）：更新窗口内短过期，窗口外缓存到下一个更新日
+    assert cache.ttl_for("S019295593", now=datetime(2025, 12, 30, 10)) == 3600
+    ttl = cache.ttl_for("S019295593", now=datetime(2026, 1, 10, 0))
+    assert ttl == (datetime(2026, 1, 29) - datetime(2026, 1, 10)).total_seconds()
+    # 未登记的指标使用默认过期时间
+    assert cache.ttl_for("UNKNOWN", now=datetime(2026, 1, 10)) == 3600
+
+
+def test_lru_eviction_by_size():
+    """测试按内存大小淘汰最久未使用的条目"""
+    table = {"id": ["A"], "time": ["2025-01-01"] * 100, "value": ["1.0"] * 100}
+    max_bytes = int(estimate_table_size(table) * 2.5)
+    cache = EDBIndicatorCache(max_bytes=max_bytes, default_ttl=3600)
+
+    cache.put("A", "2025-01-01", "2025-12-31", table)
+    cache.put("B", "2025-01-01", "2025-12-31", table)
+    assert cache.get("A", "2025-01-01", "2025-12-31") is table
+    cache.put("C", "2025-01-01", "2025-12-31", table)
+
+    stats = cache.get_stats()
+    print(f"缓存统计: {stats}")
+    assert stats["bytes"] <= max_bytes
+    assert stats["evictions"] >= 1
+    assert cache.get("B", "2025-01-01", "2025-12-31") is None
+    assert cache.get("C", "2025-01-01", "2025-12-31") is table
+
+
+@temporary_env(**STUB_ENV)
+def test_client_serves_hits_from_cache():
+    """测试客户端只为未命中的指标发起请求"""
+    from data_providers.ifind_async_client import AsyncIFinDHTTPClient
+
+    stub_state.reset()
+
+    async def run():
+        async with AsyncIFinDHTTPClient(transport=httpx.ASGITransport(app=app)) as client:
+            first = await client.get_edb_data(["S002861328", "S002861333"], "2025-01-01", "2025-03-31")
+            second = await client.get_edb_data(["S002861333", "S002861328", "S002861337"], "2025-01-01", "2025-03-31")
+            return client, first, second
+
+    client, first, second = asyncio.run(run())
+    assert stub_state.request_counts["edb_service"] == 2
+    assert second["tables"][0] == first["tables"][1]
+    assert second["tables"][2]["id"] == ["S002861337"]
+    stats = client.get_cache_stats()
+    assert stats["hits"] == 2 and stats["misses"] == 3
+
+    shared = EDBIndicatorCache()
+    assert AsyncIFinDHTTPClient(edb_cache=shared).edb_cache is shared
+    assert AsyncIFinDHTTPClient(edb_cache=shared, use_edb_cache=False).edb_cache is None
+
+
+if __name__ == "__main__":
+    test_ttl_by_frequency()
+    test_lru_eviction_by_size()
+    test_client_serves_hits_from_cache()
+    print("✅ EDB缓存测试通过")
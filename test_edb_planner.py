@@ -0,0 +1,63 @@
+# test_edb_planner.py
+from datetime import date
+
+from data_providers.edb_planner import FrequencyRequestPlanner
+from data_providers.ifind_edb_utils import build_edb_response
+from data_service.ifind_stub import build_edb_tables
+from config.ifind_edb_mapping import IFindEDBMapping
+
+DAILY = "S002861328"
+WEEKLY = "S009134934"
+MONTHLY = "S019295592"
+
+
+class PaddingSource:
+    """模拟 iFinD：一次请求中的所有指标按日期并集对齐，缺失处填充 None"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get_edb_data(self, indicators, start_date, end_date):
+        self.requests.append(list(indicators))
+        tables = build_edb_tables(indicators, date.fromisoformat(start_date), date.fromisoformat(end_date))
+        axis = sorted({t for table in tables for t in table["time"]}, reverse=True)
+        padded = []
+        for table in tables:
+            values = dict(zip(table["time"], table["value"]))
+            padded.append({"id": table["id"], "time": axis, "value": [values.get(t) for t in axis]})
+        return build_edb_response(padded, indicators, start_date, end_date)
+
+
+def test_split_by_frequency():
+    """测试按频率分组请求，结果按原顺序排列且不含填充值"""
+    source = PaddingSource()
+    planner = FrequencyRequestPlanner(source, IFindEDBMapping())
+    indicators = [DAILY, MONTHLY, WEEKLY]
+
+    result = planner.get_edb_data(indicators, "2025-01-01", "2025-06-30")
+
+    assert sorted(map(tuple, source.requests)) == sorted([(DAILY,), (WEEKLY,), (MONTHLY,)])
+    assert [t["id"][0] for t in result["tables"]] == indicators
+    assert all(None not in t["value"] for t in result["tables"])
+    assert len(result["tables"][1]["time"]) == 6
+    assert result["frequency_groups"] == {"monthly": [MONTHLY], "weekly": [WEEKLY], "daily": [DAILY]}
+
+    padded = PaddingSource().get_edb_data(indicators, "2025-01-01", "2025-06-30")
+    assert result["dataVol"] < sum(len(t["time"]) for t in padded["tables"]) / 2
+
+
+def test_aligned_frame():
+    """测试对齐为 DataFrame"""
+    planner = FrequencyRequestPlanner(PaddingSource())
+    frame = planner.get_aligned_frame([WEEKLY, MONTHLY, DAILY], "2025-01-01", "2025-03-31")
+
+    assert list(frame.columns) == [WEEKLY, MONTHLY, DAILY]
+    assert frame.index.is_monotonic_increasing
+    assert frame[MONTHLY].notna().sum() == 3
+    assert frame[DAILY].notna().sum() == len(frame)
+
+
+if __name__ == "__main__":
+    test_split_by_frequency()
+    test_aligned_frame()
+    print("✅ 按频率拆分请求测试通过")
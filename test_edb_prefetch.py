@@ -0,0 +1,87 @@
+# test_edb_prefetch.py
+from test_stubs import CountingSource, temporary_env, temporary_logs
+from tools import ifind_tool
+from tools.edt_data_tool_enhanced import EnhancedEDBDataToolFixed
+from tools.ifind_tool import IFindDataFetcher
+
+START, END = "2024-01-01", "2024-06-30"
+
+
+def _fetcher(seconds: float = 0.0):
+    fetcher = IFindDataFetcher()
+    fetcher.edb_source = CountingSource(seconds)
+    return fetcher
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token")
+@temporary_logs()
+def test_tool_calls_use_prefetched_tables():
+    """测试预取指标并集后，工具调用不再发起请求，结果与直接获取一致"""
+    fetcher, direct = _fetcher(seconds=0.2), _fetcher()
+    try:
+        task_types = ["basis", "inventory", "basis"]
+        fetcher.prefetch(task_types, START, END)
+        expected = list(dict.fromkeys(
+            i for t in task_types for i in fetcher.mapping.get_required_indicators(t)
+        ))
+
+        for task_type in ("basis", "inventory"):
+            indicators = fetcher.mapping.get_required_indicators(task_type)
+            summary = fetcher.get_edb_data_with_debug(indicators, START, END, task_type, task_type)
+            assert summary == direct.get_edb_data_with_debug(indicators, START, END, task_type, task_type)
+        assert fetcher.edb_source.calls == [expected]
+    finally:
+        fetcher.close()
+        direct.close()
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token")
+@temporary_logs()
+def test_fallback_when_not_covered():
+    """测试时间范围不同、指标未预取或预取失败时照常请求"""
+    fetcher = _fetcher()
+    try:
+        fetcher.prefetch(["basis"], START, END).result()
+        basis = fetcher.mapping.get_required_indicators("basis")
+        inventory = fetcher.mapping.get_required_indicators("inventory")
+
+        fetcher.get_edb_data_with_debug(basis, START, "2024-03-31", "基差")
+        fetcher.get_edb_data_with_debug(inventory, START, END, "库存")
+        assert fetcher.edb_source.calls[1:] == [basis, inventory]
+
+        # 同一时间范围再次预取只补充缺少的指标
+        fetcher.prefetch(["basis", "inventory"], START, END).result()
+        missing = [i for i in inventory if i not in basis]
+        assert fetcher.edb_source.calls[-1] == missing
+
+        fetcher.edb_source.get_edb_data = lambda **kwargs: {"errorcode": -1, "errmsg": "超时"}
+        failed = fetcher.prefetch(["basis"], "2023-01-01", "2023-12-31")
+        assert fetcher._prefetched_result(basis, "2023-01-01", "2023-12-31") is None
+        assert failed.exception() is not None
+    finally:
+        fetcher.close()
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token")
+@temporary_logs()
+def test_enhanced_tool_uses_shared_fetcher():
+    """测试增强版EDB工具经共享的数据获取器取数（复用预取结果，按 token 预算打包）"""
+    fetcher = _fetcher()
+    saved, ifind_tool._shared_fetcher = ifind_tool._shared_fetcher, fetcher
+    try:
+        fetcher.prefetch(["inventory"], START, END).result()
+        indicators = fetcher.mapping.get_required_indicators("inventory")
+        summary = EnhancedEDBDataToolFixed(token_budget=300).get_inventory_analysis_data(START, END)
+        assert summary == fetcher.get_edb_data_with_debug(indicators, START, END, "库存", "inventory", token_budget=300)
+        assert len(summary) < len(fetcher.get_edb_data_with_debug(indicators, START, END, "库存", "inventory"))
+        assert len(fetcher.edb_source.calls) == 1
+    finally:
+        ifind_tool._shared_fetcher = saved
+        fetcher.close()
+
+
+if __name__ == "__main__":
+    test_tool_calls_use_prefetched_tables()
+    test_fallback_when_not_covered()
+    test_enhanced_tool_uses_shared_fetcher()
+    print("✅ 数据预取测试通过")
@@ -0,0 +1,58 @@
+# test_edb_store.py
+import tempfile
+from datetime import date, timedelta
+
+from data_providers.edb_store import EDBTimeSeriesStore
+from data_service.ifind_stub import build_edb_tables
+
+
+class RecordingClient:
+    """记录请求区间的模拟客户端"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_edb_data(self, indicators, start_date, end_date):
+        self.calls.append((tuple(indicators), start_date, end_date))
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date)
+        return {"errorcode": 0, "errmsg": "success", "tables": build_edb_tables(indicators, start, end)}
+
+
+def test_incremental_sync():
+    """测试只拉取缺口区间，已覆盖区间从磁盘读取"""
+    indicators = ["S002861328", "S009135170"]
+    client = RecordingClient()
+
+    with tempfile.TemporaryDirectory() as root_dir:
+        store = EDBTimeSeriesStore(client, root_dir=root_dir)
+        first = store.get_edb_data(indicators, "2024-01-01", "2024-06-30")
+        assert client.calls == [(tuple(indicators), "2024-01-01", "2024-06-30")]
+
+        # 完全覆盖的区间不再请求
+        subset = store.get_edb_data(indicators, "2024-02-01", "2024-03-31")
+        assert len(client.calls) == 1
+        direct = client.get_edb_data(indicators, "2024-02-01", "2024-03-31")
+        client.calls.pop()
+        assert subset["tables"] == direct["tables"]
+
+        # 向后延伸只拉取尾部缺口
+        store.get_edb_data(indicators, "2024-01-01", "2024-09-30")
+        assert client.calls[-1] == (tuple(indicators), "2024-06-30", "2024-09-30")
+
+        # 新建实例从清单恢复覆盖信息
+        reopened = EDBTimeSeriesStore(client, root_dir=root_dir)
+        again = reopened.get_edb_data(indicators, "2024-01-01", "2024-06-30")
+        assert len(client.calls) == 2
+        assert again["tables"] == first["tables"]
+
+        # 当天的数据每次都会重新同步
+        today = date.today()
+        reopened.get_edb_data(indicators, (today - timedelta(days=10)).isoformat(), today.isoformat())
+        reopened.get_edb_data(indicators, (today - timedelta(days=10)).isoformat(), today.isoformat())
+        assert client.calls[-1][1:] == ((today - timedelta(days=1)).isoformat(), today.isoformat())
+
+
+if __name__ == "__main__":
+    test_incremental_sync()
+    print("✅ EDB本地存储测试通过")
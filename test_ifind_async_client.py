@@ -0,0 +1,63 @@
+# test_ifind_async_client.py
+import asyncio
+
+import httpx
+import pandas as pd
+
+from data_providers.ifind_async_client import AsyncIFinDHTTPClient
+from data_providers.ifind_table_parser import edb_result_to_frames
+from data_service.ifind_stub import app, stub_state
+from test_stubs import temporary_env
+
+STUB_ENV = {"IFIND_ACCESS_TOKEN": "stub-token", "IFIND_BASE_URL": "http://ifind-stub/api/v1"}
+
+
+@temporary_env(**STUB_ENV)
+def test_async_methods():
+    """测试异步客户端的各个接口"""
+    stub_state.reset()
+
+    async def run():
+        async with AsyncIFinDHTTPClient(transport=httpx.ASGITransport(app=app)) as client:
+            edb = await client.get_edb_data(["S002861328"], "2025-01-01", "2025-01-31")
+            history = await client.get_history_quotation(["bu2506.SHF"], ["close"], "2025-01-01", "2025-01-31")
+            basic = await client.get_basic_data(["bu2506.SHF"], [{"indicator": "close"}], "2025-01-01", "2025-01-31")
+            sequence = await client.get_date_sequence(["bu2506.SHF"], [{"indicator": "close"}], "2025-01-01", "2025-01-31")
+            realtime = await client.get_real_time_quotation(["bu2506.SHF"])
+        async with AsyncIFinDHTTPClient(use_edb_cache=False, transport=httpx.ASGITransport(app=app)) as client:
+            frames = await client.get_edb_frames(["S002861328"], "2025-01-01", "2025-01-31")
+        return edb, history, basic, sequence, realtime, frames
+
+    edb, history, basic, sequence, realtime, frames = asyncio.run(run())
+    assert edb["tables"][0]["id"] == ["S002861328"]
+    pd.testing.assert_frame_equal(frames["S002861328"], edb_result_to_frames(edb)["S002861328"])
+    assert history["tables"][0]["table"]["close"]
+    assert basic["errorcode"] == sequence["errorcode"] == realtime["errorcode"] == 0
+
+
+@temporary_env(**STUB_ENV)
+def test_bounded_concurrency():
+    """测试并发拉取多组数据：同时处理中的请求数达到但不超过并发上限"""
+    stub_state.reset()
+    stub_state.latency = 0.2
+
+    groups = {f"group_{i}": [f"S00286132{i}"] for i in range(8)}
+
+    async def run():
+        async with AsyncIFinDHTTPClient(max_concurrency=4, transport=httpx.ASGITransport(app=app)) as client:
+            return await client.get_edb_data_by_groups(groups, "2025-01-01", "2025-01-31")
+
+    results = asyncio.run(run())
+    max_in_flight = stub_state.max_in_flight
+    stub_state.reset()
+
+    print(f"8 个分组并发(4)，最多同时处理 {max_in_flight} 个请求")
+    assert set(results) == set(groups)
+    assert all(r["errorcode"] == 0 for r in results.values())
+    assert max_in_flight == 4
+
+
+if __name__ == "__main__":
+    test_async_methods()
+    test_bounded_concurrency()
+    print("✅ 异步客户端测试通过")
@@ -0,0 +1,39 @@
+# test_ifind_edb_chunking.py
+from data_service.ifind_stub import run_stub_server, stub_state
+from config.ifind_edb_mapping import IFindEDBMapping
+from test_stubs import temporary_env
+
+STUB_PORT = 18082
+STUB_URL = f"http://127.0.0.1:{STUB_PORT}/api/v1"
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token", IFIND_BASE_URL=STUB_URL)
+def test_chunked_edb_matches_single_call():
+    """测试拆分获取后合并的结果与单次请求一致"""
+    server = run_stub_server(port=STUB_PORT)
+
+    from data_providers.ifind_http_client import IFinDHTTPClient
+
+    indicators = IFindEDBMapping().get_required_indicators('final_strategy')
+    start_date, end_date = "2023-01-01", "2025-06-30"
+
+    try:
+        single = IFinDHTTPClient(edb_chunk_size=0, edb_date_chunk_days=0)
+        expected = single.get_edb_data(indicators, start_date, end_date)
+
+        stub_state.reset()
+        chunked = IFinDHTTPClient(edb_chunk_size=40, edb_date_chunk_days=365)
+        merged = chunked.get_edb_data(indicators, start_date, end_date)
+
+        timings = chunked.get_chunk_timings()
+        print(f"子请求数: {stub_state.request_counts['edb_service']}, 示例耗时: {timings[0]}")
+        assert stub_state.request_counts["edb_service"] == len(timings) > 1
+        assert merged["tables"] == expected["tables"]
+        assert merged["dataVol"] == expected["dataVol"]
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    test_chunked_edb_matches_single_call()
+    print("✅ EDB拆分合并测试通过")
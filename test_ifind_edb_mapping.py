@@ -0,0 +1,49 @@
+# test_ifind_edb_mapping.py
+from config.edb_asphalt_indicators import get_indicator_config
+from config.ifind_edb_mapping import IFindEDBMapping
+
+
+def test_task_indicators_ordered():
+    """测试任务指标顺序固定、无重复，并与分组定义一致"""
+    mapping = IFindEDBMapping()
+    for task_type, groups in mapping.task_type_to_groups.items():
+        indicators = mapping.get_required_indicators(task_type)
+        expected = {i for g in groups for i in mapping.edb_groups[g]}
+        assert len(indicators) == len(set(indicators))
+        assert set(indicators) == expected
+        assert indicators == IFindEDBMapping().get_required_indicators(task_type)
+
+    assert mapping.get_required_indicators("basis")[0] == mapping.edb_groups["price_spot"][0]
+    assert mapping.get_required_indicators("unknown_task") == []
+
+
+def test_reverse_indexes():
+    """测试指标 -> 分组/配置/频率 的反向索引"""
+    mapping = IFindEDBMapping()
+    assert mapping.get_indicator_groups("S004494146") == ("inventory_social",)
+    assert mapping.get_indicator_config("S002861328") is get_indicator_config("S002861328")
+    assert mapping.get_indicator_frequency("S002861328") == "daily"
+    assert mapping.get_indicator_frequency("S009134934") == "weekly"
+    assert "S019295592" in mapping.get_indicators_by_frequency("monthly")
+
+    all_indicators = {i for group in mapping.edb_groups.values() for i in group}
+    assert set(mapping.indicator_groups) == all_indicators
+    assert sum(len(v) for v in mapping.frequency_indicators.values()) == len(all_indicators)
+
+
+def test_indexes_frozen():
+    """测试索引只读"""
+    mapping = IFindEDBMapping()
+    try:
+        mapping.task_indicators["basis"] = ()
+        assert False, "应抛出异常"
+    except TypeError:
+        pass
+    assert isinstance(mapping.task_indicators["basis"], tuple)
+
+
+if __name__ == "__main__":
+    test_task_indicators_ordered()
+    test_reverse_indexes()
+    test_indexes_frozen()
+    print("✅ EDB映射索引测试通过")
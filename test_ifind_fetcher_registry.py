@@ -0,0 +1,51 @@
+# test_ifind_fetcher_registry.py
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler
+
+from config import logging_config
+from test_stubs import temporary_env
+from tools import ifind_tool
+from tools.ifind_tool import IFindDataFetcher, get_data_fetcher, reset_data_fetcher
+
+
+def _file_handlers(logger: logging.Logger):
+    """logger 上挂载的文件处理器（经由后台写入队列）"""
+    handlers = []
+    for handler in logger.handlers:
+        if isinstance(handler, logging.FileHandler):
+            handlers.append(handler)
+        elif isinstance(handler, QueueHandler):
+            listener = next(l for l in logging_config._listeners.values() if l.queue is handler.queue)
+            handlers.extend(h for h in listener.handlers if isinstance(h, logging.FileHandler))
+    return handlers
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token")
+def test_shared_fetcher_across_threads():
+    """测试多线程获取的是同一个实例，且共用一个客户端"""
+    reset_data_fetcher()
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        fetchers = list(executor.map(lambda _: get_data_fetcher(), range(64)))
+
+    assert len({id(f) for f in fetchers}) == 1
+    assert get_data_fetcher().client is fetchers[0].client
+    reset_data_fetcher()
+    assert get_data_fetcher() is not fetchers[0]
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token")
+def test_no_duplicate_file_handlers():
+    """测试重复创建获取器不会重复添加日志文件处理器"""
+    for _ in range(5):
+        IFindDataFetcher(client=get_data_fetcher().client, mapping=get_data_fetcher().mapping)
+
+    handlers = _file_handlers(ifind_tool.logger)
+    assert len(handlers) == 1
+    assert handlers[0].baseFilename.endswith("data_fetch_detailed.log")
+
+
+if __name__ == "__main__":
+    test_shared_fetcher_across_threads()
+    test_no_duplicate_file_handlers()
+    print("✅ 共享数据获取器测试通过")
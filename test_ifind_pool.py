@@ -0,0 +1,33 @@
+# test_ifind_pool.py
+from data_service.ifind_stub import run_stub_server
+from test_stubs import temporary_env
+
+STUB_PORT = 18081
+STUB_URL = f"http://127.0.0.1:{STUB_PORT}/api/v1"
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token", IFIND_BASE_URL=STUB_URL)
+def test_connection_reuse():
+    """测试连接池复用：多次请求只建立一个连接"""
+    server = run_stub_server(port=STUB_PORT)
+
+    from data_providers.ifind_http_client import IFinDHTTPClient
+
+    try:
+        with IFinDHTTPClient(pool_maxsize=2) as client:
+            for month in range(1, 6):
+                result = client.get_edb_data(["S002861328"], f"2025-0{month}-01", f"2025-0{month}-28")
+                assert result["errorcode"] == 0
+
+            stats = client.get_connection_stats()
+            print(f"连接统计: {stats}")
+            assert stats["requests"] == 5
+            assert stats["new_connections"] == 1
+            assert stats["reused_connections"] == 4
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    test_connection_reuse()
+    print("✅ 连接池复用测试通过")
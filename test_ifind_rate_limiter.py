@@ -0,0 +1,125 @@
+# test_ifind_rate_limiter.py
+import asyncio
+import time
+
+import httpx
+
+from data_providers.ifind_errors import IFinDAPIError
+from data_providers.rate_limiter import EndpointRateLimiter, RetryPolicy, TokenBucket
+from data_service.ifind_stub import app, run_stub_server, stub_state
+from test_stubs import temporary_env
+
+STUB_PORT = 18084
+STUB_URL = f"http://127.0.0.1:{STUB_PORT}/api/v1"
+
+
+def test_token_bucket():
+    """测试令牌桶：突发容量用完后按速率等待，限流后速率下降、成功后逐步恢复"""
+    bucket = TokenBucket(rate=10, capacity=2, min_rate=1)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert 0.05 < bucket.reserve() <= 0.1
+
+    bucket.on_throttle()
+    assert bucket.rate == 5
+    bucket.on_throttle()
+    bucket.on_throttle()
+    bucket.on_throttle()
+    assert bucket.rate == 1
+
+    for _ in range(100):
+        bucket.on_success()
+    assert bucket.rate == 10
+
+    state = bucket.snapshot()
+    assert state["throttle_events"] == 4
+    assert state["requests"] == 3
+
+
+def test_retry_delay():
+    """测试退避时间：随重试次数指数增长且不超过上限，Retry-After 优先"""
+    policy = RetryPolicy(max_retries=3, base_delay=0.5, max_delay=4)
+    for attempt in range(6):
+        assert 0 <= policy.delay(attempt) <= min(4, 0.5 * 2 ** attempt)
+    assert policy.delay(0, retry_after=2) >= 2
+
+
+def test_error_classification():
+    """测试错误分类"""
+    assert IFinDAPIError("x", status_code=429).throttled
+    assert IFinDAPIError("x", status_code=503).retryable
+    assert IFinDAPIError("x", errorcode=-9, errmsg="请求频率超限").throttled
+    assert not IFinDAPIError("x", errorcode=-1010, errmsg="参数错误").retryable
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token", IFIND_BASE_URL="http://ifind-stub/api/v1")
+def test_async_retry_and_throttle():
+    """测试异步客户端：限流响应触发重试并降低端点速率"""
+    stub_state.reset()
+    stub_state.inject("edb_service", times=2, status_code=429, errmsg="too many requests")
+
+    from data_providers.ifind_async_client import AsyncIFinDHTTPClient
+
+    limiter = EndpointRateLimiter(rate=20, burst=5)
+
+    async def run():
+        async with AsyncIFinDHTTPClient(
+            transport=httpx.ASGITransport(app=app),
+            use_edb_cache=False,
+            rate_limiter=limiter,
+            retry_policy=RetryPolicy(max_retries=3, base_delay=0.01, max_delay=0.05)
+        ) as client:
+            result = await client.get_edb_data(["S002861328"], "2025-01-01", "2025-01-31")
+            return result, client.get_rate_limit_state()
+
+    result, state = asyncio.run(run())
+    print(f"限流状态: {state}")
+    assert result["errorcode"] == 0
+    assert stub_state.request_counts["edb_service"] == 3
+    assert state["edb_service"]["throttle_events"] == 2
+    assert state["edb_service"]["rate"] < 20
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token", IFIND_BASE_URL=STUB_URL)
+def test_sync_retry_exhausted():
+    """测试同步客户端：不可重试的错误立即抛出，可重试错误超过次数后抛出"""
+    server = run_stub_server(port=STUB_PORT)
+
+    from data_providers.ifind_http_client import IFinDHTTPClient
+
+    stub_state.reset()
+    try:
+        with IFinDHTTPClient(
+            use_edb_cache=False,
+            rate_limiter=EndpointRateLimiter(rate=20, burst=5),
+            retry_policy=RetryPolicy(max_retries=2, base_delay=0.01, max_delay=0.05)
+        ) as client:
+            stub_state.inject("cmd_history_quotation", times=1, errorcode=-1010, errmsg="参数错误")
+            try:
+                client.get_history_quotation(["bu2506.SHF"], ["close"], "2025-01-01", "2025-01-31")
+                assert False, "应抛出异常"
+            except IFinDAPIError as e:
+                assert e.errorcode == -1010
+            assert stub_state.request_counts["cmd_history_quotation"] == 1
+
+            stub_state.inject("edb_service", times=5, status_code=503, errmsg="unavailable")
+            started = time.perf_counter()
+            try:
+                client.get_edb_data(["S002861328"], "2025-01-01", "2025-01-31")
+                assert False, "应抛出异常"
+            except IFinDAPIError as e:
+                assert e.status_code == 503
+            assert stub_state.request_counts["edb_service"] == 3
+            assert time.perf_counter() - started < 1
+    finally:
+        stub_state.reset()
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    test_token_bucket()
+    test_retry_delay()
+    test_error_classification()
+    test_async_retry_and_throttle()
+    test_sync_retry_exhausted()
+    print("✅ 限流与重试测试通过")
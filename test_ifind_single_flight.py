@@ -0,0 +1,56 @@
+# test_ifind_single_flight.py
+import asyncio
+import threading
+
+from data_service.ifind_stub import run_stub_server, stub_state
+from test_stubs import temporary_env
+
+STUB_PORT = 18083
+STUB_URL = f"http://127.0.0.1:{STUB_PORT}/api/v1"
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token", IFIND_BASE_URL=STUB_URL)
+def test_coalesce_threads_and_tasks():
+    """测试线程与 asyncio 任务发起的相同请求只发送一次"""
+    server = run_stub_server(port=STUB_PORT)
+
+    from data_providers.ifind_http_client import IFinDHTTPClient
+    from data_providers.ifind_async_client import AsyncIFinDHTTPClient
+    from data_providers.single_flight import SingleFlight
+
+    single_flight = SingleFlight()
+    sync_client = IFinDHTTPClient(single_flight=single_flight)
+    async_client = AsyncIFinDHTTPClient(single_flight=single_flight)
+    args = (["S002861328", "S002861333"], "2025-01-01", "2025-03-31")
+
+    stub_state.reset()
+    stub_state.latency = 0.3
+    results = []
+
+    def sync_call():
+        results.append(sync_client.get_edb_data(*args))
+
+    async def async_calls():
+        return await asyncio.gather(*(async_client.get_edb_data(*args) for _ in range(3)))
+
+    try:
+        threads = [threading.Thread(target=sync_call) for _ in range(3)]
+        for t in threads:
+            t.start()
+        results.extend(asyncio.run(async_calls()))
+        for t in threads:
+            t.join()
+
+        print(f"请求计数: {stub_state.request_counts}, 合并统计: {single_flight.snapshot()}")
+        assert len(results) == 6
+        assert stub_state.request_counts["edb_service"] == 1
+        assert all(r["tables"] == results[0]["tables"] for r in results)
+        assert single_flight.snapshot()["coalesced"] == 5
+    finally:
+        stub_state.latency = 0.0
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    test_coalesce_threads_and_tasks()
+    print("✅ 在途请求合并测试通过")
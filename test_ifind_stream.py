@@ -0,0 +1,135 @@
+# test_ifind_stream.py
+import gc
+import json
+import tracemalloc
+from datetime import date
+
+import pandas as pd
+
+from data_providers.ifind_edb_utils import table_indicator_id
+from data_providers.ifind_stream import StreamingResponseDecoder, decode_stream
+from data_providers.ifind_table_parser import edb_result_to_frames, edb_table_to_frame
+from data_service.ifind_stub import build_edb_tables, run_stub_server
+from test_stubs import temporary_env
+
+STUB_PORT = 18085
+STUB_URL = f"http://127.0.0.1:{STUB_PORT}/api/v1"
+
+
+def _edb_response(indicators, start=date(2015, 1, 1), end=date(2025, 1, 1)):
+    tables = build_edb_tables(indicators, start, end)
+    return {"errorcode": 0, "errmsg": "success", "tables": tables, "datatype": [], "perf": 12,
+            "dataVol": sum(len(t["time"]) for t in tables)}
+
+
+def test_decode_matches_json():
+    """测试任意分块大小下的解码结果与 json.loads 一致"""
+    response = _edb_response(["S002861328", "S004242400", "M002822183"], start=date(2024, 1, 1))
+    body = json.dumps(response, ensure_ascii=False).encode("utf-8")
+
+    for chunk_size in (1, 3, 97, 4096, len(body)):
+        chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        assert decode_stream(chunks) == response
+
+    assert decode_stream([b'{"errorcode": -1, "errmsg": "x", "tables": null}'])["tables"] is None
+    assert decode_stream([b" { } "]) == {}
+
+
+def test_bounded_buffer():
+    """测试峰值缓冲区受单个 table 大小约束，而非整个响应"""
+    indicators = [f"S00286132{i}" for i in range(8)]
+    response = _edb_response(indicators)
+    body = json.dumps(response, ensure_ascii=False).encode("utf-8")
+    largest_table = max(len(json.dumps(t, ensure_ascii=False)) for t in response["tables"])
+
+    seen = []
+    decoder = StreamingResponseDecoder(on_table=lambda table: seen.append(len(table["time"])) or table["id"][0])
+    for i in range(0, len(body), 65536):
+        decoder.feed(body[i:i + 65536])
+    result = decoder.close()
+
+    print(f"响应 {len(body)} 字节，最大 table {largest_table} 字符，峰值缓冲 {decoder.max_buffer} 字符")
+    assert result["tables"] == indicators
+    assert len(seen) == len(indicators)
+    assert decoder.max_buffer < 2 * largest_table + 65536
+    assert decoder.max_buffer < len(body) / 2
+
+
+def _retained(chunks, on_table=None):
+    """解码后结果仍占用的内存（字节）"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = decode_stream(chunks, on_table)
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return retained, result
+
+
+def test_retained_frames():
+    """测试逐个转换为 DataFrame 时，解码结果的内存远小于原始 tables 与响应体"""
+    indicators = [f"S00286132{i}" for i in range(8)]
+    response = _edb_response(indicators)
+    body = json.dumps(response, ensure_ascii=False).encode("utf-8")
+    chunks = [body[i:i + 65536] for i in range(0, len(body), 65536)]
+    expected = edb_result_to_frames(response)
+    del response
+
+    tables_size, _ = _retained(chunks)
+    frames_size, result = _retained(chunks, lambda table: (table_indicator_id(table), edb_table_to_frame(table)))
+
+    print(f"响应 {len(body)} 字节，原始 tables 占用 {tables_size} 字节，DataFrame 占用 {frames_size} 字节")
+    frames = dict(result["tables"])
+    assert list(frames) == indicators
+    for indicator in indicators:
+        pd.testing.assert_frame_equal(frames[indicator], expected[indicator])
+    assert frames_size < len(body) / 2
+    assert frames_size < tables_size / 4
+
+
+def test_truncated_body():
+    """测试响应体不完整时报错"""
+    body = json.dumps(_edb_response(["S002861328"], start=date(2024, 1, 1))).encode("utf-8")
+    try:
+        decode_stream([body[:-10]])
+        assert False, "应抛出异常"
+    except ValueError:
+        pass
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token", IFIND_BASE_URL=STUB_URL)
+def test_client_stream_decode():
+    """测试同步客户端流式解码结果与非流式一致"""
+    server = run_stub_server(port=STUB_PORT)
+
+    from data_providers.ifind_http_client import IFinDHTTPClient
+
+    try:
+        with IFinDHTTPClient(use_edb_cache=False) as client:
+            streamed = client.get_edb_data(["S002861328", "S004242400"], "2021-01-01", "2024-12-31")
+            client.stream_decode = False
+            loaded = client.get_edb_data(["S002861328", "S004242400"], "2021-01-01", "2024-12-31")
+            assert streamed == loaded
+            assert client.get_connection_stats()["new_connections"] == 1
+
+            # get_edb_frames 解码时逐个转换，拆分后按日期合并，结果与先获取完整响应再转换一致
+            client.stream_decode = True
+            client.edb_date_chunk_days = 400
+            frames = client.get_edb_frames(["S002861328", "S004242400"], "2021-01-01", "2024-12-31")
+            expected = edb_result_to_frames(loaded)
+            assert list(frames) == list(expected)
+            for indicator, frame in expected.items():
+                pd.testing.assert_frame_equal(frames[indicator], frame)
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    test_decode_matches_json()
+    test_bounded_buffer()
+    test_retained_frames()
+    test_truncated_body()
+    test_client_stream_decode()
+    print("✅ 流式解码测试通过")
@@ -0,0 +1,126 @@
+# test_ifind_table_parser.py
+import time
+from datetime import date
+
+import numpy as np
+
+from data_providers.ifind_http_client import IFinDHTTPDataProvider
+from data_providers.ifind_http_data import IFinDHTTPDataProvider as RegisteredProvider
+from data_providers.ifind_table_parser import (
+    edb_result_to_frames,
+    edb_table_to_frame,
+    parse_dates,
+    quotation_table_to_frame
+)
+from data_service.ifind_stub import build_edb_tables
+from schemas.timeseries import TimeSeriesFrame
+
+
+class FakeClient:
+    """返回固定响应的客户端"""
+
+    def __init__(self, quotation=None, edb=None, basic=None):
+        self.quotation = quotation
+        self.edb = edb
+        self.basic = basic
+
+    def get_history_quotation(self, **kwargs):
+        return self.quotation
+
+    def get_edb_data(self, **kwargs):
+        return self.edb
+
+    def get_edb_frames(self, to_frame=edb_table_to_frame, **kwargs):
+        return edb_result_to_frames(self.edb, to_frame)
+
+    def get_basic_data(self, **kwargs):
+        return self.basic
+
+
+def _provider(client, cls=IFinDHTTPDataProvider):
+    provider = cls.__new__(cls)
+    provider.client = client
+    return provider
+
+
+def test_parse_dates_and_nulls():
+    """测试批量解析日期与空值"""
+    dates = parse_dates(["2025-01-02", "2025-01-03 16:15:00", "20250106", "", None])
+    assert str(dates[0])[:10] == "2025-01-02"
+    assert str(dates[2])[:10] == "2025-01-06"
+    assert np.isnat(dates[3]) and np.isnat(dates[4])
+
+    frame = quotation_table_to_frame({
+        "time": ["2025-01-03", "2025-01-02", "bad"],
+        "table": {"close": [10.5, None, 3], "volume": ["100", "", 1]}
+    })
+    assert list(frame["close"].isna()) == [True, False]
+    assert frame["volume"].iloc[1] == 100
+    assert str(frame["date"].iloc[0])[:10] == "2025-01-02"
+
+
+def test_stock_history_lazy():
+    """测试行情数据：跳过收盘价缺失的行，访问时才构造 PriceDataPoint"""
+    quotation = {"errorcode": 0, "tables": [{
+        "thscode": "bu2506.SHF",
+        "time": ["2025-01-02", "2025-01-03", "2025-01-06"],
+        "table": {
+            "open": [1.0, 2.0, 3.0],
+            "high": [1.5, 2.5, 3.5],
+            "low": [0.5, None, 2.5],
+            "close": [1.2, None, 3.2],
+            "volume": [100, 200, 300.0]
+        }
+    }]}
+    points = _provider(FakeClient(quotation=quotation))._get_stock_history("bu2506.SHF", "2025-01-01", "2025-01-31", "cn")
+
+    assert isinstance(points, TimeSeriesFrame)
+    assert len(points) == 2
+    first, last = points[0], points[-1]
+    assert first.date == date(2025, 1, 2) and first.price == 1.2 and first.volume == 100
+    assert last.date == date(2025, 1, 6) and last.low == 2.5
+    assert [p.price for p in points[:2]] == [1.2, 3.2]
+
+
+def test_macro_history_edb_tables():
+    """测试EDB数据解析（value 字段）"""
+    start, end = date(2015, 1, 1), date(2025, 1, 1)
+    edb = {"errorcode": 0, "tables": build_edb_tables(["S002861328"], start, end)}
+    edb["tables"][0]["value"][0] = None
+
+    started = time.perf_counter()
+    points = _provider(FakeClient(edb=edb))._get_macro_history("S002861328", "2015-01-01", "2025-01-01", "全国")
+    elapsed = time.perf_counter() - started
+    print(f"解析 {len(edb['tables'][0]['time'])} 行EDB数据耗时: {elapsed:.4f}s")
+
+    assert len(points) == len(edb["tables"][0]["time"]) - 1
+    assert points[0].date < points[-1].date
+    assert points[-1].indicator_name == "S002861328"
+    assert edb_table_to_frame(edb["tables"][0])["value"].isna().sum() == 1
+
+
+def test_registered_provider_returns_frames():
+    """测试注册为 ifind_http_data 的提供者同样返回 TimeSeriesFrame"""
+    basic = {"tables": [{"table": [
+        {"time": "2025-01-03", "ths_open_price_fund": 2.0, "ths_high_price_fund": 2.5, "ths_low_price_fund": 1.5,
+         "ths_close_price_fund": 2.2, "ths_volume_fund": 200, "ths_oi_fund": 20},
+        {"time": "2025-01-02 00:00:00", "ths_open_price_fund": 1.0, "ths_high_price_fund": 1.5, "ths_low_price_fund": 0.5,
+         "ths_close_price_fund": 1.2, "ths_volume_fund": 100, "ths_oi_fund": 10},
+        {"time": ""}
+    ]}]}
+    provider = _provider(FakeClient(basic=basic), RegisteredProvider)
+    bars = provider.get_history_data("future", "cn", "bu2506.SHF", "2025-01-01", "2025-01-31")
+    assert isinstance(bars, TimeSeriesFrame) and len(bars) == 2
+    assert bars[0].datetime.day == 2 and bars[0].close == 1.2 and bars[-1].open_interest == 20
+    assert bars.constants == {"product": "bu2506.SHF", "symbol": "bu2506.SHF"}
+
+    empty = _provider(FakeClient(basic={"tables": []}), RegisteredProvider)._get_stock_history("600000", "2025-01-01", "2025-01-31", "cn")
+    assert isinstance(empty, TimeSeriesFrame) and len(empty) == 0
+
+
+if __name__ == "__main__":
+    test_parse_dates_and_nulls()
+    test_stock_history_lazy()
+    test_macro_history_edb_tables()
+    test_registered_provider_returns_frames()
+    print("✅ tables 向量化解析测试通过")
@@ -0,0 +1,101 @@
+# test_ifind_token.py
+import os
+import stat
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from data_service.ifind_stub import run_stub_server, stub_state
+from test_stubs import temporary_env
+
+STUB_PORT = 18086
+STUB_URL = f"http://127.0.0.1:{STUB_PORT}/api/v1"
+
+
+def test_refresh_once_and_share():
+    """测试令牌过期：并发请求只刷新一次并全部重放成功，新令牌经缓存文件共享"""
+    server = run_stub_server(port=STUB_PORT)
+    cache_file = os.path.join(tempfile.mkdtemp(), "token.json")
+
+    from data_providers.ifind_http_client import IFinDHTTPClient
+    from data_providers.ifind_token import TokenManager
+
+    stub_state.reset()
+    stub_state.expired_tokens.add("stub-expired")
+    try:
+        with temporary_env(IFIND_ACCESS_TOKEN="stub-expired", IFIND_REFRESH_TOKEN="stub-refresh-1",
+                           IFIND_TOKEN_CACHE_FILE=cache_file, IFIND_BASE_URL=STUB_URL):
+            with IFinDHTTPClient(use_edb_cache=False) as client, IFinDHTTPClient(use_edb_cache=False) as other:
+                def fetch(i):
+                    target = client if i % 2 else other
+                    return target.get_edb_data([f"S00286132{i}"], "2025-01-01", "2025-01-31")
+
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    results = list(executor.map(fetch, range(8)))
+
+                assert all(r["errorcode"] == 0 for r in results)
+                assert stub_state.token_refreshes == 1
+                assert client.access_token == other.access_token == "stub-token-1"
+
+            # 其他进程启动时从缓存文件读取已刷新的令牌
+            manager = TokenManager(STUB_URL, "stub-expired", "stub-refresh-1")
+            assert manager.get_token() == "stub-token-1"
+            assert stub_state.token_refreshes == 1
+    finally:
+        stub_state.reset()
+        server.should_exit = True
+
+
+def test_refresh_from_other_process():
+    """测试其他进程已刷新时不再重复刷新"""
+    from data_providers.ifind_token import TokenManager
+
+    cache_file = os.path.join(tempfile.mkdtemp(), "token.json")
+    first = TokenManager("http://unused", "old-token", "stub-refresh-2", cache_file=cache_file)
+    second = TokenManager("http://unused", "old-token", "stub-refresh-2", cache_file=cache_file)
+
+    first._request_token = lambda: "new-token"
+    second._request_token = lambda: (_ for _ in ()).throw(AssertionError("不应重复刷新"))
+
+    assert first.refresh("old-token") == "new-token"
+    assert second.refresh("old-token") == "new-token"
+    assert first.refresh_count == 1 and second.refresh_count == 0
+    if os.name == "posix":
+        assert stat.S_IMODE(os.stat(cache_file).st_mode) == 0o600
+
+
+def test_cache_keyed_by_full_refresh_token():
+    """测试末尾相同的不同 refresh_token 不共用缓存的令牌，缓存文件中不含 refresh_token"""
+    from data_providers.ifind_token import TokenManager
+
+    cache_file = os.path.join(tempfile.mkdtemp(), "token.json")
+    first = TokenManager("http://unused", "old-token", "account-a-shared-suffix", cache_file=cache_file)
+    second = TokenManager("http://unused", "old-token", "account-b-shared-suffix", cache_file=cache_file)
+
+    first._request_token = lambda: "token-a"
+    second._request_token = lambda: "token-b"
+
+    assert first.refresh("old-token") == "token-a"
+    assert second.refresh("old-token") == "token-b"
+    assert second.refresh_count == 1
+    with open(cache_file, encoding="utf-8") as f:
+        assert "shared-suffix" not in f.read()
+
+
+def test_no_refresh_token():
+    """测试未配置 refresh_token 时报错"""
+    from data_providers.ifind_token import TokenManager, TokenRefreshError
+
+    manager = TokenManager("http://unused", "old-token", None)
+    try:
+        manager.refresh("old-token")
+        assert False, "应抛出异常"
+    except TokenRefreshError:
+        pass
+
+
+if __name__ == "__main__":
+    test_refresh_once_and_share()
+    test_refresh_from_other_process()
+    test_cache_keyed_by_full_refresh_token()
+    test_no_refresh_token()
+    print("✅ 令牌刷新测试通过")
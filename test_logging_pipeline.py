@@ -0,0 +1,112 @@
+# test_logging_pipeline.py
+import glob
+import gzip
+import logging
+import os
+import tempfile
+import threading
+
+from config import logging_config
+from config.logging_config import LazyPayload, attach_detail_log, json_preview, stop_logging
+
+
+class TrackedPayload(LazyPayload):
+    """记录序列化次数与所在线程"""
+
+    def __init__(self, obj, **kwargs):
+        super().__init__(obj, **kwargs)
+        self.render_threads = []
+
+    def _render(self):
+        self.render_threads.append(threading.current_thread().name)
+        return super()._render()
+
+
+def test_lazy_payload_and_sidecar():
+    """测试级别未启用时不序列化、序列化在后台线程完成、超长内容写入压缩轮转的旁路文件"""
+    tmp = tempfile.mkdtemp()
+    detail_file = os.path.join(tmp, "detail.log")
+    payload_file, max_bytes = logging_config.PAYLOAD_LOG_FILE, logging_config.PAYLOAD_MAX_BYTES
+    logging_config.PAYLOAD_LOG_FILE = os.path.join(tmp, "payloads", "payloads.log")
+    logging_config.PAYLOAD_MAX_BYTES = 20000
+
+    try:
+        logger = logging.getLogger("test_logging_pipeline")
+        logger.propagate = False
+        attach_detail_log(logger, detail_file)
+        logger.setLevel(logging.INFO)
+
+        skipped = TrackedPayload({"a": 1})
+        logger.debug("未启用: %s", skipped)
+
+        small = TrackedPayload({"a": 1})
+        logger.info("小内容: %s", small)
+
+        table = {"id": ["S002861328"], "time": ["2024-01-01"] * 2000, "value": [1.0] * 2000}
+        large = [TrackedPayload(table, label=f"表格{i}", inline_chars=200) for i in range(5)]
+        for payload in large:
+            logger.info("大内容: %s", payload)
+    finally:
+        stop_logging()
+        logging_config.PAYLOAD_LOG_FILE, logging_config.PAYLOAD_MAX_BYTES = payload_file, max_bytes
+
+    assert skipped.render_threads == []
+    assert small.render_threads and small.render_threads[0] != threading.current_thread().name
+
+    with open(detail_file, encoding="utf-8") as f:
+        detail = f.read()
+    assert '小内容: {"a": 1}' in detail
+    assert detail.count("完整内容见 payload #") == 5
+    assert "未启用" not in detail
+    assert len(detail) < 5000
+
+    rotated = sorted(glob.glob(os.path.join(tmp, "payloads", "payloads.log.*.gz")))
+    assert rotated
+    with gzip.open(rotated[0], "rt", encoding="utf-8") as f:
+        assert "S002861328" in f.read()
+
+    assert not logger.handlers
+
+
+class CountingValue:
+    """序列化（经 default=str）时计数"""
+    encoded = 0
+
+    def __str__(self):
+        CountingValue.encoded += 1
+        return "v"
+
+
+def test_bounded_serialization():
+    """测试预览与旁路内容只序列化所需长度，超大的内容不会被完整序列化"""
+    assert json_preview({"a": 1}) == '{"a": 1}'
+    preview = json_preview({"values": list(range(1000))}, 100)
+    assert len(preview) == 103 and preview.endswith("...")
+
+    tmp = tempfile.mkdtemp()
+    detail_file = os.path.join(tmp, "detail.log")
+    payload_file, max_chars = logging_config.PAYLOAD_LOG_FILE, logging_config.PAYLOAD_MAX_CHARS
+    logging_config.PAYLOAD_LOG_FILE = os.path.join(tmp, "payloads", "payloads.log")
+    logging_config.PAYLOAD_MAX_CHARS = 2000
+    CountingValue.encoded = 0
+
+    try:
+        logger = logging.getLogger("test_logging_pipeline.bounded")
+        logger.propagate = False
+        attach_detail_log(logger, detail_file)
+        logger.info("超大内容: %s", LazyPayload([CountingValue() for _ in range(100000)], label="响应", inline_chars=200))
+    finally:
+        stop_logging()
+        logging_config.PAYLOAD_LOG_FILE, logging_config.PAYLOAD_MAX_CHARS = payload_file, max_chars
+
+    assert CountingValue.encoded < 1000
+    with open(detail_file, encoding="utf-8") as f:
+        assert "前 2000 字符见 payload #" in f.read()
+    with open(os.path.join(tmp, "payloads", "payloads.log"), encoding="utf-8") as f:
+        assert len(f.read()) < 2200
+
+
+if __name__ == "__main__":
+    test_lazy_payload_and_sidecar()
+    test_bounded_serialization()
+    print("✅ 异步日志测试通过")
@@ -0,0 +1,106 @@
+# test_model_construct.py
+import gc
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from data_providers.mock_data import MockDataProvider
+from schemas.construct import build_models, is_trusted_provider
+from schemas.models import FuturesHistoryDataPoint
+from schemas.timeseries import TimeSeriesFrame
+
+ROWS = 100_000
+
+
+def _frame(trusted: bool, n: int = ROWS) -> TimeSeriesFrame:
+    rng = np.random.default_rng(0)
+    close = 3000 + rng.normal(0, 20, n).cumsum()
+    return TimeSeriesFrame(
+        np.datetime64("2000-01-01T09:00") + np.arange(n) * np.timedelta64(1, "m"),
+        {
+            "symbol": np.full(n, "RB2510", dtype=object),
+            "open": close - 1, "high": close + 5, "low": close - 5, "close": close,
+            "volume": rng.integers(1000, 9000, n), "open_interest": rng.integers(10000, 90000, n)
+        },
+        model=FuturesHistoryDataPoint,
+        constants={"product": "RB"},
+        index_field="datetime",
+        trusted=trusted
+    )
+
+
+def _timed(build) -> float:
+    gc.collect()
+    started = time.perf_counter()
+    build()
+    return time.perf_counter() - started
+
+
+def test_trusted_rows_equal_validated_rows():
+    """测试可信路径构造的对象与完整校验的结果一致"""
+    trusted, validated = _frame(True, 500), _frame(False, 500)
+    assert trusted.to_records() == validated.to_records() == [validated.row(i) for i in range(500)]
+    assert list(trusted) == trusted.to_records()
+    assert trusted[3].model_dump() == validated[3].model_dump()
+    assert isinstance(trusted[0].datetime, datetime) and isinstance(trusted[0].volume, int)
+
+
+def test_sampled_validation_catches_bad_rows():
+    """测试抽样校验能发现未完成类型转换的数据"""
+    rows = [dict(
+        datetime=datetime(2025, 1, 1) + timedelta(days=i), product="RB", symbol="RB2510",
+        open=1.0, high=2.0, low=0.5, close="1.5", volume=10, open_interest=20
+    ) for i in range(10)]
+    assert build_models(FuturesHistoryDataPoint, rows, trusted=True, sample_rate=0)[0].close == "1.5"
+    try:
+        build_models(FuturesHistoryDataPoint, rows, trusted=True, sample_rate=0.2)
+    except ValueError as e:
+        assert "不一致" in str(e)
+    else:
+        raise AssertionError("抽样校验应失败")
+
+
+def test_trusted_provider_selection():
+    """测试按数据提供者选择可信路径，环境变量优先"""
+    saved = os.environ.pop("DATA_TRUSTED_PROVIDERS", None)
+    try:
+        assert MockDataProvider().trusted
+        assert not is_trusted_provider("wind_data")
+        os.environ["DATA_TRUSTED_PROVIDERS"] = "aitrados, ifind_http_data"
+        assert not MockDataProvider().trusted
+        assert is_trusted_provider("aitrados")
+        os.environ["DATA_TRUSTED_PROVIDERS"] = "none"
+        assert not is_trusted_provider("aitrados", default=True)
+    finally:
+        os.environ.pop("DATA_TRUSTED_PROVIDERS", None)
+        if saved is not None:
+            os.environ["DATA_TRUSTED_PROVIDERS"] = saved
+
+
+def benchmark():
+    """基准测试（不在 pytest 中运行）：10 万行 FuturesHistoryDataPoint 各构造方式的耗时"""
+    trusted, validated = _frame(True), _frame(False)
+    rows = trusted._build_rows(slice(None))
+    dicts = [r.model_dump() for r in rows]
+    copies = [dict(d) for d in dicts]
+    results = {
+        "逐行 Model(**row)": _timed(lambda: [FuturesHistoryDataPoint(**d) for d in dicts]),
+        "整批 TypeAdapter 校验": _timed(lambda: build_models(FuturesHistoryDataPoint, dicts)),
+        "整批可信构造": _timed(lambda: build_models(FuturesHistoryDataPoint, copies, trusted=True)),
+        "Frame 逐行 row(i)": _timed(lambda: [validated.row(i) for i in range(ROWS)]),
+        "Frame to_records 校验": _timed(validated.to_records),
+        "Frame to_records 可信": _timed(trusted.to_records),
+    }
+    baseline = results["逐行 Model(**row)"]
+    for name, seconds in results.items():
+        print(f"{name:<24} {seconds:.3f}s  x{baseline / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    test_trusted_rows_equal_validated_rows()
+    test_sampled_validation_catches_bad_rows()
+    test_trusted_provider_selection()
+    benchmark()
+    print("✅ 模型快速构造测试通过")
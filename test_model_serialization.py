@@ -0,0 +1,89 @@
+# test_model_serialization.py
+from datetime import date, datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from data_providers.mock_data import MockDataProvider
+from data_service.main import app
+from schemas.models import APIResponse, BasisDataPoint, FuturesHistoryDataPoint, NewsDataPoint
+from schemas.serialization import (
+    CONTENT_TYPES,
+    decode_models,
+    decode_response,
+    encode_models,
+    encode_response,
+    format_for_content_type,
+    negotiate_format
+)
+from schemas.timeseries import TimeSeriesFrame
+
+
+def test_round_trip_models_and_frames():
+    """测试模型列表与 TimeSeriesFrame 在各格式下往返一致，二进制格式明显小于 JSON"""
+    frame = MockDataProvider().get_history_data("future", "cn", "rb", "2024-01-01", "2024-12-31")
+    records = list(frame)
+    json_size = len(encode_models(records, "json"))
+    assert decode_models(encode_models(records, "json"), "json", FuturesHistoryDataPoint) == records
+
+    for fmt in ("msgpack", "arrow"):
+        for items in (records, frame):
+            payload = encode_models(items, fmt)
+            assert len(payload) < json_size / 2
+            assert decode_models(payload, fmt) == records
+
+
+def test_optional_fields_and_timezones():
+    """测试可选字段为 None、带时区时间的往返"""
+    news = [
+        NewsDataPoint(id="1", title="铜价上涨", published_at=datetime(2025, 6, 1, 8, tzinfo=timezone.utc), sentiment_score=0.4),
+        NewsDataPoint(id="2", title="库存下降")
+    ]
+    aware = TimeSeriesFrame.from_records([
+        FuturesHistoryDataPoint(
+            datetime=datetime(2025, 6, d, 13, tzinfo=timezone.utc), product="RB", symbol="RB2510",
+            open=1.0, high=2.0, low=0.5, close=1.5, volume=10, open_interest=20
+        )
+        for d in (1, 2)
+    ], index_field="datetime")
+    for fmt in ("msgpack", "arrow"):
+        assert decode_models(encode_models(news, fmt), fmt) == news
+        decoded = decode_models(encode_models(aware, fmt), fmt)
+        assert decoded == list(aware) and decoded[0].datetime.utcoffset().total_seconds() == 0
+
+
+def test_api_response_round_trip():
+    """测试 APIResponse（含空数据）的往返"""
+    response = APIResponse[BasisDataPoint](code=200, message="ok", data=[
+        BasisDataPoint(date=date(2025, 1, 2), product="豆粕", spot_price=3000.0, futures_price=2950.0, basis_value=50.0)
+    ])
+    empty = APIResponse[BasisDataPoint](code=404, message="无数据", data=[])
+    for fmt in ("json", "msgpack", "arrow"):
+        for item in (response, empty):
+            assert decode_response(encode_response(item, fmt), fmt, BasisDataPoint) == item
+
+
+def test_service_content_negotiation():
+    """测试数据服务按 Accept 头返回二进制格式"""
+    assert negotiate_format(None) == "json"
+    assert negotiate_format(f"{CONTENT_TYPES['arrow']}, application/json;q=0.5") == "arrow"
+
+    client = TestClient(app)
+    params = {"product": "豆粕", "start_date": "2025-01-01", "end_date": "2025-01-10"}
+    as_json = client.get("/api/v1/data/basis", params=params)
+    assert as_json.headers["content-type"].startswith("application/json")
+    assert len(as_json.json()["data"]) == 10
+
+    for fmt in ("msgpack", "arrow"):
+        resp = client.get("/api/v1/data/basis", params=params, headers={"Accept": CONTENT_TYPES[fmt]})
+        assert format_for_content_type(resp.headers["content-type"]) == fmt
+        decoded = decode_response(resp.content, fmt)
+        assert decoded.code == 200 and len(decoded.data) == 10
+        assert isinstance(decoded.data[0], BasisDataPoint)
+
+
+if __name__ == "__main__":
+    test_round_trip_models_and_frames()
+    test_optional_fields_and_timezones()
+    test_api_response_round_trip()
+    test_service_content_negotiation()
+    print("✅ 模型二进制序列化测试通过")
@@ -0,0 +1,142 @@
+# test_report_cache.py
+import os
+import tempfile
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from crewai.crews.crew_output import CrewOutput
+from crewai.tasks.task_output import TaskOutput
+
+from main.report_cache import ReportCache, intent_key
+from tasks.dag_executor import run_task_dag
+from tasks.run_store import RunStore, edb_data_version
+from test_stubs import CountingSource, FakeTask, temporary_env, temporary_logs
+from tools import ifind_tool
+from tools.ifind_tool import IFindDataFetcher
+
+START, END = "2024-01-01", "2024-06-30"
+
+
+def _intent(*task_types):
+    return {
+        "commodity": "沥青",
+        "time_range": {"start_date": START, "end_date": END},
+        "keywords": ["inventory"],
+        "task_configs": [{"type": t} for t in task_types],
+        "original_input": "沥青 半年库存分析",
+    }
+
+
+def _result(text: str) -> CrewOutput:
+    task = TaskOutput(description="库存分析", raw=f"{text}（库存）", agent="库存分析师")
+    return CrewOutput(raw=text, tasks_output=[task])
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token")
+@temporary_logs()
+def test_cache_hit_and_data_invalidation():
+    """测试相同意图与数据命中缓存，数据更新后失效并被新结果覆盖"""
+    fetcher = IFindDataFetcher()
+    fetcher.edb_source = source = CountingSource()
+    saved_age = ifind_tool.PREFETCH_MAX_AGE_SECONDS
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            cache = ReportCache(root, max_age_hours=0)
+            intent = _intent("inventory", "basis")
+            first = fetcher.data_fingerprint(["inventory", "basis"], START, END)
+            assert cache.get(intent, first) is None
+            cache.put(intent, first, _result("沥青报告 v0"))
+
+            # 任务顺序、重复与原始输入不影响意图键；指纹复用预取结果，不再请求
+            same = _intent("basis", "inventory", "basis")
+            same["original_input"] = "沥青 近半年 库存 基差"
+            assert intent_key(same) == intent_key(intent)
+            assert fetcher.data_fingerprint(["basis", "inventory"], START, END) == first and len(source.calls) == 1
+            hit = cache.get(same, first)
+            assert hit.raw == "沥青报告 v0" and hit.tasks_output[0].raw == "沥青报告 v0（库存）"
+            assert cache.get(_intent("inventory"), first) is None
+
+            # 数据更新：预取结果过期后重新获取，指纹改变，旧条目不再命中
+            ifind_tool.PREFETCH_MAX_AGE_SECONDS = 0
+            source.version = 1
+            second = fetcher.data_fingerprint(["inventory", "basis"], START, END)
+            assert second != first and len(source.calls) == 2
+            assert cache.get(intent, second) is None
+            cache.put(intent, second, _result("沥青报告 v1"))
+            assert cache.get(intent, second).raw == "沥青报告 v1"
+            assert cache.get(intent, first) is None
+    finally:
+        ifind_tool.PREFETCH_MAX_AGE_SECONDS = saved_age
+        fetcher.close()
+
+
+def _analyze(cache: ReportCache, store: RunStore, fetcher: IFindDataFetcher, intent):
+    """与 AnalysisWorkflowFixed.run_intent 相同的组合：查询缓存，未命中时执行任务并写入缓存"""
+    task_types = [t["type"] for t in intent["task_configs"]]
+    fingerprint = fetcher.data_fingerprint(task_types, START, END)
+    cached = cache.get(intent, fingerprint)
+    if cached is not None:
+        return cached, []
+    tasks = [FakeTask(t) for t in task_types]
+    for task in tasks:
+        task.report = f"{task.name}报告（{fetcher.data_fingerprint([task.name], START, END)[:8]}）"
+    final = FakeTask("final_strategy")
+    data_version = edb_data_version({id(t): ([t.name], START, END) for t in tasks}, fetcher)
+    result = run_task_dag(tasks, final, run_store=store, data_version=data_version)
+    cache.put(intent, fingerprint, result)
+    return result, tasks + [final]
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token")
+@temporary_logs()
+def test_data_update_reruns_tasks():
+    """测试数据更新后报告缓存失效，任务不复用旧数据的检查点而是重新执行"""
+    fetcher = IFindDataFetcher()
+    fetcher.edb_source = source = CountingSource()
+    saved_age = ifind_tool.PREFETCH_MAX_AGE_SECONDS
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            cache = ReportCache(os.path.join(root, "reports"), max_age_hours=0)
+            store = RunStore(os.path.join(root, "runs"), max_age_hours=0)
+            intent = _intent("inventory", "basis")
+            first, tasks = _analyze(cache, store, fetcher, intent)
+            assert [t.runs for t in tasks] == [1, 1, 1]
+            hit, tasks = _analyze(cache, store, fetcher, intent)
+            assert tasks == [] and hit.raw == first.raw
+
+            ifind_tool.PREFETCH_MAX_AGE_SECONDS = 0
+            source.version = 1
+            second, tasks = _analyze(cache, store, fetcher, intent)
+            assert [t.runs for t in tasks] == [1, 1, 1]
+            assert second.tasks_output[0].raw != first.tasks_output[0].raw
+            ifind_tool.PREFETCH_MAX_AGE_SECONDS = saved_age
+            assert _analyze(cache, store, fetcher, intent)[0].tasks_output[0].raw == second.tasks_output[0].raw
+    finally:
+        ifind_tool.PREFETCH_MAX_AGE_SECONDS = saved_age
+        fetcher.close()
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token")
+@temporary_logs()
+def test_fingerprint_timeout():
+    """测试数据未在等待时间内就绪时抛出超时，预取继续进行，之后的指纹复用同一份数据"""
+    fetcher = IFindDataFetcher()
+    fetcher.edb_source = source = CountingSource(seconds=0.5)
+    try:
+        try:
+            fetcher.data_fingerprint(["inventory"], START, END, timeout=0.05)
+        except FutureTimeoutError:
+            pass
+        else:
+            raise AssertionError("数据未就绪时应超时")
+        fingerprint = fetcher.data_fingerprint(["inventory"], START, END)
+        assert fingerprint == fetcher.data_fingerprint(["inventory"], START, END, timeout=0.05)
+        assert len(source.calls) == 1
+    finally:
+        fetcher.close()
+
+
+if __name__ == "__main__":
+    test_cache_hit_and_data_invalidation()
+    test_data_update_reruns_tasks()
+    test_fingerprint_timeout()
+    print("✅ 报告缓存测试通过")
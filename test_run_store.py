@@ -0,0 +1,134 @@
+# test_run_store.py
+import tempfile
+import time
+
+from tasks.dag_executor import run_task_dag
+from tasks.run_store import RunStore, edb_data_version, task_fingerprint
+from test_stubs import CountingSource, FakeTask, temporary_env, temporary_logs
+from tools import ifind_tool
+from tools.ifind_tool import IFindDataFetcher
+
+START, END = "2024-01-01", "2024-06-30"
+
+
+def _run(store: RunStore, failing: str = "", fetcher=None):
+    analysts = [FakeTask(name, fail=name == failing) for name in ("basis", "inventory", "macro_economic")]
+    final = FakeTask("final_strategy", fail=failing == "final_strategy")
+    data_version = None
+    if fetcher is not None:
+        data_version = edb_data_version({id(t): ([t.name], START, END) for t in analysts}, fetcher)
+    try:
+        result = run_task_dag(analysts, final, max_workers=3, run_store=store, data_version=data_version)
+    except RuntimeError:
+        result = None
+    return analysts, final, result
+
+
+def test_resume_after_failure():
+    """测试失败后重新运行只执行未完成的任务，结果与完整运行一致"""
+    with tempfile.TemporaryDirectory() as root:
+        store = RunStore(root, max_age_hours=0)
+        analysts, final, result = _run(store, failing="final_strategy")
+        assert result is None and all(t.runs == 1 for t in analysts)
+
+        analysts, final, result = _run(store)
+        assert [t.runs for t in analysts] == [0, 0, 0] and final.runs == 1
+        assert [o.raw for o in result.tasks_output[:3]] == ["basis报告", "inventory报告", "macro_economic报告"]
+        assert analysts[0].output.raw == result.tasks_output[0].raw
+
+        with tempfile.TemporaryDirectory() as fresh:
+            _, _, expected = _run(RunStore(fresh))
+        assert result.raw == expected.raw
+
+        analysts, final, again = _run(store)
+        assert final.runs == 0 and again.raw == result.raw
+
+
+def test_changed_inputs_rerun():
+    """测试输入变化的任务及其下游重新执行，工具调用结果随检查点保存"""
+    with tempfile.TemporaryDirectory() as root:
+        store = RunStore(root, max_age_hours=0)
+        analysts, final, _ = _run(store)
+        entry = store.load(task_fingerprint(analysts[0], ""))
+        assert entry["task"] == "basis"
+        assert [(r["tool"], r["output"]) for r in entry["tool_results"]] == [("edb_data", "basis数据")]
+
+        changed = [FakeTask(name) for name in ("basis", "inventory", "macro_economic")]
+        changed[1].description = "inventory，时间范围 2023-01-01 至 2024-12-31"
+        changed[1].report = "inventory报告（2023 年起）"
+        final = FakeTask("final_strategy")
+        run_task_dag(changed, final, run_store=store)
+        assert [t.runs for t in changed] == [0, 1, 0]
+        assert final.runs == 1  # 上游输出变了，下游的上下文随之改变
+
+        stale = RunStore(root, max_age_hours=1e-9)
+        time.sleep(0.01)
+        assert stale.load(task_fingerprint(changed[0], "")) is None
+
+
+def test_created_at_ignored():
+    """测试任务文本中的创建时间不影响指纹，时间范围的变化照常生效"""
+    first, second = FakeTask("inventory"), FakeTask("inventory")
+    first.expected_output = "## 分析时间\n2025-01-02 09:30:00\n时间范围 2024-01-01 至 2024-06-30"
+    second.expected_output = "## 分析时间\n2025-01-03 18:00:59\n时间范围 2024-01-01 至 2024-06-30"
+    assert task_fingerprint(first, "") == task_fingerprint(second, "")
+    second.expected_output = second.expected_output.replace("2024-06-30", "2024-12-31")
+    assert task_fingerprint(first, "") != task_fingerprint(second, "")
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token")
+def test_real_tasks_fingerprint_stable():
+    """测试任务工厂创建的任务（含库存、量化策略任务）重复创建时指纹不变"""
+    from tasks.dynamic_task_factory import create_dynamic_tasks
+    from tasks.inventory_analysis_task import create_inventory_analysis_task
+
+    intent = {
+        "commodity": "沥青",
+        "time_range": {"start_date": START, "end_date": END},
+        "task_configs": [{"type": t} for t in ("inventory", "basis", "quant_strategy")],
+    }
+
+    def build():
+        tasks = create_dynamic_tasks(intent)
+        tasks += [
+            create_inventory_analysis_task("沥青", START, END, inventory_type=kind)
+            for kind in ("social", "factory")
+        ]
+        return [task_fingerprint(t, "") for t in tasks]
+
+    first = build()
+    time.sleep(1.1)  # 跨过一秒，任务文本中的创建时间不同
+    assert build() == first
+
+
+@temporary_env(IFIND_ACCESS_TOKEN="stub-token")
+@temporary_logs()
+def test_data_update_reruns():
+    """测试数据源发布新数据后，读取该数据的任务及最终任务重新执行"""
+    fetcher = IFindDataFetcher()
+    fetcher.edb_source = source = CountingSource()
+    max_age = ifind_tool.PREFETCH_MAX_AGE_SECONDS
+    try:
+        with tempfile.TemporaryDirectory() as root:
+            store = RunStore(root, max_age_hours=0)
+            _run(store, fetcher=fetcher)
+            analysts, final, _ = _run(store, fetcher=fetcher)
+            assert [t.runs for t in analysts] == [0, 0, 0] and final.runs == 0
+
+            # 预取结果过期后重新请求，取到新数据
+            source.version = 1
+            ifind_tool.PREFETCH_MAX_AGE_SECONDS = 0
+            analysts, final, _ = _run(store, fetcher=fetcher)
+            assert [t.runs for t in analysts] == [1, 1, 1] and final.runs == 1
+    finally:
+        ifind_tool.PREFETCH_MAX_AGE_SECONDS = max_age
+        fetcher.close()
+
+
+if __name__ == "__main__":
+    test_resume_after_failure()
+    test_changed_inputs_rerun()
+    test_created_at_ignored()
+    test_real_tasks_fingerprint_stable()
+    test_data_update_reruns()
+    print("✅ 任务检查点测试通过")
@@ -0,0 +1,134 @@
+# test_stubs.py
+"""各测试共用的替身：模拟 crewai 任务/Agent 与 EDB 数据源、临时环境变量与日志目录（本模块不含测试）"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.tool_usage_events import ToolUsageFinishedEvent
+from crewai.tasks.task_output import TaskOutput
+
+from config import logging_config
+from config.logging_config import stop_logging
+from data_providers.ifind_edb_utils import build_edb_response
+from data_service.ifind_stub import build_edb_tables
+
+
+class FakeAgent:
+    def __init__(self, role: str):
+        self.role = role
+        self.goal = f"{role}分析"
+        self.tools = []
+
+
+class FakeTask:
+    """
+    与 crewai.Task 执行接口一致的测试任务
+
+    执行时调用一次工具（发出 ToolUsageFinishedEvent），睡眠指定时长后返回报告
+    （默认为"<name>报告"，可通过 report 修改）；fail=True 时抛出异常。
+    """
+
+    def __init__(self, name: str, agent: FakeAgent = None, seconds: float = 0.0, context=None, fail: bool = False):
+        self.id = uuid.uuid4()
+        self.name = name
+        self.description = name
+        self.expected_output = "Markdown 报告"
+        self.agent = agent or FakeAgent(name)
+        self.tools = []
+        self.output_pydantic = None
+        self.context = context
+        self.output = None
+        self.seconds = seconds
+        self.fail = fail
+        self.report = None
+        self.runs = 0
+        self.received_context = None
+        self.started = self.finished = None
+
+    def execute_sync(self, agent=None, context=None, tools=None) -> TaskOutput:
+        self.runs += 1
+        self.started = time.perf_counter()
+        self.received_context = context
+        crewai_event_bus.emit(self, ToolUsageFinishedEvent(
+            tool_name="edb_data", tool_args={"task": self.name}, from_task=self,
+            started_at=datetime.now(), finished_at=datetime.now(), output=f"{self.name}数据"
+        ))
+        time.sleep(self.seconds)
+        self.finished = time.perf_counter()
+        if self.fail:
+            raise RuntimeError(f"{self.name}任务失败")
+        return TaskOutput(description=self.description, raw=self.report or f"{self.name}报告", agent=agent.role)
+
+
+class CountingSource:
+    """
+    记录请求的 edb_source，返回模拟服务生成的数据
+
+    version 改变时各指标的最后一个值随之改变（模拟数据源发布了新数据）。
+    """
+
+    def __init__(self, seconds: float = 0.0):
+        self.seconds = seconds
+        self.version = 0
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_edb_data(self, indicators, start_date, end_date):
+        with self.lock:
+            self.calls.append(list(indicators))
+        time.sleep(self.seconds)
+        tables = build_edb_tables(indicators, date.fromisoformat(start_date), date.fromisoformat(end_date))
+        for table in tables:
+            if self.version and table["value"]:
+                table["value"][-1] = str(float(table["value"][-1]) + self.version)
+        return build_edb_response(tables, indicators, start_date, end_date)
+
+
+def _set_env(values):
+    for key, value in values.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+
+@contextmanager
+def temporary_env(**values):
+    """
+    临时设置环境变量（值为 None 时删除），退出时恢复原值，可用作装饰器
+
+    避免一个测试设置的 IFIND_ACCESS_TOKEN、IFIND_BASE_URL 等影响之后的测试。
+    """
+    saved = {key: os.environ.get(key) for key in values}
+    _set_env(values)
+    try:
+        yield
+    finally:
+        _set_env(saved)
+
+
+@contextmanager
+def temporary_logs():
+    """
+    详细数据日志与 payload 旁路文件改写到临时目录（同 test_logging_pipeline.py），可用作装饰器
+
+    进入时摘除已挂载到 logs/ 下文件的处理器，之后创建的 IFindDataFetcher 挂载临时文件；
+    退出时停止写入线程并恢复默认路径。
+    """
+    tmp = tempfile.mkdtemp()
+    saved = logging_config.DETAIL_LOG_FILE, logging_config.PAYLOAD_LOG_FILE
+    stop_logging()
+    logging_config.DETAIL_LOG_FILE = os.path.join(tmp, "data_fetch_detailed.log")
+    logging_config.PAYLOAD_LOG_FILE = os.path.join(tmp, "payloads", "data_fetch_payloads.log")
+    try:
+        yield tmp
+    finally:
+        stop_logging()
+        logging_config.DETAIL_LOG_FILE, logging_config.PAYLOAD_LOG_FILE = saved
+        shutil.rmtree(tmp, ignore_errors=True)
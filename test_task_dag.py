@@ -0,0 +1,89 @@
+# test_task_dag.py
+import threading
+import time
+
+from tasks.dag_executor import TaskDAGExecutor, run_task_dag
+from test_stubs import FakeAgent, FakeTask
+
+
+def _analysts(seconds: float = 0.2):
+    names = ["basis", "inventory", "supply_demand", "macro_economic", "price_technical"]
+    return [FakeTask(name, FakeAgent(name), seconds) for name in names]
+
+
+def test_independent_tasks_run_concurrently():
+    """测试互不依赖的分析任务并行执行，总耗时接近最长的任务"""
+    analysts = _analysts()
+    final = FakeTask("final_strategy", FakeAgent("chief"), 0.05)
+
+    started = time.perf_counter()
+    result = run_task_dag(analysts, final, max_workers=5)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.6  # 顺序执行需要 1.05s
+    assert result.raw == "final_strategy报告"
+    assert len(result.tasks_output) == 6
+    assert all(name in final.received_context for name in ["basis报告", "macro_economic报告", "price_technical报告"])
+    assert final.started >= max(t.finished for t in analysts)
+
+
+def test_worker_limit_and_shared_agent():
+    """测试最大并行数限制，且同一 Agent 的任务不会同时执行"""
+    shared = FakeAgent("inventory")
+    tasks = _analysts(0.1) + [FakeTask("inventory_factory", shared, 0.1), FakeTask("inventory_social", shared, 0.1)]
+    running, peak, lock = [0], [0], threading.Lock()
+
+    for task in tasks:
+        original = task.execute_sync
+
+        def tracked(agent=None, context=None, tools=None, _original=original):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            try:
+                return _original(agent, context, tools)
+            finally:
+                with lock:
+                    running[0] -= 1
+
+        task.execute_sync = tracked
+
+    TaskDAGExecutor(tasks, max_workers=3).run()
+    assert peak[0] <= 3
+    factory, social = tasks[-2], tasks[-1]
+    assert factory.finished <= social.started or social.finished <= factory.started
+
+
+def test_dependencies_and_failures():
+    """测试依赖顺序、依赖环检测与失败传播"""
+    first = FakeTask("quant_strategy", FakeAgent("quant"), 0.05)
+    second = FakeTask("trading", FakeAgent("trader"), 0.05, context=[first])
+    outputs = TaskDAGExecutor([second, first]).run()
+    assert second.started >= first.finished and second.received_context == "quant_strategy报告"
+    assert outputs[id(second)].raw == "trading报告"
+
+    first.context = [second]
+    try:
+        TaskDAGExecutor([first, second])
+    except ValueError as e:
+        assert "环" in str(e)
+    else:
+        raise AssertionError("应检测到依赖环")
+
+    broken = FakeTask("macro_economic", FakeAgent("macro"), 0.01)
+    broken.execute_sync = lambda agent=None, context=None, tools=None: (_ for _ in ()).throw(RuntimeError("数据获取失败"))
+    downstream = FakeTask("final_strategy", FakeAgent("chief"), 0.01, context=[broken])
+    try:
+        TaskDAGExecutor([broken, downstream]).run()
+    except RuntimeError as e:
+        assert "数据获取失败" in str(e)
+    else:
+        raise AssertionError("应抛出任务异常")
+    assert downstream.started is None
+
+
+if __name__ == "__main__":
+    test_independent_tasks_run_concurrently()
+    test_worker_limit_and_shared_agent()
+    test_dependencies_and_failures()
+    print("✅ 任务并行执行测试通过")
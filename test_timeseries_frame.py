@@ -0,0 +1,85 @@
+# test_timeseries_frame.py
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from data_providers.mock_data import MockDataProvider
+from schemas.models import FuturesHistoryDataPoint, PriceDataPoint
+from schemas.timeseries import TimeSeriesFrame
+
+
+def _price_frame(n: int = 10) -> TimeSeriesFrame:
+    return TimeSeriesFrame(
+        np.datetime64("2025-01-01") + np.arange(n),
+        {"price": np.arange(n, dtype="float64") + 100, "volume": np.arange(n, dtype="int64")},
+        model=PriceDataPoint,
+        constants={"product": "cu", "market": "cn"}
+    )
+
+
+def test_rows_and_zero_copy_slicing():
+    """测试行视图构造模型、切片与日期区间返回共享内存的视图"""
+    frame = _price_frame()
+    first = frame[0]
+    assert isinstance(first, PriceDataPoint)
+    assert first.date == date(2025, 1, 1) and first.price == 100.0 and first.product == "cu"
+    assert frame[-1].volume == 9
+
+    part = frame[2:5]
+    assert isinstance(part, TimeSeriesFrame) and len(part) == 3
+    assert np.shares_memory(part.column("price"), frame.column("price"))
+
+    window = frame.between("2025-01-03", "2025-01-05")
+    assert [p.date.day for p in window] == [3, 4, 5]
+    assert np.shares_memory(window.index, frame.index)
+
+
+def test_validate_reports_all_problems():
+    """测试整列校验汇总必填缺失与非整数问题"""
+    _price_frame().validate()
+
+    broken = TimeSeriesFrame(
+        np.datetime64("2025-01-01") + np.arange(3),
+        {"price": [1.0, None, 3.0], "volume": [1.0, 2.5, 3.0]},
+        model=PriceDataPoint,
+        constants={"product": "cu", "market": "cn"}
+    )
+    try:
+        broken.validate()
+    except ValueError as e:
+        assert "price: 1 行必填值缺失" in str(e)
+        assert "volume: 1 行不是整数" in str(e)
+    else:
+        raise AssertionError("校验应失败")
+
+
+def test_records_round_trip():
+    """测试与 List[Model] 互转，带时区的时间保持不变"""
+    records = [
+        FuturesHistoryDataPoint(
+            datetime=datetime(2025, 6, d, 13, tzinfo=timezone.utc), product="RB", symbol="RB2510",
+            open=1.0, high=2.0, low=0.5, close=1.5, volume=10, open_interest=20
+        )
+        for d in (3, 2, 4)
+    ]
+    frame = TimeSeriesFrame.from_records(records, index_field="datetime")
+    assert frame.constants == {"product": "RB", "symbol": "RB2510"}
+    assert frame == sorted(records, key=lambda r: r.datetime)
+    assert TimeSeriesFrame.from_records(list(frame), index_field="datetime") == frame
+
+
+def test_smaller_than_model_list():
+    """测试列式存储远小于逐行模型对象"""
+    frame = MockDataProvider().get_history_data("stock", "cn", "cu", "2020-01-01", "2024-12-31")
+    assert len(frame) > 1800
+    frame.validate()
+    # 每个 PriceDataPoint 实例（含 __dict__）至少数百字节，列式每行约 40 字节
+    assert frame.nbytes / len(frame) < 64
+
+
+if __name__ == "__main__":
+    test_rows_and_zero_copy_slicing()
+    test_validate_reports_all_problems()
+    test_records_round_trip()
+    test_smaller_than_model_list()
+    print("✅ 列式时间序列测试通过")
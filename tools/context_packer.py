@@ -0,0 +1,180 @@
+# tools/context_packer.py
+"""
+工具返回结果的上下文打包
+
+在 token 预算内（按 LLM 提供商配置，见 llms.toml 的 tool_result_tokens）输出信息量
+最大的内容：
+1. 按与任务的相关度排序指标：指标所属分组在任务分组中越靠前、在组内越靠前越相关，
+   偏离历史均值越远（|z|）越值得关注；
+2. 先保证尽可能多的指标有一行精简摘要，再依次升级为完整摘要；
+3. 预算仍有剩余时，为排名靠前的指标附加降采样后的走势（按月末取值，仍过长时用 LTTB）。
+"""
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from tools.data_digest import SeriesDigest, clean_series, digest_series, estimate_tokens, extract_series
+
+# 走势行的最大点数
+TREND_POINTS = int(os.getenv("CONTEXT_TREND_POINTS", "12"))
+# 未指定预算时的默认值
+DEFAULT_TOKEN_BUDGET = 1500
+
+
+def lttb(values: pd.Series, threshold: int) -> pd.Series:
+    """
+    Largest-Triangle-Three-Buckets 降采样：保留首尾点，其余每个桶选与相邻桶构成
+    最大三角形面积的点，尽量保持走势形状（拐点、极值）
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return values
+
+    x = values.index.asi8.astype("float64") if isinstance(values.index, pd.DatetimeIndex) else np.arange(n, dtype="float64")
+    y = values.to_numpy(dtype="float64")
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+
+    selected = [0]
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:next_end].mean() if next_end > end else x[-1]
+        next_y = y[end:next_end].mean() if next_end > end else y[-1]
+
+        a = selected[-1]
+        areas = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        selected.append(start + int(areas.argmax()))
+    selected.append(n - 1)
+    return values.iloc[selected]
+
+
+def downsample(values: pd.Series, max_points: int = TREND_POINTS) -> pd.Series:
+    """按月末取值（保留实际观测日期），仍超过 max_points 时再做 LTTB；values 需按日期升序"""
+    if len(values) <= max_points:
+        return values
+    month_end = values.groupby(values.index.to_period("M")).tail(1)
+    return lttb(month_end, max_points)
+
+
+def trend_line(values: pd.Series, max_points: int = TREND_POINTS) -> str:
+    points = downsample(values, max_points)
+    return "  走势: " + ", ".join(f"{d:%y-%m-%d} {v:.4g}" for d, v in points.items())
+
+
+def relevance_score(digest: SeriesDigest, task_type: Optional[str], mapping=None) -> float:
+    """
+    指标与任务的相关度：分组在任务中的位次与组内位次决定基础分，|z| 作为加分项
+
+    未提供 mapping/task_type 或指标不属于该任务时只按 |z| 排序。
+    """
+    base = 0.0
+    if mapping is not None and task_type:
+        task_groups = mapping.task_type_to_groups.get(task_type, [])
+        for group in mapping.get_indicator_groups(digest.key):
+            if group in task_groups:
+                group_rank = task_groups.index(group)
+                position = mapping.edb_groups[group].index(digest.key)
+                base = max(base, (1 / (1 + group_rank)) * (0.5 + 0.5 / (1 + position / 5)))
+    surprise = min(abs(digest.zscore or 0.0), 3.0) / 3
+    return base + 0.3 * surprise
+
+
+class ContextPacker:
+    """
+    将 tables 打包为不超过 token 预算的文本
+
+    Args:
+        token_budget: token 上限，默认读取 DIGEST_TOKEN_BUDGET（1500）
+        mapping: 可选的 IFindEDBMapping，用于按任务分组排序
+        trend_points: 每条走势的最大点数
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, mapping=None, trend_points: int = TREND_POINTS):
+        self.token_budget = token_budget or int(os.getenv("DIGEST_TOKEN_BUDGET", str(DEFAULT_TOKEN_BUDGET)))
+        self.mapping = mapping
+        self.trend_points = trend_points
+
+    def pack(
+        self,
+        tables: List[Dict],
+        analysis_type: str,
+        start_date: str,
+        end_date: str,
+        task_type: Optional[str] = None
+    ) -> str:
+        items = []
+        empty = 0
+        for item in extract_series(tables):
+            values = clean_series(item["values"])
+            digest = digest_series(item["key"], item["name"], values, item["unit"], item["frequency"])
+            if digest is None:
+                empty += 1
+            else:
+                items.append((digest, values))
+
+        items.sort(key=lambda pair: -relevance_score(pair[0], task_type, self.mapping))
+
+        total_points = sum(d.count for d, _ in items)
+        header = [
+            f"✅ {analysis_type}分析：获取到 {len(tables)} 个指标，{len(items)} 个有数据，共 {total_points} 个有效数据点",
+            f"   • 时间范围: {start_date} 至 {end_date}（按相关度排序）"
+        ]
+        if empty:
+            header.append(f"   • {empty} 个指标在该区间无数据")
+
+        footer_reserve = 20
+        remaining = self.token_budget - estimate_tokens("\n".join(header)) - footer_reserve
+
+        # 1) 精简行：覆盖尽可能多的指标
+        lines: Dict[int, str] = {}
+        for i, (digest, _) in enumerate(items):
+            cost = estimate_tokens(digest.compact_line()) + 1
+            if cost <= remaining:
+                lines[i] = digest.compact_line()
+                remaining -= cost
+
+        # 2) 按相关度升级为完整摘要
+        for i in sorted(lines):
+            full = items[i][0].full_line()
+            extra = estimate_tokens(full) - estimate_tokens(lines[i])
+            if extra <= remaining:
+                lines[i] = full
+                remaining -= extra
+
+        # 3) 按相关度附加走势
+        trends: Dict[int, str] = {}
+        for i in sorted(lines):
+            digest, values = items[i]
+            if digest.count < 3:
+                continue
+            trend = trend_line(values, self.trend_points)
+            cost = estimate_tokens(trend) + 1
+            if cost <= remaining:
+                trends[i] = trend
+                remaining -= cost
+
+        body = []
+        for i in sorted(lines):
+            body.append(lines[i])
+            if i in trends:
+                body.append(trends[i])
+
+        omitted = len(items) - len(lines)
+        if omitted:
+            body.append(f"   • 另有 {omitted} 个指标因篇幅省略（按相关度保留）")
+        return "\n".join(header + body)
+
+
+def pack_tool_result(
+    tables: List[Dict],
+    analysis_type: str,
+    start_date: str,
+    end_date: str,
+    task_type: Optional[str] = None,
+    mapping=None,
+    token_budget: Optional[int] = None
+) -> str:
+    """按相关度与 token 预算打包工具返回结果"""
+    return ContextPacker(token_budget, mapping).pack(tables, analysis_type, start_date, end_date, task_type)
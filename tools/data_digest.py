@@ -0,0 +1,173 @@
+# tools/data_digest.py
+"""
+面向 LLM 的数据统计摘要
+
+把 iFinD 返回的 tables 中的每个序列压缩为一行统计摘要：最新值及日期、近1周/1月/1年
+变化、z 分数、历史分位、区间最低/最高及日期、季节性（与往年同月均值的偏离）。
+按 token 预算组装输出见 tools/context_packer.py。
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config.edb_asphalt_indicators import get_indicator_config
+from data_providers.ifind_edb_utils import table_indicator_id
+from data_providers.ifind_table_parser import parse_dates, to_float_column
+
+# 变化率的回看窗口
+CHANGE_WINDOWS = (("1周", pd.Timedelta(days=7)), ("1月", pd.Timedelta(days=30)), ("1年", pd.Timedelta(days=365)))
+
+_CJK = re.compile(r"[\u3000-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中日文字符按 1 个计，其余按 4 个字符 1 个计"""
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+@dataclass
+class SeriesDigest:
+    """单个指标的统计结果"""
+    key: str
+    name: str
+    unit: str
+    frequency: str
+    count: int
+    last_date: pd.Timestamp
+    last_value: float
+    changes: Dict[str, Optional[float]]
+    zscore: Optional[float]
+    percentile: float
+    min_value: float
+    min_date: pd.Timestamp
+    max_value: float
+    max_date: pd.Timestamp
+    seasonal_mean: Optional[float]
+
+    def _change_text(self) -> str:
+        parts = [
+            f"{label}{value:+.1%}" for label, value in self.changes.items() if value is not None
+        ]
+        return " ".join(parts) if parts else "无变化数据"
+
+    def full_line(self) -> str:
+        unit = f",{self.unit}" if self.unit else ""
+        line = (
+            f"• {self.name}[{self.key}]({self.frequency}{unit},{self.count}点): "
+            f"最新 {_fmt(self.last_value)}@{self.last_date:%Y-%m-%d} | {self._change_text()} | "
+            f"z={_fmt(self.zscore, 2)} 分位={self.percentile:.0f}% | "
+            f"低 {_fmt(self.min_value)}@{self.min_date:%Y-%m-%d} 高 {_fmt(self.max_value)}@{self.max_date:%Y-%m-%d}"
+        )
+        if self.seasonal_mean is not None:
+            deviation = _ratio(self.last_value, self.seasonal_mean)
+            deviation_text = f"({deviation:+.1%})" if deviation is not None else ""
+            line += f" | 往年同月均值 {_fmt(self.seasonal_mean)}{deviation_text}"
+        return line
+
+    def compact_line(self) -> str:
+        return (
+            f"• {self.name}: {_fmt(self.last_value)}@{self.last_date:%m-%d} "
+            f"{self._change_text()} z={_fmt(self.zscore, 1)} 分位{self.percentile:.0f}%"
+        )
+
+
+def _fmt(value: Optional[float], digits: int = 2) -> str:
+    if value is None or not np.isfinite(value):
+        return "NA"
+    return f"{value:.{digits}f}"
+
+
+def _ratio(current: float, base: Optional[float]) -> Optional[float]:
+    if base is None or not np.isfinite(base) or base == 0:
+        return None
+    return current / base - 1
+
+
+def extract_series(tables: List[Dict]) -> List[Dict]:
+    """
+    从 tables 中取出所有数值序列
+
+    EDB table（id/time/value）对应一个序列；行情 table（thscode/time/table）中
+    每个指标各对应一个序列。
+    """
+    series = []
+    for table in tables:
+        times = table.get("time") or []
+        dates = parse_dates(times)
+
+        if isinstance(table.get("value"), list):
+            key = table_indicator_id(table) or "?"
+            config = get_indicator_config(key)
+            names = table.get("index_name")
+            name = config.name if config else (names[0] if isinstance(names, list) and names else key)
+            series.append({
+                "key": key,
+                "name": name,
+                "unit": config.unit if config else "",
+                "frequency": config.frequency if config else "",
+                "values": pd.Series(to_float_column(table["value"]), index=dates)
+            })
+            continue
+
+        code = table.get("thscode", "")
+        for field, values in (table.get("table") or {}).items():
+            if isinstance(values, list) and len(values) == len(times):
+                series.append({
+                    "key": f"{code}.{field}" if code else field,
+                    "name": f"{code} {field}".strip(),
+                    "unit": "",
+                    "frequency": "",
+                    "values": pd.Series(to_float_column(values), index=dates)
+                })
+    return series
+
+
+def clean_series(values: pd.Series) -> pd.Series:
+    """去掉空值与无效日期，按日期升序排列，同一日期只保留最后一个值"""
+    values = values[values.index.notna()].dropna().sort_index()
+    return values[~values.index.duplicated(keep="last")]
+
+
+def digest_series(key: str, name: str, values: pd.Series, unit: str = "", frequency: str = "") -> Optional[SeriesDigest]:
+    """计算单个序列的统计摘要，无有效数据时返回 None"""
+    values = clean_series(values)
+    if values.empty:
+        return None
+
+    last_date = values.index[-1]
+    last_value = float(values.iloc[-1])
+
+    changes = {}
+    for label, window in CHANGE_WINDOWS:
+        target = last_date - window
+        changes[label] = _ratio(last_value, float(values.asof(target))) if target >= values.index[0] else None
+
+    std = float(values.std(ddof=0))
+    zscore = (last_value - float(values.mean())) / std if std > 0 else None
+    percentile = float((values.to_numpy() <= last_value).mean() * 100)
+
+    # 季节性：往年同一月份的均值（至少需要覆盖上一年同月）
+    same_month = values[(values.index.month == last_date.month) & (values.index.year < last_date.year)]
+    seasonal_mean = float(same_month.mean()) if not same_month.empty else None
+
+    return SeriesDigest(
+        key=key,
+        name=name,
+        unit=unit,
+        frequency=frequency,
+        count=len(values),
+        last_date=last_date,
+        last_value=last_value,
+        changes=changes,
+        zscore=zscore,
+        percentile=percentile,
+        min_value=float(values.min()),
+        min_date=values.idxmin(),
+        max_value=float(values.max()),
+        max_date=values.idxmax(),
+        seasonal_mean=seasonal_mean
+    )
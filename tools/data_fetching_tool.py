@@ -1,8 +1,8 @@
 # tools/data_fetching_tool.py
 
-from typing import List, Type
+from typing import Type
 from crewai.tools import BaseTool
-from pydantic import BaseModel, Field, TypeAdapter
+from pydantic import BaseModel, Field
 import requests
 import json
 
@@ -16,6 +16,7 @@ from schemas.models import (
     PriceDataPoint, 
     SupplyDemandDataPoint
 )
+from schemas.serialization import CONTENT_TYPES, decode_response, format_for_content_type
 
 class DataFetchingInput(BaseModel):
     endpoint: str = Field(..., description="API端点，如 '/data/basis'")
@@ -53,17 +54,18 @@ class DataFetchingTool(BaseTool):
             return f"错误：未知的数据模型名称 '{model_name}'。可用模型: {available_models}"
 
         try:
-            response = requests.get(url, params=params, timeout=30)
+            # 优先请求二进制格式（服务端不支持时仍返回 JSON），按响应的 Content-Type 解码并整批校验
+            headers = {"Accept": f"{CONTENT_TYPES['arrow']}, {CONTENT_TYPES['msgpack']};q=0.9, {CONTENT_TYPES['json']};q=0.5"}
+            response = requests.get(url, params=params, headers=headers, timeout=30)
             response.raise_for_status()
             
-            json_response = response.json()
-            if json_response.get('code') != 200:
-                return f"API返回错误: {json_response.get('message')}"
+            api_response = decode_response(
+                response.content, format_for_content_type(response.headers.get("Content-Type")), data_point_model
+            )
+            if api_response.code != 200:
+                return f"API返回错误: {api_response.message}"
 
-            raw_data_list = json_response.get('data', [])
-            
-            adapter = TypeAdapter(List[data_point_model])
-            validated_data = adapter.validate_python(raw_data_list)
+            validated_data = api_response.data
             
             if not validated_data:
                 return "未查询到相关数据。"
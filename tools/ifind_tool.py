@@ -1,63 +1,219 @@
 # tools/ifind_tools.py
 from crewai.tools import BaseTool
 from data_providers.ifind_http_client import IFinDHTTPClient
+from tools.context_packer import pack_tool_result
+from data_providers.edb_store import EDBTimeSeriesStore
+from data_providers.edb_planner import FrequencyRequestPlanner
 from config.ifind_edb_mapping import IFindEDBMapping
-from typing import List, Dict, Any
+from config.logging_config import LazyPayload, attach_detail_log
+from data_providers.ifind_edb_utils import build_edb_response, table_indicator_id
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import itertools
 import json
 import logging
+import time
 from datetime import datetime
 import os
+import threading
 
 logger = logging.getLogger(__name__)
 
+# 预取（见 IFindDataFetcher.prefetch）：是否在工作流中启用、工具调用等待预取结果的最长秒数、
+# 保留的预取结果数、预取结果的有效期（秒，过期后重新获取，以免长期运行的进程一直使用旧数据）
+PREFETCH_ENABLED = os.getenv("EDB_PREFETCH_ENABLED", "true").lower() not in ("0", "false", "no")
+PREFETCH_WAIT_SECONDS = float(os.getenv("EDB_PREFETCH_WAIT_SECONDS", "120"))
+PREFETCH_MAX_RANGES = int(os.getenv("EDB_PREFETCH_MAX_RANGES", "8"))
+PREFETCH_MAX_AGE_SECONDS = float(os.getenv("EDB_PREFETCH_MAX_AGE_SECONDS", "600"))
+
 class IFindDataFetcher:
-    """iFinD数据获取器 - 共享的底层实现"""
+    """
+    iFinD数据获取器 - 共享的底层实现
+    
+    各工具应通过 get_data_fetcher() 获取进程内共享的实例，复用同一个
+    HTTP客户端（连接池、缓存）、指标映射与日志文件句柄。
+    
+    工作流在意图解析后调用 prefetch() 在后台预取全部计划任务所需的指标，
+    之后工具调用相同时间范围的数据时直接从预取结果组装响应（预取未完成时等待它，
+    不重复请求）；预取结果未覆盖的请求照常经 edb_source 获取。
+    """
     
-    def __init__(self):
-        self.client = IFinDHTTPClient()
-        self.mapping = IFindEDBMapping()
+    def __init__(
+        self,
+        client: Optional[IFinDHTTPClient] = None,
+        mapping: Optional[IFindEDBMapping] = None
+    ):
+        self.client = client or IFinDHTTPClient()
+        self.mapping = mapping or IFindEDBMapping()
         
-        # 设置日志
-        if not os.path.exists("logs"):
-            os.makedirs("logs")
-            
-        file_handler = logging.FileHandler('logs/data_fetch_detailed.log', encoding='utf-8')
-        file_handler.setLevel(logging.DEBUG)
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-        logger.setLevel(logging.DEBUG)
+        # EDB数据优先从本地存储读取，只增量同步缺口（IFIND_EDB_STORE_ENABLED=false 时直连API）
+        if os.getenv("IFIND_EDB_STORE_ENABLED", "true").lower() == "true":
+            self.edb_source = EDBTimeSeriesStore(self.client)
+        else:
+            self.edb_source = self.client
+        
+        # 按指标频率分组请求，避免低频序列被填充到日频日期轴（IFIND_EDB_SPLIT_BY_FREQUENCY=false 时关闭）
+        if os.getenv("IFIND_EDB_SPLIT_BY_FREQUENCY", "true").lower() == "true":
+            self.edb_source = FrequencyRequestPlanner(self.edb_source, self.mapping)
+        
+        # 设置日志（重复调用不会重复添加处理器）
+        attach_detail_log(logger)
+        
+        # (start_date, end_date) -> (预取中/已完成的 指标ID -> table, 开始时间)
+        self._prefetches: "OrderedDict[Tuple[str, str], Tuple[Future, float]]" = OrderedDict()
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_pool: Optional[ThreadPoolExecutor] = None
+    
+    def close(self):
+        """关闭HTTP客户端"""
+        with self._prefetch_lock:
+            pool, self._prefetch_pool = self._prefetch_pool, None
+            self._prefetches.clear()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self.client.close()
+    
+    # ========== 预取 ==========
+    def prefetch(self, task_types: Iterable[str], start_date: str, end_date: str) -> Future:
+        """
+        在后台预取若干任务类型所需指标的并集
+        
+        按频率分组的各请求由 edb_source 并发执行；返回的 Future 结果为 指标ID -> table。
+        同一时间范围重复调用时合并尚未预取的指标（已过期的预取结果不再合并）。
+        """
+        indicators = self._indicators_for(task_types)
+        key = (start_date, end_date)
+        with self._prefetch_lock:
+            previous = self._live_prefetch(key)
+            if self._prefetch_pool is None:
+                self._prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="edb-prefetch")
+            future = self._prefetch_pool.submit(self._run_prefetch, indicators, start_date, end_date, previous)
+            started = self._prefetches[key][1] if previous is not None else time.monotonic()
+            self._prefetches[key] = (future, started)
+            self._prefetches.move_to_end(key)
+            while len(self._prefetches) > PREFETCH_MAX_RANGES:
+                self._prefetches.popitem(last=False)
+        
+        logger.info("开始预取 %d 个指标（%s 至 %s）", len(indicators), start_date, end_date)
+        return future
+    
+    def _indicators_for(self, task_types: Iterable[str]) -> List[str]:
+        return list(dict.fromkeys(
+            indicator for task_type in task_types for indicator in self.mapping.get_required_indicators(task_type)
+        ))
+    
+    def _live_prefetch(self, key: Tuple[str, str]) -> Optional[Future]:
+        """未过期的预取（调用方持有 _prefetch_lock）"""
+        entry = self._prefetches.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] > PREFETCH_MAX_AGE_SECONDS:
+            del self._prefetches[key]
+            return None
+        return entry[0]
+    
+    def _run_prefetch(
+        self, indicators: List[str], start_date: str, end_date: str, previous: Optional[Future]
+    ) -> Dict[str, Dict]:
+        tables: Dict[str, Dict] = {}
+        if previous is not None:
+            try:
+                tables.update(previous.result())
+            except Exception:
+                pass
+        missing = [i for i in indicators if i not in tables]
+        if not missing:
+            return tables
+        
+        result = self.edb_source.get_edb_data(indicators=missing, start_date=start_date, end_date=end_date)
+        if result.get("errorcode", 0) != 0:
+            raise RuntimeError(f"预取失败: {result.get('errmsg', '未知错误')}")
+        for table in result.get("tables") or []:
+            tables[table_indicator_id(table)] = table
+        logger.info("预取完成: %d 个指标（%s 至 %s）", len(tables), start_date, end_date)
+        return tables
+    
+    def _prefetched_result(self, indicators: List[str], start_date: str, end_date: str) -> Optional[Dict]:
+        """从预取结果组装响应；没有覆盖这些指标的预取，或预取失败时返回 None"""
+        with self._prefetch_lock:
+            future = self._live_prefetch((start_date, end_date))
+        if future is None:
+            return None
+        try:
+            tables = future.result(timeout=PREFETCH_WAIT_SECONDS)
+        except Exception as e:
+            logger.warning("预取结果不可用，直接请求: %s", e)
+            return None
+        if any(indicator not in tables for indicator in indicators):
+            return None
+        logger.info("命中预取结果: %d 个指标", len(indicators))
+        return build_edb_response([tables[i] for i in indicators], indicators, start_date, end_date)
+    
+    def data_fingerprint(
+        self,
+        task_types: Iterable[str],
+        start_date: str,
+        end_date: str,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        若干任务类型所需指标数据的内容指纹
+        
+        数据经 prefetch() 获取，随后的工具调用直接复用同一份数据；
+        数据源更新了任一指标的数值，指纹随之改变。获取失败时抛出异常，
+        timeout（默认 PREFETCH_WAIT_SECONDS）内数据未就绪时抛出 concurrent.futures.TimeoutError
+        （预取继续在后台进行）。
+        """
+        if timeout is None:
+            timeout = PREFETCH_WAIT_SECONDS
+        tables = self.prefetch(task_types, start_date, end_date).result(timeout=timeout)
+        digest = hashlib.sha256()
+        for indicator in sorted(self._indicators_for(task_types)):
+            content = json.dumps([indicator, tables.get(indicator)], sort_keys=True, ensure_ascii=False, default=str)
+            digest.update(content.encode("utf-8"))
+        return digest.hexdigest()
     
     def get_edb_data_with_debug(
         self,
         indicators: List[str],
         start_date: str,
         end_date: str,
-        analysis_type: str
+        analysis_type: str,
+        task_type: Optional[str] = None,
+        token_budget: Optional[int] = None
     ) -> str:
-        """带完整调试信息的EDB数据获取方法"""
+        """
+        带完整调试信息的EDB数据获取方法
+        
+        task_type 用于按任务相关度排序指标，token_budget 为返回文本的 token 上限
+        （通常取自所在 Agent 的 LLM，见 UnifiedLLM.get_tool_result_budget）。
+        """
         try:
             logger.info(f"=== 开始获取{analysis_type}数据 ===")
-            logger.debug(f"请求参数:")
-            logger.debug(f"  指标数量: {len(indicators)}")
-            logger.debug(f"  指标列表: {indicators}")
-            logger.debug(f"  时间范围: {start_date} 至 {end_date}")
+            logger.debug("请求参数:")
+            logger.debug("  指标数量: %d", len(indicators))
+            logger.debug("  指标列表: %s", indicators)
+            logger.debug("  时间范围: %s 至 %s", start_date, end_date)
             
             if not indicators:
                 error_msg = f"❌ {analysis_type}分析：未找到相关指标"
                 logger.warning(error_msg)
                 return error_msg
             
-            # 调用API
-            result = self.client.get_edb_data(
-                indicators=indicators,
-                start_date=start_date,
-                end_date=end_date
-            )
+            # 优先使用预取结果，否则调用API（按频率分组，经本地存储增量同步）
+            result = self._prefetched_result(indicators, start_date, end_date)
+            if result is None:
+                result = self.edb_source.get_edb_data(
+                    indicators=indicators,
+                    start_date=start_date,
+                    end_date=end_date
+                )
             
             # 记录完整的API响应
             logger.info(f"API响应结构: {list(result.keys())}")
-            logger.debug(f"完整API响应: {json.dumps(result, ensure_ascii=False)[:500]}...")
+            logger.debug("完整API响应: %s", LazyPayload(result, f"{analysis_type}API响应"))
             
             # 验证API响应
             if not result or 'errorcode' not in result:
@@ -82,7 +238,9 @@ class IFindDataFetcher:
             self._log_all_data_content(tables, analysis_type)
             
             # 构建返回摘要
-            summary = self._build_data_summary(tables, analysis_type, start_date, end_date)
+            summary = self._build_data_summary(
+                tables, analysis_type, start_date, end_date, task_type, token_budget
+            )
             
             logger.info(f"=== {analysis_type}数据获取完成 ===")
             return summary
@@ -93,142 +251,153 @@ class IFindDataFetcher:
             return error_msg
     
     def _log_all_data_content(self, tables: List[Dict], analysis_type: str):
-        """强制记录所有数据内容"""
-        logger.info(f"=== {analysis_type}原始数据内容 ===")
+        """
+        记录数据内容
+        
+        只传递参数，序列化由后台日志线程完成；级别未启用时直接跳过，
+        超长内容写入 payload 旁路文件。
+        """
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        logger.info("=== %s原始数据内容 ===", analysis_type)
         
         for i, table in enumerate(tables[:5]):
-            logger.info(f"表格 {i+1}:")
-            logger.info(f"  THS代码: {table.get('thscode', 'N/A')}")
-            logger.info(f"  数据类型: {table.get('datatype', [])}")
-            logger.info(f"  时间字段: {table.get('time', [])[:10]}...")
+            time_values = table.get('time') or []
+            logger.info("表格 %d: THS代码=%s 数据类型=%s 时间字段=%s...",
+                        i + 1, table.get('thscode', 'N/A'), table.get('datatype', []), time_values[:10])
             
             if "table" in table and table["table"]:
                 values_dict = table["table"]
-                logger.info(f"  指标数量: {len(values_dict)}")
+                logger.info("  指标数量: %d", len(values_dict))
                 
                 for indicator_key, values in list(values_dict.items())[:3]:
                     if isinstance(values, list):
-                        valid_values = [v for v in values if v is not None]
-                        logger.info(f"  指标 {indicator_key}: {valid_values[:20]}...")
+                        valid_values = list(itertools.islice((v for v in values if v is not None), 20))
+                        logger.info("  指标 %s: %s...", indicator_key, valid_values)
                     else:
-                        logger.info(f"  指标 {indicator_key}: {values}")
+                        logger.info("  指标 %s: %s", indicator_key, values)
             
-            logger.info(f"  表格 {i+1} 完整数据: {json.dumps(table, ensure_ascii=False, indent=2)[:1000]}...")
+            logger.info("  表格 %d 完整数据: %s", i + 1, LazyPayload(table, f"{analysis_type}表格{i + 1}"))
     
-    def _build_data_summary(self, tables: List[Dict], analysis_type: str, start_date: str, end_date: str) -> str:
-        """构建数据摘要返回给Agent"""
-        summary_parts = [f"✅ {analysis_type}分析：获取到 {len(tables)} 个指标"]
-        
-        total_data_points = 0
-        
-        for i, table in enumerate(tables[:3]):
-            if "table" in table and table["table"]:
-                values_dict = table["table"]
-                if values_dict:
-                    first_key = list(values_dict.keys())[0]
-                    values = values_dict[first_key]
-                    if isinstance(values, list):
-                        valid_values = [v for v in values if v is not None]
-                        if valid_values:
-                            total_data_points += len(valid_values)
-                            latest_value = valid_values[-1]
-                            avg_value = sum(valid_values) / len(valid_values)
-                            
-                            summary_parts.append(f"   • 指标{i+1}: {len(valid_values)}个数据点")
-                            summary_parts.append(f"     • 最新值={latest_value:.2f}, 均值={avg_value:.2f}")
-        
-        summary_parts.append(f"   • 总计: {total_data_points}个有效数据点")
-        summary_parts.append(f"   • 时间范围: {start_date} 至 {end_date}")
-        
-        return "\n".join(summary_parts)
+    def _build_data_summary(
+        self,
+        tables: List[Dict],
+        analysis_type: str,
+        start_date: str,
+        end_date: str,
+        task_type: Optional[str] = None,
+        token_budget: Optional[int] = None
+    ) -> str:
+        """构建数据摘要返回给Agent（按任务相关度排序，受 token 预算约束）"""
+        return pack_tool_result(
+            tables, analysis_type, start_date, end_date,
+            task_type=task_type, mapping=self.mapping, token_budget=token_budget
+        )
+
+
+_shared_fetcher: Optional[IFindDataFetcher] = None
+_shared_fetcher_lock = threading.Lock()
+
+
+def get_data_fetcher() -> IFindDataFetcher:
+    """获取进程内共享的 IFindDataFetcher（线程安全，首次调用时创建）"""
+    global _shared_fetcher
+    if _shared_fetcher is None:
+        with _shared_fetcher_lock:
+            if _shared_fetcher is None:
+                _shared_fetcher = IFindDataFetcher()
+    return _shared_fetcher
+
+
+def reset_data_fetcher():
+    """关闭并丢弃共享实例（配置变更或测试时使用）"""
+    global _shared_fetcher
+    with _shared_fetcher_lock:
+        if _shared_fetcher is not None:
+            _shared_fetcher.close()
+            _shared_fetcher = None
+
+
+class EDBAnalysisTool(BaseTool):
+    """
+    按任务类型获取EDB数据的工具基类
+    
+    子类只需指定 task_type（IFindEDBMapping 中的任务类型）与 analysis_type（中文名称）。
+    token_budget 为返回结果的 token 上限，通常由 Agent 按所用 LLM 传入：
+    BasisAnalysisTool(token_budget=llm.get_tool_result_budget())
+    """
+    task_type: str = ""
+    analysis_type: str = ""
+    token_budget: Optional[int] = None
+    
+    def _run(self, start_date: str, end_date: str) -> str:
+        fetcher = get_data_fetcher()
+        indicators = fetcher.mapping.get_required_indicators(self.task_type)
+        return fetcher.get_edb_data_with_debug(
+            indicators, start_date, end_date, self.analysis_type,
+            task_type=self.task_type, token_budget=self.token_budget
+        )
 
 
 # 具体的工具类
-class BasisAnalysisTool(BaseTool):
+class BasisAnalysisTool(EDBAnalysisTool):
     name: str = "获取EDB数据用于基差分析"
     description: str = "获取基差分析所需的数据"
-    
-    def _run(self, start_date: str, end_date: str) -> str:
-        fetcher = IFindDataFetcher()
-        indicators = fetcher.mapping.get_required_indicators('basis')
-        return fetcher.get_edb_data_with_debug(indicators, start_date, end_date, "基差")
+    task_type: str = "basis"
+    analysis_type: str = "基差"
 
 
-class InventoryAnalysisTool(BaseTool):
+class InventoryAnalysisTool(EDBAnalysisTool):
     name: str = "获取EDB数据用于库存分析"
     description: str = "获取库存分析所需的数据"
-    
-    def _run(self, start_date: str, end_date: str) -> str:
-        fetcher = IFindDataFetcher()
-        indicators = fetcher.mapping.get_required_indicators('inventory')
-        return fetcher.get_edb_data_with_debug(indicators, start_date, end_date, "库存")
+    task_type: str = "inventory"
+    analysis_type: str = "库存"
 
 
-class SupplyDemandAnalysisTool(BaseTool):
+class SupplyDemandAnalysisTool(EDBAnalysisTool):
     name: str = "获取EDB数据用于供需分析"
     description: str = "获取供需分析所需的数据"
-    
-    def _run(self, start_date: str, end_date: str) -> str:
-        fetcher = IFindDataFetcher()
-        indicators = fetcher.mapping.get_required_indicators('supply_demand')
-        return fetcher.get_edb_data_with_debug(indicators, start_date, end_date, "供需")
+    task_type: str = "supply_demand"
+    analysis_type: str = "供需"
 
 
-class ApparentDemandAnalysisTool(BaseTool):
+class ApparentDemandAnalysisTool(EDBAnalysisTool):
     name: str = "获取EDB数据用于表观需求分析"
     description: str = "获取表观需求分析所需的数据"
-    
-    def _run(self, start_date: str, end_date: str) -> str:
-        fetcher = IFindDataFetcher()
-        indicators = fetcher.mapping.get_required_indicators('apparent_demand')
-        return fetcher.get_edb_data_with_debug(indicators, start_date, end_date, "表观需求")
+    task_type: str = "apparent_demand"
+    analysis_type: str = "表观需求"
 
 
-class DemandForecastingTool(BaseTool):
+class DemandForecastingTool(EDBAnalysisTool):
     name: str = "获取EDB数据用于需求预测"
     description: str = "获取需求预测所需的数据"
-    
-    def _run(self, start_date: str, end_date: str) -> str:
-        fetcher = IFindDataFetcher()
-        indicators = fetcher.mapping.get_required_indicators('demand_forecasting')
-        return fetcher.get_edb_data_with_debug(indicators, start_date, end_date, "需求预测")
+    task_type: str = "demand_forecasting"
+    analysis_type: str = "需求预测"
 
 
-class MacroEconomicAnalysisTool(BaseTool):
+class MacroEconomicAnalysisTool(EDBAnalysisTool):
     name: str = "获取EDB数据用于宏观经济分析"
     description: str = "获取宏观经济分析所需的数据"
-    
-    def _run(self, start_date: str, end_date: str) -> str:
-        fetcher = IFindDataFetcher()
-        indicators = fetcher.mapping.get_required_indicators('macro_economic')
-        return fetcher.get_edb_data_with_debug(indicators, start_date, end_date, "宏观经济")
+    task_type: str = "macro_economic"
+    analysis_type: str = "宏观经济"
 
 
-class PriceTechnicalAnalysisTool(BaseTool):
+class PriceTechnicalAnalysisTool(EDBAnalysisTool):
     name: str = "获取EDB数据用于价格技术分析"
     description: str = "获取价格技术分析所需的数据"
-    
-    def _run(self, start_date: str, end_date: str) -> str:
-        fetcher = IFindDataFetcher()
-        indicators = fetcher.mapping.get_required_indicators('price_technical')
-        return fetcher.get_edb_data_with_debug(indicators, start_date, end_date, "价格技术")
+    task_type: str = "price_technical"
+    analysis_type: str = "价格技术"
 
 
-class QuantStrategyAnalysisTool(BaseTool):
+class QuantStrategyAnalysisTool(EDBAnalysisTool):
     name: str = "获取EDB数据用于量化策略"
     description: str = "获取量化策略所需的数据"
-    
-    def _run(self, start_date: str, end_date: str) -> str:
-        fetcher = IFindDataFetcher()
-        indicators = fetcher.mapping.get_required_indicators('quant_strategy')
-        return fetcher.get_edb_data_with_debug(indicators, start_date, end_date, "量化策略")
+    task_type: str = "quant_strategy"
+    analysis_type: str = "量化策略"
 
 
-class TradingAnalysisTool(BaseTool):
+class TradingAnalysisTool(EDBAnalysisTool):
     name: str = "获取EDB数据用于交易执行"
     description: str = "获取交易执行所需的数据"
-    
-    def _run(self, start_date: str, end_date: str) -> str:
-        fetcher = IFindDataFetcher()
-        indicators = fetcher.mapping.get_required_indicators('trading')
-        return fetcher.get_edb_data_with_debug(indicators, start_date, end_date, "交易执行")
+    task_type: str = "trading"
+    analysis_type: str = "交易执行"